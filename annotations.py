@@ -0,0 +1,148 @@
+"""
+Armazenamento persistente das anotações (SQLite), com gravação incremental por ângulo.
+
+Cada ângulo de Cobb é uma linha identificada por um uid estável; uma edição grava só os
+ângulos alterados (UPSERT), nunca o estudo inteiro. O estado de cada ângulo segue o
+formato de ImageViewer.annotation_state(). As medidas do registro measurements (SVA,
+cifose, PI/PT/SS...) vão numa tabela própria; o estado delas tem a chave "kind".
+"""
+import os
+import sqlite3
+import struct
+import time
+
+DEFAULT_PATH = os.environ.get(
+    "COBB_ANNOTATIONS_DB", os.path.join(os.path.expanduser("~"), ".cobb_annotations.sqlite")
+)
+POINTS = struct.Struct("<8d")  # p1, p2, q1, q2 como (x, y)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS studies (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS angles (
+    uid TEXT PRIMARY KEY,
+    study_id INTEGER NOT NULL REFERENCES studies(id),
+    points BLOB NOT NULL,
+    color TEXT NOT NULL,
+    font_size INTEGER NOT NULL,
+    text_x REAL,
+    text_y REAL,
+    angle REAL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS angles_study ON angles(study_id);
+CREATE TABLE IF NOT EXISTS measurements (
+    uid TEXT PRIMARY KEY,
+    study_id INTEGER NOT NULL REFERENCES studies(id),
+    kind TEXT NOT NULL,
+    points BLOB NOT NULL,
+    color TEXT NOT NULL,
+    text TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS measurements_study ON measurements(study_id);
+"""
+
+
+class AnnotationStore:
+    """Anotações de todos os estudos num único banco, indexadas pelo caminho absoluto da imagem."""
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        # WAL + synchronous=NORMAL: cada commit é um append no log, sem fsync do banco inteiro
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.study_ids = {}
+
+    def study_id(self, study_path):
+        key = os.path.abspath(study_path)
+        if key not in self.study_ids:
+            self.db.execute("INSERT OR IGNORE INTO studies (path) VALUES (?)", (key,))
+            row = self.db.execute("SELECT id FROM studies WHERE path = ?", (key,)).fetchone()
+            self.study_ids[key] = row[0]
+        return self.study_ids[key]
+
+    def save(self, study_path, states):
+        """Grava (insere ou atualiza) apenas os ângulos e medidas informados, numa única transação."""
+        study_id = self.study_id(study_path)
+        now = time.time()
+        rows = []
+        measurement_rows = []
+        for s in states:
+            if "kind" in s:
+                flat = [c for point in s["points"] for c in point]
+                measurement_rows.append((
+                    s["uid"], study_id, s["kind"], struct.pack(f"<{len(flat)}d", *flat),
+                    s["color"], s.get("text"), now,
+                ))
+                continue
+            (x1, y1), (x2, y2), (x3, y3), (x4, y4) = s["points"]
+            text_x, text_y = s["text_pos"] if s.get("text_pos") is not None else (None, None)
+            rows.append((
+                s["uid"], study_id, POINTS.pack(x1, y1, x2, y2, x3, y3, x4, y4),
+                s["color"], s["font_size"], text_x, text_y, s.get("angle"), now,
+            ))
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO angles (uid, study_id, points, color, font_size, text_x, text_y, angle, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(uid) DO UPDATE SET points = excluded.points, color = excluded.color, "
+                "font_size = excluded.font_size, text_x = excluded.text_x, text_y = excluded.text_y, "
+                "angle = excluded.angle, updated = excluded.updated",
+                rows,
+            )
+            self.db.executemany(
+                "INSERT INTO measurements (uid, study_id, kind, points, color, text, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(uid) DO UPDATE SET points = excluded.points, color = excluded.color, "
+                "text = excluded.text, updated = excluded.updated",
+                measurement_rows,
+            )
+
+    def delete(self, uids):
+        """Apaga ângulos ou medidas (os uids são únicos entre as duas tabelas)."""
+        params = [(uid,) for uid in uids]
+        with self.db:
+            self.db.executemany("DELETE FROM angles WHERE uid = ?", params)
+            self.db.executemany("DELETE FROM measurements WHERE uid = ?", params)
+
+    def load(self, study_path):
+        """Todos os ângulos do estudo e depois as medidas, cada grupo na ordem em que foi criado."""
+        key = os.path.abspath(study_path)
+        rows = self.db.execute(
+            "SELECT a.uid, a.points, a.color, a.font_size, a.text_x, a.text_y, a.angle "
+            "FROM angles a JOIN studies s ON s.id = a.study_id WHERE s.path = ? ORDER BY a.rowid",
+            (key,),
+        ).fetchall()
+        states = []
+        for uid, points, color, font_size, text_x, text_y, angle in rows:
+            x1, y1, x2, y2, x3, y3, x4, y4 = POINTS.unpack(points)
+            states.append({
+                "uid": uid,
+                "points": [(x1, y1), (x2, y2), (x3, y3), (x4, y4)],
+                "color": color,
+                "font_size": font_size,
+                "text_pos": None if text_x is None else (text_x, text_y),
+                "angle": angle,
+            })
+        rows = self.db.execute(
+            "SELECT m.uid, m.kind, m.points, m.color, m.text "
+            "FROM measurements m JOIN studies s ON s.id = m.study_id WHERE s.path = ? ORDER BY m.rowid",
+            (key,),
+        ).fetchall()
+        for uid, kind, points, color, text in rows:
+            flat = struct.unpack(f"<{len(points) // 8}d", points)
+            states.append({
+                "uid": uid,
+                "kind": kind,
+                "points": list(zip(flat[0::2], flat[1::2])),
+                "color": color,
+                "text": text,
+            })
+        return states
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,119 @@
+"""
+Medição do ângulo de Cobb em lote, sem interface gráfica.
+
+Cada registro tem um identificador de estudo e quatro pontos (linha 1 = pontos 1-2,
+linha 2 = pontos 3-4). Formatos de entrada:
+    CSV:   study,x1,y1,x2,y2,x3,y3,x4,y4
+    JSON:  [{"study": "...", "points": [[x, y], [x, y], [x, y], [x, y]]}, ...]
+    JSONL: um objeto como acima por linha
+
+Uso:
+    python batch.py pontos.csv -o angulos.csv --workers 8
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from itertools import chain, islice
+from multiprocessing import Pool
+
+import geometry
+
+OUTPUT_FIELDS = ["study", "angle", "intersection_x", "intersection_y"]
+
+
+def read_records(path):
+    """Lê os registros sob demanda, sem carregar arquivos CSV/JSONL inteiros na memória."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if ext == ".csv":
+            for row in csv.DictReader(f):
+                points = [(float(row[f"x{i}"]), float(row[f"y{i}"])) for i in range(1, 5)]
+                yield row["study"], points
+        elif ext == ".jsonl":
+            for line in f:
+                if line.strip():
+                    obj = json.loads(line)
+                    yield obj["study"], [tuple(p) for p in obj["points"]]
+        elif ext == ".json":
+            for obj in json.load(f):
+                yield obj["study"], [tuple(p) for p in obj["points"]]
+        else:
+            raise ValueError(f"Formato não suportado: {ext}")
+
+
+def measure_chunk(records):
+    """Calcula ângulos e interseções de um bloco; blocos grandes numa única chamada vetorizada."""
+    if len(records) < geometry.VECTOR_THRESHOLD:
+        # Poucos registros: math puro, sem pagar o import do numpy
+        medidas = []
+        for _, points in records:
+            angle, intersecao, _ = geometry.medir_cobb(points)
+            medidas.append((angle, intersecao or (math.nan, math.nan)))
+    else:
+        angulos, intersecoes, _ = geometry.cobb_vetorizado([points for _, points in records])
+        medidas = zip(angulos.tolist(), intersecoes.tolist())
+    results = []
+    for (study, _), (angle, (ix, iy)) in zip(records, medidas):
+        results.append({
+            "study": study,
+            "angle": round(angle, 4),
+            "intersection_x": None if math.isnan(ix) else round(ix, 4),
+            "intersection_y": None if math.isnan(iy) else round(iy, 4),
+        })
+    return results
+
+
+def chunked(records, size):
+    records = iter(records)
+    while chunk := list(islice(records, size)):
+        yield chunk
+
+
+def measure_all(records, workers=None, chunksize=4096):
+    """Gera os resultados na ordem de entrada; cada processo recebe blocos de chunksize registros."""
+    chunks = chunked(records, chunksize)
+    head = list(islice(chunks, 2))
+    chunks = chain(head, chunks)
+    if workers == 1 or len(head) < 2:
+        # Um único bloco não compensa o custo de criar os processos
+        for results in map(measure_chunk, chunks):
+            yield from results
+        return
+    with Pool(workers) as pool:
+        for results in pool.imap(measure_chunk, chunks):
+            yield from results
+
+
+def write_results(results, out, fmt):
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=OUTPUT_FIELDS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow(result)
+    else:
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cálculo do ângulo de Cobb em lote.")
+    parser.add_argument("input", help="arquivo .csv, .json ou .jsonl com os pontos")
+    parser.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    parser.add_argument("--chunksize", type=int, default=4096)
+    args = parser.parse_args(argv)
+
+    results = measure_all(read_records(args.input), args.workers, args.chunksize)
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            write_results(results, out, args.format)
+    else:
+        write_results(results, sys.stdout, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Exportação em lote das imagens anotadas, sem interface gráfica.
+
+Para cada imagem do diretório, lê as anotações gravadas (AnnotationStore) e desenha linhas,
+prolongamentos, pontos e o valor do ângulo (ou da medida) num QImage fora da tela, como em
+"Salvar Imagem".
+Cada processo do pool decodifica, desenha e grava uma imagem inteira.
+
+Uso:
+    python batch_export.py estudos/ -o anotadas/ --format jpeg --scale 0.5 --workers 8
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+import geometry
+import measurements
+from annotations import AnnotationStore, DEFAULT_PATH
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".dcm", ".dicom")
+FORMATS = {"png": ("PNG", ".png"), "jpeg": ("JPEG", ".jpg"), "bmp": ("BMP", ".bmp")}
+POINT_RADIUS = 6  # mesmo raio de main.DraggablePoint
+TEXT_MARGIN = 4  # margem do documento de um QGraphicsTextItem
+
+_app = None
+
+
+def init_worker():
+    """Cada processo precisa do seu QGuiApplication (fontes) na plataforma offscreen."""
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtGui import QGuiApplication
+    _app = QGuiApplication.instance() or QGuiApplication([])
+
+
+def list_studies(directory):
+    return sorted(
+        entry.path for entry in os.scandir(directory)
+        if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+
+def read_image(path, scale):
+    """QImage na escala de saída e o tamanho original (largura, altura) do estudo."""
+    from PyQt6.QtGui import QImageReader
+    from PyQt6.QtCore import Qt
+    from dicom import is_dicom
+
+    if is_dicom(path):
+        from dicom import DicomImage
+        from loader import gray_to_qimage
+
+        dicom = DicomImage(path)
+        width, height = dicom.columns, dicom.rows
+        # Subamostra na janela/nível e completa a redução com filtro suave
+        step = max(1, int(1 / scale))
+        image = gray_to_qimage(dicom.display(step=step))
+        target = (max(1, round(width * scale)), max(1, round(height * scale)))
+        if (image.width(), image.height()) != target:
+            image = image.scaled(*target, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        return image, width, height
+
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if not size.isValid():
+        raise OSError(reader.errorString())
+    if scale != 1.0:
+        # O decodificador reduz durante a leitura (JPEG usa DCT reduzida)
+        reader.setScaledSize(size * scale)
+    image = reader.read()
+    if image.isNull():
+        raise OSError(reader.errorString())
+    return image, size.width(), size.height()
+
+
+def draw_annotations(painter, states, width, height):
+    """Desenha ângulos e medidas em coordenadas da imagem original, como os itens da cena."""
+    from PyQt6.QtGui import QColor, QFont, QPen
+    from PyQt6.QtCore import Qt, QPointF, QRectF
+
+    for state in states:
+        if "kind" in state:
+            draw_measurement(painter, state)
+            continue
+        points = state["points"]
+        color = QColor(state["color"])
+        angle, _, segmentos = geometry.medir_cobb(points, width, height)
+        if state.get("angle") is not None:
+            angle = state["angle"]  # gravado com o tamanho do pixel do estudo
+
+        dashed = QPen(color, 4, Qt.PenStyle.CustomDashLine)
+        dashed.setDashPattern([4, 3])
+        painter.setPen(dashed)
+        for (x1, y1), (x2, y2) in segmentos:
+            painter.drawLine(QPointF(x1, y1), QPointF(x2, y2))
+        painter.setPen(QPen(color, 4))
+        for (x1, y1), (x2, y2) in (points[:2], points[2:]):
+            painter.drawLine(QPointF(x1, y1), QPointF(x2, y2))
+
+        painter.setPen(QPen(QColor("black"), 1))
+        painter.setBrush(QColor("red"))
+        for x, y in points:
+            painter.drawEllipse(QPointF(x, y), POINT_RADIUS, POINT_RADIUS)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+
+        text_pos = state.get("text_pos")
+        if text_pos is None:
+            # Mesma regra de CobbAngleItem.update_text_position
+            text_pos = ((points[0][0] + points[2][0]) / 2 + 5, (points[0][1] + points[2][1]) / 2 + 5)
+        painter.setFont(QFont("Arial", state["font_size"], QFont.Weight.Bold))
+        painter.setPen(color)
+        x, y = text_pos
+        painter.drawText(QRectF(x + TEXT_MARGIN, y + TEXT_MARGIN, 10 * state["font_size"], 4 * state["font_size"]),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, f"{angle:.1f}°")
+
+
+def draw_measurement(painter, state):
+    """Linhas, segmentos auxiliares, pontos e texto de uma medida, como main.MeasurementItem."""
+    from PyQt6.QtGui import QColor, QFont, QPen
+    from PyQt6.QtCore import Qt, QPointF, QRectF
+
+    kind = measurements.REGISTRO.get(state["kind"])
+    if kind is None:
+        return
+    points = state["points"]
+    # Sem o tamanho do pixel aqui: os segmentos são geométricos, o texto é o gravado
+    medida = kind.calcular(points, (1.0, 1.0), False)
+    color = QColor(state["color"])
+    dashed = QPen(color, 3, Qt.PenStyle.CustomDashLine)
+    dashed.setDashPattern([4, 3])
+    painter.setPen(dashed)
+    for (x1, y1), (x2, y2) in medida.segmentos:
+        painter.drawLine(QPointF(x1, y1), QPointF(x2, y2))
+    painter.setPen(QPen(color, 3))
+    for (x1, y1), (x2, y2) in zip(points[0::2], points[1::2]):
+        painter.drawLine(QPointF(x1, y1), QPointF(x2, y2))
+
+    painter.setPen(QPen(QColor("black"), 1))
+    painter.setBrush(QColor("red"))
+    for x, y in points:
+        painter.drawEllipse(QPointF(x, y), POINT_RADIUS, POINT_RADIUS)
+    painter.setBrush(Qt.BrushStyle.NoBrush)
+
+    painter.setFont(QFont("Arial", 20, QFont.Weight.Bold))
+    painter.setPen(color)
+    x, y = medida.ancora[0] + 5, medida.ancora[1] + 5
+    painter.drawText(QRectF(x + TEXT_MARGIN, y + TEXT_MARGIN, 600, 80),
+                     Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, state.get("text") or medida.texto)
+
+
+def render_study(job):
+    """Decodifica, desenha e grava uma imagem. Retorna (caminho, ms, megapixels, erro)."""
+    from PyQt6.QtGui import QImage, QImageWriter, QPainter
+
+    path, states, out_path, scale, fmt, quality = job
+    t0 = time.perf_counter()
+    try:
+        image, width, height = read_image(path, scale)
+        image = image.convertToFormat(QImage.Format.Format_RGB888)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.scale(image.width() / width, image.height() / height)
+        draw_annotations(painter, states, width, height)
+        painter.end()
+        writer = QImageWriter(out_path, fmt.encode())
+        if fmt == "JPEG":
+            writer.setQuality(quality)
+        if not writer.write(image):
+            raise OSError(writer.errorString())
+    except Exception as e:  # arquivo corrompido, pydicom ausente, disco cheio...
+        return path, (time.perf_counter() - t0) * 1000, 0.0, str(e)
+    return path, (time.perf_counter() - t0) * 1000, width * height / 1e6, None
+
+
+def output_names(studies, suffix, ext):
+    """
+    Nome de saída de cada estudo: <nome><suffix><ext>, com a extensão de origem quando dois
+    estudos têm o mesmo nome (a.png e a.dcm viram a_png_cobb.png e a_dcm_cobb.png).
+    """
+    stems = {}
+    for path in studies:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        stems[stem.lower()] = stems.get(stem.lower(), 0) + 1
+    names, used = {}, set()
+    for path in studies:
+        stem, source_ext = os.path.splitext(os.path.basename(path))
+        if stems[stem.lower()] > 1:
+            stem = f"{stem}_{source_ext.lstrip('.').lower()}"
+        name, n = stem + suffix + ext, 1
+        while name.lower() in used:  # ainda repetido (ex.: a.png, a.PNG): numera
+            n += 1
+            name = f"{stem}{suffix}_{n}{ext}"
+        used.add(name.lower())
+        names[path] = name
+    return names
+
+
+def export_all(studies, store, output_dir, fmt="png", scale=1.0, quality=90, workers=None,
+               only_annotated=False, suffix="_cobb", out=sys.stderr):
+    """Exporta os estudos em paralelo, com progresso por imagem e vazão ao final."""
+    writer_fmt, ext = FORMATS[fmt]
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    names = output_names(studies, suffix, ext)
+    for path in studies:
+        states = store.load(path)
+        if only_annotated and not states:
+            continue
+        jobs.append((path, states, os.path.join(output_dir, names[path]), scale, writer_fmt, quality))
+    if not jobs:
+        print("Nenhum estudo para exportar.", file=out)
+        return 0, 0
+
+    t0 = time.perf_counter()
+    done = failed = 0
+    megapixels = 0.0
+    # spawn: cada processo começa limpo, sem estado do Qt herdado do processo principal
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers or os.cpu_count(), initializer=init_worker) as pool:
+        for path, ms, mp, error in pool.imap_unordered(render_study, jobs):
+            done += 1
+            megapixels += mp
+            name = os.path.basename(path)
+            if error:
+                failed += 1
+                print(f"[{done}/{len(jobs)}] {name}: erro: {error}", file=out)
+            else:
+                print(f"[{done}/{len(jobs)}] {name} {ms:.0f} ms", file=out)
+    secs = time.perf_counter() - t0
+    print(f"{done - failed} imagens em {secs:.1f} s: {(done - failed) / secs:.2f} imagens/s, "
+          f"{megapixels / secs:.1f} MP/s", file=out)
+    return done - failed, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exportação em lote das imagens anotadas.")
+    parser.add_argument("input", help="diretório com as imagens (PNG, JPEG, BMP ou DICOM)")
+    parser.add_argument("-o", "--output", help="diretório de saída (padrão: <input>/anotadas)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="png")
+    parser.add_argument("--scale", type=float, default=1.0, help="escala de saída (ex.: 0.5)")
+    parser.add_argument("--quality", type=int, default=90, help="qualidade do JPEG (0–100)")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="banco de anotações")
+    parser.add_argument("--only-annotated", action="store_true", help="ignora estudos sem anotações")
+    args = parser.parse_args(argv)
+
+    store = AnnotationStore(args.db)
+    try:
+        _, failed = export_all(
+            list_studies(args.input), store, args.output or os.path.join(args.input, "anotadas"),
+            args.format, args.scale, args.quality, args.workers, args.only_annotated,
+        )
+    finally:
+        store.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
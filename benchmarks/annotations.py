@@ -0,0 +1,109 @@
+"""
+Benchmark do AnnotationStore: gravação completa, gravação incremental de uma edição,
+leitura do estudo e reconstrução da cena com centenas de ângulos.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.annotations --angles 500 --edits 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("COBB_ANNOTATIONS_DB", ":memory:")  # não grava no banco do usuário
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QImage, QColor
+
+import main
+from annotations import AnnotationStore
+from tiles import ImagePyramid
+
+
+def synthetic_state(n, width=2000, height=6000):
+    step = height / (n + 2)
+    return [
+        {
+            "uid": f"bench{i:06d}",
+            "points": [(600, step * (i + 1)), (1400, step * (i + 1) + 40),
+                       (600, step * (i + 1.5)), (1400, step * (i + 1.5) - 40)],
+            "color": "#0000ff",
+            "font_size": 26,
+            "text_pos": (1000, step * (i + 1.25)),
+            "angle": 3.8,
+        }
+        for i in range(n)
+    ]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def run(n_angles, edits):
+    with tempfile.TemporaryDirectory() as tmp:
+        study = os.path.join(tmp, "estudo.png")
+        store = AnnotationStore(os.path.join(tmp, "anotacoes.sqlite"))
+        state = synthetic_state(n_angles)
+
+        full_ms = timed(lambda: store.save(study, state), 5)
+
+        def edit(i=[0]):
+            entry = dict(state[i[0] % n_angles])
+            entry["points"] = [(x + 1, y) for x, y in entry["points"]]
+            store.save(study, [entry])
+            i[0] += 1
+        edit_ms = timed(edit, edits)
+        load_ms = timed(lambda: store.load(study), 20)
+        size_kb = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)
+                      if name.startswith("anotacoes")) / 1024
+
+        # Reconstrução da cena: leitura do banco + criação de todos os itens
+        viewer = main.ImageViewer()
+        viewer.annotation_store = store
+        image = QImage(2000, 6000, QImage.Format.Format_Grayscale8)
+        image.fill(QColor(0, 0, 0))
+        pyramid = ImagePyramid.from_image(image)
+
+        def reopen():
+            viewer.show_study(pyramid, None, study)
+            viewer.restore_annotations(viewer.load_annotations(study))
+        reopen_ms = timed(reopen, 5)
+        assert len(viewer.cobb_angles) == n_angles
+
+        # Arraste de um ponto: gravação incremental disparada pelo visualizador
+        point = viewer.cobb_angles[0].line1.p2
+
+        def drag(i=[0]):
+            i[0] += 1
+            point.setPos(point.pos().x() + 1, point.pos().y())
+            viewer.scene.scheduler.flush()
+            viewer.persist_annotations()
+        drag_ms = timed(drag, edits)
+        viewer.close_study()
+        store.close()
+
+    print(f"ângulos: {n_angles}  banco: {size_kb:.0f} KB")
+    print(f"gravação completa: {full_ms:.2f} ms")
+    print(f"gravação incremental (1 ângulo): {edit_ms:.3f} ms")
+    print(f"leitura do estudo: {load_ms:.2f} ms")
+    print(f"reabertura (leitura + reconstrução da cena): {reopen_ms:.1f} ms")
+    print(f"arraste + gravação incremental pelo visualizador: {drag_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--angles", type=int, default=500)
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    run(args.angles, args.edits)
@@ -0,0 +1,49 @@
+"""
+Benchmark de vazão do cálculo em lote (estudos por segundo).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.batch --studies 200000 --workers 1 2 4 8
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+import batch
+
+
+def write_synthetic(path, n, seed=0):
+    """Gera n estudos com duas linhas de placa terminal inclinadas aleatoriamente."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["study"] + [f"{c}{i}" for i in range(1, 5) for c in "xy"])
+        for i in range(n):
+            y1, y2 = rng.uniform(500, 2000), rng.uniform(3000, 5000)
+            row = [f"s{i}"]
+            for y in (y1, y2):
+                dy = rng.uniform(-300, 300)
+                row += [600, round(y, 2), 1400, round(y + dy, 2)]
+            writer.writerow(row)
+
+
+def run(n, workers_list):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pontos.csv")
+        write_synthetic(path, n)
+        for workers in workers_list:
+            t0 = time.perf_counter()
+            count = sum(1 for _ in batch.measure_all(batch.read_records(path), workers))
+            elapsed = time.perf_counter() - t0
+            print(f"workers={workers:>2}  {count} estudos em {elapsed:.2f} s  "
+                  f"({count / elapsed:,.0f} estudos/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--studies", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+    run(args.studies, args.workers)
@@ -0,0 +1,51 @@
+"""
+Benchmark da análise de várias curvas: todos os ângulos par a par numa chamada vetorizada
+contra um ângulo por vez (geometry.angulo_cobb), para uma linha por placa vertebral.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.curves --lines 34 68 200
+"""
+import argparse
+import math
+import timeit
+
+import curves
+import geometry
+
+
+def synthetic_lines(n, amplitude=25.0):
+    """n placas de cima para baixo com inclinação em S (curva torácica e lombar)."""
+    lines = []
+    for k in range(n):
+        tilt = math.radians(amplitude * math.sin(2 * math.pi * k / max(1, n - 1)))
+        y = 100 + k * 50
+        dx, dy = 40 * math.cos(tilt), 40 * math.sin(tilt)
+        lines.append(((500 - dx, y - dy), (500 + dx, y + dy)))
+    return lines
+
+
+def per_pair(lines):
+    n = len(lines)
+    return [geometry.angulo_cobb(*lines[i], *lines[j]) for i in range(n) for j in range(i + 1, n)]
+
+
+def run(sizes, repeat):
+    print(f"{'placas':>7} {'pares':>7} {'vetorizado':>12} {'um por vez':>12} {'análise':>10}")
+    for n in sizes:
+        lines = synthetic_lines(n)
+        pairs = n * (n - 1) // 2
+        vec = min(timeit.repeat(lambda: curves.angulos_par_a_par(lines), number=1, repeat=repeat))
+        loop = min(timeit.repeat(lambda: per_pair(lines), number=1, repeat=repeat))
+        full = min(timeit.repeat(lambda: curves.analisar_curvas(lines), number=1, repeat=repeat))
+        print(f"{n:>7} {pairs:>7} {vec * 1000:>9.2f} ms {loop * 1000:>9.2f} ms {full * 1000:>7.2f} ms")
+    found, _ = curves.analisar_curvas(synthetic_lines(34))
+    for curva in curves.maiores_por_regiao(found).values():
+        print(f"  {curva}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, nargs="+", default=[34, 68, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.lines, args.repeat)
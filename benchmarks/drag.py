@@ -0,0 +1,83 @@
+"""
+Benchmark de arraste de pontos: conta chamadas de calculate_angle e mede a latência por passo.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.drag --angles 12 --steps 200 --moves-per-frame 4
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("COBB_ANNOTATIONS_DB", ":memory:")  # não grava no banco do usuário
+
+from PyQt6.QtWidgets import QApplication, QGraphicsPixmapItem
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import Qt, QPointF
+
+import main
+
+
+def build_viewer(n_angles, width=2000, height=6000):
+    """Cria um ImageViewer com imagem sintética e n_angles ângulos de Cobb encadeados."""
+    viewer = main.ImageViewer()
+    pixmap = QPixmap(width, height)
+    pixmap.fill(Qt.GlobalColor.black)
+    viewer.pixmap_item = QGraphicsPixmapItem(pixmap)
+    viewer.scene.addItem(viewer.pixmap_item)
+
+    step = height / (n_angles + 2)
+    for i in range(n_angles):
+        viewer.enable_add_angle()
+        y = step * (i + 1)
+        for x, dy in [(600, 0), (1400, 40), (600, step / 2), (1400, step / 2 - 40)]:
+            viewer.scene.addPoint(QPointF(x, y + dy))
+    viewer.scene.scheduler.flush()
+    return viewer
+
+
+def run(n_angles, steps, moves_per_frame):
+    viewer = build_viewer(n_angles)
+
+    calls = 0
+    original = main.CobbAngleItem.calculate_angle
+
+    def counted(self):
+        nonlocal calls
+        calls += 1
+        return original(self)
+
+    main.CobbAngleItem.calculate_angle = counted
+    try:
+        point = viewer.cobb_angles[0].line1.p2
+        start = point.pos()
+        latencies = []
+        for i in range(steps):
+            t0 = time.perf_counter()
+            # Vários eventos de movimento chegam antes de um único ciclo do event loop
+            for j in range(moves_per_frame):
+                point.setPos(start + QPointF(i + j / moves_per_frame, (i % 20) - 10))
+            viewer.scene.scheduler.flush()
+            latencies.append((time.perf_counter() - t0) * 1000)
+    finally:
+        main.CobbAngleItem.calculate_angle = original
+
+    latencies.sort()
+    print(f"ângulos: {n_angles}  passos: {steps}  movimentos por frame: {moves_per_frame}")
+    print(f"calculate_angle: {calls} chamadas ({calls / steps:.2f} por frame)")
+    print(f"latência por frame: média {statistics.mean(latencies):.3f} ms  "
+          f"p50 {latencies[len(latencies) // 2]:.3f} ms  "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--angles", type=int, default=12)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--moves-per-frame", type=int, default=4)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    run(args.angles, args.steps, args.moves_per_frame)
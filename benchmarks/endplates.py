@@ -0,0 +1,92 @@
+"""
+Benchmark da detecção de placas vertebrais: tempo por imagem (nível de trabalho + detecção),
+vazão com vários processos e erro do ângulo sugerido numa coluna sintética de inclinação conhecida.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.endplates --size 3000 9000 --images 8 --workers 4
+"""
+import argparse
+import math
+import os
+import statistics
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+import endplates
+
+
+def synthetic_spine(width, height, amplitude=20.0, seed=0):
+    """Radiografia sintética: 17 vértebras retangulares com inclinação senoidal (graus)."""
+    rng = np.random.default_rng(seed)
+    image = np.full((height, width), 35, dtype=np.uint8)
+    n = 17
+    pitch = height * 0.85 / n
+    vw, vh = width * 0.11, pitch * 0.7
+    tilts = [amplitude * math.sin(math.pi * (i + 0.5) / n * 1.6 + seed) for i in range(n)]
+    for i, tilt in enumerate(tilts):
+        cx = width / 2 + width * 0.08 * math.sin(math.pi * i / n * 1.6 + seed)
+        cy = height * 0.08 + pitch * (i + 0.5)
+        r = int(math.hypot(vw, vh) / 2) + 2
+        y0, y1 = int(max(0, cy - r)), int(min(height, cy + r))
+        x0, x1 = int(max(0, cx - r)), int(min(width, cx + r))
+        yy, xx = np.mgrid[y0:y1, x0:x1]
+        c, s = math.cos(math.radians(tilt)), math.sin(math.radians(tilt))
+        u = (xx - cx) * c + (yy - cy) * s
+        v = -(xx - cx) * s + (yy - cy) * c
+        block = (np.abs(u) <= vw / 2) & (np.abs(v) <= vh / 2)
+        image[y0:y1, x0:x1][block] = 190
+    noise = rng.normal(0, 6, image.shape)
+    image = np.clip(image + noise, 0, 255).astype(np.uint8)
+    return image, max(tilts) - min(tilts)
+
+
+def downsample(image, max_size=2048):
+    """Reduz pela metade até caber em max_size, como os níveis de tiles.ImagePyramid."""
+    scale = 1
+    while max(image.shape) > max_size:
+        h, w = image.shape[0] // 2 * 2, image.shape[1] // 2 * 2
+        image = image[:h, :w].reshape(h // 2, 2, w // 2, 2).mean(axis=(1, 3)).astype(np.uint8)
+        scale *= 2
+    return image, scale
+
+
+def detect_one(args):
+    image, scale = args
+    t0 = time.perf_counter()
+    result = endplates.detect_endplates(image, scale)
+    return (time.perf_counter() - t0) * 1000, result.angle, len(result.lines)
+
+
+def run(width, height, n_images, workers):
+    samples = []
+    for seed in range(n_images):
+        image, truth = synthetic_spine(width, height, seed=seed)
+        reduced, scale = downsample(image)
+        samples.append((reduced, scale, truth))
+
+    results = [detect_one((reduced, scale)) for reduced, scale, _ in samples]
+    times = [ms for ms, _, _ in results]
+    print(f"imagem {width}x{height} -> nível de trabalho {samples[0][0].shape[1]}x{samples[0][0].shape[0]}")
+    print(f"detecção por imagem: mediana {statistics.median(times):.1f} ms  máximo {max(times):.1f} ms")
+    for (_, _, truth), (_, angle, n_lines) in zip(samples, results):
+        found = f"{angle:.1f}°" if angle is not None else "nenhum par"
+        print(f"  verdadeiro {truth:5.1f}°  sugerido {found:>10}  ({n_lines} linhas candidatas)")
+
+    if workers > 1:
+        t0 = time.perf_counter()
+        with Pool(workers) as pool:
+            pool.map(detect_one, [(reduced, scale) for reduced, scale, _ in samples])
+        elapsed = time.perf_counter() - t0
+        print(f"{workers} processos: {n_images / elapsed:.1f} imagens/s "
+              f"(sequencial: {1000 * n_images / sum(times):.1f} imagens/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, nargs=2, default=[3000, 9000], metavar=("LARGURA", "ALTURA"))
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    run(args.size[0], args.size[1], args.images, args.workers)
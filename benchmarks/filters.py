@@ -0,0 +1,66 @@
+"""
+Benchmark do realce de contraste numa imagem de 100 MP: tabela pontual (janela/nível, gama,
+inversão), CLAHE, geração da pirâmide e a troca de parâmetros já calculados (cache).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.filters --size 10000 10000 --repeat 3
+"""
+import argparse
+import time
+
+import numpy as np
+
+import filters
+from buffers import ImageBuffer
+from tiles import ImagePyramid
+
+CASES = [
+    ("janela/nível + gama", filters.FilterParams(center=110, width=160, gamma=1.4)),
+    ("inversão", filters.FilterParams(invert=True)),
+    ("CLAHE", filters.FilterParams(clahe=True)),
+    ("CLAHE + janela/gama/inversão", filters.FilterParams(center=110, width=160, gamma=1.4, invert=True, clahe=True)),
+]
+
+
+def synthetic(width, height, seed=0):
+    """Gradiente suave com blocos claros e ruído, em faixas para não pedir vários GB de temporários."""
+    rng = np.random.default_rng(seed)
+    image = np.empty((height, width), dtype=np.uint8)
+    xs = np.arange(width, dtype=np.float32)
+    for y0 in range(0, height, 1024):
+        ys = np.arange(y0, min(height, y0 + 1024), dtype=np.float32)[:, None]
+        band = 60 + 40 * np.sin(xs / width * 6) + 30 * np.cos(ys / height * 9)
+        band += ((ys // (height / 40)) % 2 == 0) * ((np.abs(xs - width / 2) < width / 10) * 70)
+        band += rng.normal(0, 8, band.shape)
+        image[y0:y0 + len(ys)] = np.clip(band, 0, 255)
+    return image
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000, result
+
+
+def run(width, height, repeat):
+    image = synthetic(width, height)
+    print(f"imagem {width}x{height} ({width * height / 1e6:.0f} MP)")
+    print(f"{'filtro':<30} {'filtro':>10} {'pirâmide':>10} {'cache':>10}")
+    cache = filters.FilterCache(budget_bytes=8 * 1024 ** 3)
+    for name, params in CASES:
+        filter_ms, array = best(lambda: filters.apply_filters(image, params), repeat)
+        pyramid_ms, pyramid = best(lambda: ImagePyramid.from_buffers([ImageBuffer(array)]), 1)
+        cache.put(params, pyramid, sum(level.sizeInBytes() for level in pyramid.levels))
+        hit_ms, _ = best(lambda: cache.get(params), repeat)
+        print(f"{name:<30} {filter_ms:>7.0f} ms {pyramid_ms:>7.0f} ms {hit_ms:>7.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, nargs=2, default=[10000, 10000], metavar=("LARGURA", "ALTURA"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.size[0], args.size[1], args.repeat)
@@ -0,0 +1,63 @@
+"""
+Microbenchmark: kernel vetorizado (cobb_vetorizado) contra as funções escalares por item.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.geometry --sizes 1 12 100 10000
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+import geometry
+
+LARGURA, ALTURA = 2000, 6000
+
+
+def synthetic(n, seed=0):
+    rng = np.random.default_rng(seed)
+    pts = np.empty((n, 4, 2))
+    pts[:, [0, 2], 0] = 600
+    pts[:, [1, 3], 0] = 1400
+    pts[:, 0, 1] = rng.uniform(500, 2000, n)
+    pts[:, 2, 1] = rng.uniform(3000, 5000, n)
+    pts[:, 1, 1] = pts[:, 0, 1] + rng.uniform(-300, 300, n)
+    pts[:, 3, 1] = pts[:, 2, 1] + rng.uniform(-300, 300, n)
+    pts[::7, 3, 1] = pts[::7, 2, 1] + (pts[::7, 1, 1] - pts[::7, 0, 1])  # alguns pares paralelos
+    return pts
+
+
+def per_item(pontos):
+    """Mesmo trabalho que CobbAngleItem.calculate_angle, um par de linhas por vez."""
+    for p1, p2, q1, q2 in pontos:
+        geometry.angulo_cobb(p1, p2, q1, q2)
+        encontro = geometry.ponto_interseccao(p1, p2, q1, q2)
+        if encontro is not None:
+            geometry.prolongar_reta_para_encontro(p1, p2, encontro, LARGURA, ALTURA)
+            geometry.prolongar_reta_para_encontro(q1, q2, encontro, LARGURA, ALTURA)
+
+
+def run(sizes, repeat):
+    for n in sizes:
+        pts = synthetic(n)
+        as_tuples = [[tuple(p) for p in quad] for quad in pts.tolist()]
+
+        # Confere se o kernel reproduz as funções escalares
+        angulos, _, _ = geometry.cobb_vetorizado(pts, LARGURA, ALTURA)
+        esperado = [geometry.angulo_cobb(*quad) for quad in as_tuples]
+        assert np.allclose(angulos, esperado, atol=1e-4), "cobb_vetorizado diverge de angulo_cobb"
+
+        number = max(1, 100_000 // n)
+        t_item = min(timeit.repeat(lambda: per_item(as_tuples), number=number, repeat=repeat)) / number
+        t_vec = min(timeit.repeat(lambda: geometry.cobb_vetorizado(pts, LARGURA, ALTURA),
+                                  number=number, repeat=repeat)) / number
+        print(f"N={n:>6}  por item {t_item * 1e6:10.1f} µs  vetorizado {t_vec * 1e6:10.1f} µs  "
+              f"({t_item / t_vec:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 12, 100, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
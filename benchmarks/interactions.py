@@ -0,0 +1,290 @@
+"""
+Suíte de interações gravadas do ImageViewer (plataforma offscreen): percentis de latência,
+pico de memória e comparação com uma linha de base gravada para detectar regressões.
+
+Cenários, para cada tamanho de radiografia sintética:
+    pontos         CustomScene.addPoint (4 cliques por ângulo)
+    arraste        arraste longo de um ponto (LineConnection.wrap_item_change + UpdateScheduler)
+    zoom           varredura de ZoomableGraphicsView.apply_zoom para dentro e para fora
+    redimensionar  resizeEvent com novo enquadramento da imagem
+    exportacao     exportação da cena (caminho de save_image, sem diálogos)
+    sessao         reprodução de um registro COBB_SESSION_LOG (opcional, --session)
+
+O --session espera um registro gravado a partir de um estudo sem anotações: a reprodução roda
+sobre a imagem sintética, onde só existe o que o próprio registro cria. Eventos sobre ângulos,
+placas ou medidas de fora do registro (anotações salvas do estudo original) são descartados
+antes da medição, junto com os desfazer/refazer correspondentes, e a contagem é informada.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.interactions --save-baseline benchmarks/baseline_interacoes.json
+    python -m benchmarks.interactions --baseline benchmarks/baseline_interacoes.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("COBB_ANNOTATIONS_DB", ":memory:")  # não grava no banco do usuário
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QPointF
+
+import main
+from history import load_session
+from memory import process_memory_mb
+from benchmarks.render import synthetic_pyramid
+
+SIZES = [(2000, 6000), (6000, 16000)]
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, p):
+    """Percentil pelo posto mais próximo (valores já ordenados)."""
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def settle(app):
+    app.processEvents()
+    app.processEvents()
+
+
+class Recorder:
+    """Latências de um cenário e o maior RSS visto durante ele."""
+    def __init__(self):
+        self.latencies = []
+        self.peak_mb = process_memory_mb()
+
+    def step(self, fn, app=None):
+        t0 = time.perf_counter()
+        fn()
+        if app is not None:
+            settle(app)  # inclui a repintura que o passo provocou
+        self.latencies.append((time.perf_counter() - t0) * 1000)
+        self.peak_mb = max(self.peak_mb, process_memory_mb())
+
+    def result(self):
+        values = sorted(self.latencies)
+        out = {f"p{p}": round(percentile(values, p), 3) for p in PERCENTILES}
+        out.update(max=round(values[-1], 3), n=len(values), pico_mb=round(self.peak_mb, 1))
+        return out
+
+
+def scenario_points(app, viewer, n_angles):
+    rec = Recorder()
+    w, h = viewer.pixmap_item.boundingRect().width(), viewer.pixmap_item.boundingRect().height()
+    step = h / (n_angles + 2)
+    for i in range(n_angles):
+        viewer.enable_add_angle()
+        y = step * (i + 1)
+        for fx, dy in [(0.3, 0), (0.7, 0.1 * step), (0.3, step / 2), (0.7, step / 2 - 0.1 * step)]:
+            rec.step(lambda: viewer.scene.addPoint(QPointF(fx * w, y + dy)), app)
+    return rec
+
+
+def scenario_drag(app, viewer, steps):
+    rec = Recorder()
+    point = viewer.cobb_angles[len(viewer.cobb_angles) // 2].line1.p2
+    origin = point.pos()
+    viewer.view.centerOn(point)
+    for i in range(steps):
+        # Vários eventos de movimento por quadro, como num arraste real
+        def move(i=i):
+            for j in range(4):
+                point.setPos(origin + QPointF(i % 80 + j / 4, (i % 20) - 10))
+            viewer.scene.scheduler.flush()
+        rec.step(move, app)
+    point.setPos(origin)
+    viewer.scene.scheduler.flush()
+    return rec
+
+
+def scenario_zoom(app, viewer, steps):
+    rec = Recorder()
+    for i in range(steps):
+        factor = 1.1 if (i // 15) % 2 == 0 else 1 / 1.1
+        rec.step(lambda: viewer.view.apply_zoom(factor), app)
+    return rec
+
+
+def scenario_resize(app, viewer, steps):
+    rec = Recorder()
+    for i in range(steps):
+        size = (1600, 1000) if i % 2 else (1200, 800)
+        rec.step(lambda: viewer.resize(*size), app)
+    return rec
+
+
+def scenario_export(app, viewer, repeats, scale):
+    rec = Recorder()
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(repeats):
+            def export():
+                viewer.export_scene(os.path.join(tmp, f"export_{i}.png"), "PNG", scale)
+                while viewer.export_job is not None:
+                    app.processEvents()
+                    time.sleep(0.001)
+            rec.step(export)
+    return rec
+
+
+def self_contained(events):
+    """
+    Eventos do registro que só citam uids criados nele mesmo, e quantos foram descartados.
+    Desfazer/refazer seguem uma pilha simulada: desfazer um evento descartado também é descartado.
+    """
+    known, kept, done, undone = set(), [], [], []
+    for event in events:
+        op = event["op"]
+        if op in ("undo", "redo"):
+            source, target = (done, undone) if op == "undo" else (undone, done)
+            if not source:
+                continue
+            keep = source.pop()
+            target.append(keep)
+            if keep:
+                kept.append(event)
+            continue
+        if op == "move":
+            refs = [event["line"] if "line" in event else event["uid"]]
+        elif op == "replace":
+            refs = event["remove"]
+        else:
+            refs = event.get("uids", ())
+        keep = known.issuperset(refs)
+        if keep:
+            kept.append(event)
+            for state in (*event.get("angles", ()), *event.get("add", ())):
+                known.add(state["uid"])
+            for entry in (*event.get("lines", ()), *event.get("measurements", ())):
+                known.add(entry["uid"])
+                known.update(entry.get("lines", ()))
+        done.append(keep)  # no original, todo evento registrado entrou no histórico
+        undone.clear()
+    return kept, len(events) - len(kept)
+
+
+def scenario_session(app, viewer, events):
+    rec = Recorder()
+    viewer.history.clear()  # desfazer no registro não alcança os ângulos dos outros cenários
+    log, viewer.session_log = viewer.session_log, None
+    try:
+        for event in events:
+            def replay(event=event):
+                viewer.replay_event(event)
+                viewer.scene.scheduler.flush()
+            rec.step(replay, app)
+    finally:
+        viewer.session_log = log
+    return rec
+
+
+def run(app, sizes, n_angles, steps, export_scale, session):
+    results = {}
+    for width, height in sizes:
+        viewer = main.ImageViewer()
+        viewer.resize(1600, 1000)
+        viewer.show()
+        viewer.show_study(synthetic_pyramid(width, height))
+        settle(app)
+        key = f"{width}x{height}"
+        scenarios = {
+            "pontos": scenario_points(app, viewer, n_angles),
+            "arraste": scenario_drag(app, viewer, steps),
+            "zoom": scenario_zoom(app, viewer, steps),
+            "redimensionar": scenario_resize(app, viewer, max(20, steps // 5)),
+            "exportacao": scenario_export(app, viewer, 3, export_scale),
+        }
+        if session:
+            scenarios["sessao"] = scenario_session(app, viewer, session)
+        results[key] = {name: rec.result() for name, rec in scenarios.items()}
+        viewer.close_study()
+        viewer.close()
+        viewer.deleteLater()
+        settle(app)
+    return results
+
+
+def best_of(runs):
+    """Por cenário, o menor valor de cada métrica entre as repetições (a menos afetada por ruído)."""
+    merged = {}
+    for key, scenarios in runs[0].items():
+        merged[key] = {}
+        for name in scenarios:
+            values = [run[key][name] for run in runs]
+            merged[key][name] = {metric: min(v[metric] for v in values) for metric in values[0]}
+    return merged
+
+
+def report(results):
+    print(f"{'imagem':<12} {'cenário':<14} " + " ".join(f"{f'p{p}':>9}" for p in PERCENTILES)
+          + f" {'máx':>9} {'n':>5} {'pico':>9}")
+    for key, scenarios in results.items():
+        for name, r in scenarios.items():
+            print(f"{key:<12} {name:<14} " + " ".join(f"{r[f'p{p}']:>6.2f} ms" for p in PERCENTILES)
+                  + f" {r['max']:>6.1f} ms {r['n']:>5} {r['pico_mb']:>6.0f} MB")
+
+
+def compare(results, baseline, tolerance, floor_ms):
+    """Regressões: p50/p95 acima da base em mais de tolerance (e de floor_ms, contra ruído)."""
+    regressions = []
+    for key, scenarios in results.items():
+        for name, r in scenarios.items():
+            base = baseline.get(key, {}).get(name)
+            if base is None:
+                continue
+            for metric in ("p50", "p95"):
+                old, new = base[metric], r[metric]
+                if new > old * (1 + tolerance) and new - old > floor_ms:
+                    regressions.append(f"{key} {name} {metric}: {old:.2f} -> {new:.2f} ms "
+                                       f"(+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+            if r["pico_mb"] > base["pico_mb"] * (1 + tolerance):
+                regressions.append(f"{key} {name} pico: {base['pico_mb']:.0f} -> {r['pico_mb']:.0f} MB")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=[f"{w}x{h}" for w, h in SIZES], help="ex.: 2000x6000")
+    parser.add_argument("--angles", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--export-scale", type=float, default=0.25)
+    parser.add_argument("--repeat", type=int, default=3, help="repetições; vale o melhor percentil")
+    parser.add_argument("--session", help="registro JSONL gravado com COBB_SESSION_LOG para reproduzir")
+    parser.add_argument("--baseline", help="compara com esta linha de base (sai com código 1 se regredir)")
+    parser.add_argument("--save-baseline", help="grava os resultados como linha de base")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="aumento relativo tolerado (0.2 = 20%%)")
+    parser.add_argument("--floor-ms", type=float, default=0.5, help="diferença mínima em ms para contar")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    sizes = [tuple(int(v) for v in size.lower().split("x")) for size in args.sizes]
+    session = None
+    if args.session:
+        session, dropped = self_contained(load_session(args.session))
+        if dropped:
+            print(f"Registro: {dropped} evento(s) sobre anotações de fora do registro descartado(s).")
+    with contextlib.redirect_stdout(io.StringIO()):  # mensagens de cada clique e exportação
+        results = best_of([run(app, sizes, args.angles, args.steps, args.export_scale, session)
+                           for _ in range(args.repeat)])
+    report(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Linha de base gravada em {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.floor_ms)
+        if regressions:
+            print("Regressões:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("Sem regressões em relação à linha de base.")
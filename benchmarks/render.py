@@ -0,0 +1,115 @@
+"""
+Benchmark de repintura: quadros por segundo ao arrastar um ponto, dar zoom e rolar sobre
+uma imagem grande com muitos ângulos, com e sem o cache de renderização dos itens.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.render --size 6000 16000 --angles 40 --frames 120
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("COBB_ANNOTATIONS_DB", ":memory:")  # não grava no banco do usuário
+
+from PyQt6.QtWidgets import QApplication, QGraphicsItem
+from PyQt6.QtGui import QImage, QPainter, QColor
+from PyQt6.QtCore import QPointF
+
+import main
+from profiling import profiler
+from tiles import ImagePyramid
+
+# (nome, fundo em cache, cache dos itens de anotação)
+MODES = [
+    ("sem cache", False, QGraphicsItem.CacheMode.NoCache),
+    ("só itens", False, QGraphicsItem.CacheMode.DeviceCoordinateCache),
+    ("fundo + itens (padrão)", True, QGraphicsItem.CacheMode.DeviceCoordinateCache),
+]
+
+
+def synthetic_pyramid(width, height):
+    image = QImage(width, height, QImage.Format.Format_Grayscale8)
+    image.fill(QColor(30, 30, 30))
+    painter = QPainter(image)
+    block = height // 24
+    for i in range(20):
+        painter.fillRect(width // 2 - block, block * (i + 2), 2 * block, int(block * 0.8), QColor(190, 190, 190))
+    painter.end()
+    return ImagePyramid.from_image(image)
+
+
+def build_viewer(pyramid, n_angles):
+    viewer = main.ImageViewer()
+    viewer.resize(1600, 1000)
+    viewer.show()
+    viewer.show_study(pyramid)
+    w, h = pyramid.width(), pyramid.height()
+    step = h / (n_angles + 2)
+    for i in range(n_angles):
+        y = step * (i + 1)
+        viewer.add_cobb_angle([(0.3 * w, y), (0.7 * w, y + 0.1 * step),
+                               (0.3 * w, y + step / 2), (0.7 * w, y + step / 2 - 0.1 * step)])
+    return viewer
+
+
+def settle(app):
+    # A cena agenda a atualização da view; dois ciclos garantem que a pintura aconteça
+    app.processEvents()
+    app.processEvents()
+
+
+def measure(app, view, frames, step):
+    """Quadros por segundo e tempo médio de pintura do viewport (ms)."""
+    time.sleep(0.3)  # deixa a view religar o cache do fundo depois do teste de zoom
+    settle(app)
+    view.paint_times.clear()
+    t0 = time.perf_counter()
+    for i in range(frames):
+        step(i)
+        settle(app)
+    elapsed = time.perf_counter() - t0
+    paints = list(view.paint_times)
+    return frames / elapsed, sum(paints) / len(paints) if paints else 0.0
+
+
+def run(app, width, height, n_angles, frames):
+    pyramid = synthetic_pyramid(width, height)
+    viewer = build_viewer(pyramid, n_angles)
+    view = viewer.view
+    view.apply_zoom(3.0)  # aproxima para que a imagem não caiba inteira na tela
+    view.centerOn(viewer.cobb_angles[n_angles // 2].text_item)
+    point = viewer.cobb_angles[n_angles // 2].line1.p2
+    origin = point.pos()
+
+    def drag(i):
+        point.setPos(origin + QPointF(i % 40, (i % 20) - 10))
+        viewer.scene.scheduler.flush()
+
+    def zoom(i):
+        view.apply_zoom(1.05 if (i // 10) % 2 == 0 else 1 / 1.05)
+
+    def pan(i):
+        bar = view.verticalScrollBar()
+        bar.setValue(bar.value() + (15 if (i // 20) % 2 == 0 else -15))
+
+    profiler.enabled = True  # preenche view.paint_times
+    print(f"imagem {width}x{height}, {n_angles} ângulos, {frames} quadros por teste")
+    print(f"{'modo':<24} {'arraste':>20} {'zoom':>20} {'rolagem':>20}")
+    for name, background, mode in MODES:
+        viewer.set_background_cache(background)
+        viewer.scene.set_item_cache_mode(mode)
+        results = [measure(app, view, frames, step) for step in (drag, zoom, pan)]
+        print(f"{name:<24} " + " ".join(f"{f:>6.0f} qps {ms:>6.2f} ms" for f, ms in results))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, nargs=2, default=[6000, 16000], metavar=("LARGURA", "ALTURA"))
+    parser.add_argument("--angles", type=int, default=40)
+    parser.add_argument("--frames", type=int, default=120)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    run(app, args.size[0], args.size[1], args.angles, args.frames)
@@ -0,0 +1,69 @@
+"""
+Benchmark do ajuste fino às bordas: tempo por ponto e erro até a borda verdadeira.
+
+Gera uma placa vertebral sintética (borda suave e inclinada, com ruído) numa imagem grande,
+desloca cliques alguns pixels ao longo da normal e mede endplates.snap_to_edge com e sem a
+direção da linha.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.snap --size 3000 9000 --points 2000 --noise 4
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+import endplates
+
+
+def synthetic_edge(width, height, tilt_deg, noise, seed=0):
+    """Imagem uint8 com uma borda escuro -> claro passando pelo centro, inclinada tilt_deg."""
+    rng = np.random.default_rng(seed)
+    tilt = math.radians(tilt_deg)
+    y = np.arange(height, dtype=np.float32)[:, None] - height / 2
+    x = np.arange(width, dtype=np.float32)[None, :] - width / 2
+    distance = y * math.cos(tilt) - x * math.sin(tilt)
+    image = 60 + 120 / (1 + np.exp(np.clip(-distance / 1.5, -50, 50)))
+    image += rng.normal(0, noise, image.shape).astype(np.float32)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def run(width, height, points, tilt_deg, noise, max_offset):
+    image = synthetic_edge(width, height, tilt_deg, noise)
+    tilt = math.radians(tilt_deg)
+    cx, cy = width / 2, height / 2
+    rng = np.random.default_rng(1)
+    print(f"imagem {width}x{height}, borda a {tilt_deg}°, ruído {noise}, "
+          f"{points} cliques a até {max_offset} px da borda")
+    for label, direction in (("sem linha (tensor de estrutura)", None),
+                             ("com a direção da linha", (math.cos(tilt), math.sin(tilt)))):
+        errors, times, missed = [], [], 0
+        for _ in range(points):
+            x = cx + rng.uniform(-width / 3, width / 3)
+            y = cy + (x - cx) * math.tan(tilt) + rng.uniform(-max_offset, max_offset)
+            t0 = time.perf_counter()
+            snapped = endplates.snap_to_edge(image, (x, y), direction)
+            times.append((time.perf_counter() - t0) * 1000)
+            if snapped is None:
+                missed += 1
+                continue
+            sx, sy = snapped
+            errors.append(abs((sy - cy) * math.cos(tilt) - (sx - cx) * math.sin(tilt)))
+        errors = np.asarray(errors)
+        times = np.asarray(times)
+        print(f"  {label}:")
+        print(f"    tempo por ponto: p50 {np.percentile(times, 50):.3f} ms  p99 {np.percentile(times, 99):.3f} ms")
+        print(f"    erro até a borda: média {errors.mean():.3f} px  p95 {np.percentile(errors, 95):.3f} px  "
+              f"máx {errors.max():.3f} px  ({missed} sem borda)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, nargs=2, default=[3000, 9000], metavar=("LARGURA", "ALTURA"))
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--tilt", type=float, default=7.3, help="inclinação da borda em graus")
+    parser.add_argument("--noise", type=float, default=4.0, help="desvio padrão do ruído")
+    parser.add_argument("--max-offset", type=float, default=5.0, help="erro máximo do clique em px")
+    args = parser.parse_args()
+    run(*args.size, args.points, args.tilt, args.noise, args.max_offset)
@@ -0,0 +1,91 @@
+"""
+Teste de resistência: abre muitas imagens grandes seguidas e verifica se a memória fica estável.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.soak --loads 50 --size 6000 4000 --tolerance 64
+Sai com código 1 se o RSS crescer mais que --tolerance MB depois do aquecimento.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("COBB_ANNOTATIONS_DB", ":memory:")  # não grava no banco do usuário
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QImage, QPainter, QColor
+from PyQt6.QtCore import QPointF
+
+import main
+from memory import process_memory_mb
+
+
+def write_synthetic(path, width, height, seed):
+    """Radiografia sintética: gradiente em tons de cinza com blocos claros (vértebras)."""
+    image = QImage(width, height, QImage.Format.Format_Grayscale8)
+    image.fill(QColor(20, 20, 20))
+    painter = QPainter(image)
+    block = height // 24
+    for i in range(20):
+        painter.fillRect(width // 2 - block + (seed * 7 + i * 13) % 40, block * (i + 2),
+                         2 * block, int(block * 0.8), QColor(180, 180, 180))
+    painter.end()
+    image.save(path)
+
+
+def wait_loaded(app, viewer, timeout=120):
+    t0 = time.perf_counter()
+    while viewer.load_task is not None:
+        app.processEvents()
+        if time.perf_counter() - t0 > timeout:
+            raise TimeoutError("carregamento não terminou")
+        time.sleep(0.005)
+
+
+def annotate(viewer):
+    """Adiciona um ângulo de Cobb para que a limpeza da cena também seja exercitada."""
+    rect = viewer.pixmap_item.boundingRect()
+    viewer.enable_add_angle()
+    for fx, fy in [(0.3, 0.3), (0.7, 0.32), (0.3, 0.6), (0.7, 0.55)]:
+        viewer.scene.addPoint(QPointF(rect.width() * fx, rect.height() * fy))
+
+
+def run(app, loads, width, height, files, warmup, tolerance):
+    viewer = main.ImageViewer()
+    viewer.show()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(files):
+            path = os.path.join(tmp, f"estudo{i}.png")
+            write_synthetic(path, width, height, i)
+            paths.append(path)
+
+        samples = []
+        for i in range(loads):
+            viewer.load_image(paths[i % files])
+            wait_loaded(app, viewer)
+            annotate(viewer)
+            viewer.view.viewport().repaint()
+            samples.append(process_memory_mb())
+            print(f"carga {i + 1:>3}: {samples[-1]:.0f} MB")
+
+    baseline = max(samples[:warmup])
+    growth = max(samples[warmup:], default=baseline) - baseline
+    print(f"base após aquecimento: {baseline:.0f} MB  crescimento máximo: {growth:.0f} MB")
+    return growth <= tolerance
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--loads", type=int, default=50)
+    parser.add_argument("--size", type=int, nargs=2, default=[6000, 4000], metavar=("W", "H"))
+    parser.add_argument("--files", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=64, help="crescimento máximo aceito (MB)")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    ok = run(app, args.loads, args.size[0], args.size[1], args.files, args.warmup, args.tolerance)
+    sys.exit(0 if ok else 1)
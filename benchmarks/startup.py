@@ -0,0 +1,63 @@
+"""
+Tempo de inicialização a frio: núcleo de geometria, CLI em lote, janela do visualizador
+e, opcionalmente, o executável gerado pelo PyInstaller.
+
+Cada caso roda num processo novo; o tempo é o de parede do processo inteiro. A janela
+encerra sozinha quando COBB_STARTUP_BENCHMARK está definido (ver main.py).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --exe dist/main/main.exe
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wall_ms(cmd, env, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL, timeout=120)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+def run(runs, exe=None):
+    env = dict(os.environ, COBB_STARTUP_BENCHMARK="1", COBB_ANNOTATIONS_DB=":memory:")
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "pontos.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("study,x1,y1,x2,y2,x3,y3,x4,y4\n")
+            for i in range(10):
+                f.write(f"e{i},600,{500 + i},1400,{540 + i},600,3000,1400,{2900 - i}\n")
+
+        cases = [
+            ("interpretador (python -c pass)", [sys.executable, "-c", "pass"]),
+            ("import geometry", [sys.executable, "-c", "import geometry"]),
+            ("CLI em lote (10 registros)", [sys.executable, "batch.py", csv_path]),
+            ("janela do visualizador", [sys.executable, "main.py"]),
+        ]
+        if exe:
+            cases.append((f"executável ({os.path.basename(exe)})", [os.path.abspath(exe)]))
+
+        print(f"{'caso':<34} {'mediana':>10} {'mínimo':>10}")
+        for name, cmd in cases:
+            median, best = wall_ms(cmd, env, runs)
+            print(f"{name:<34} {median:>8.0f} ms {best:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--exe", help="executável gerado pelo PyInstaller (modo pasta ou arquivo único)")
+    args = parser.parse_args()
+    run(args.runs, args.exe)
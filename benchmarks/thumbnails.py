@@ -0,0 +1,119 @@
+"""
+Benchmark das miniaturas: leitura reduzida, cache em disco e rolagem da coluna de miniaturas.
+
+Mede (1) a miniatura lida com setScaledSize contra a decodificação completa, (2) a leitura do
+cache em disco e (3) o tempo por quadro rolando a ThumbnailStrip por milhares de estudos,
+com quantas miniaturas foram de fato pedidas durante a rolagem.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.thumbnails --files 40 --size 4000 3000 --rows 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QImage, QColor, QPainter
+
+from thumbnails import THUMBNAIL_SIZE, ThumbnailDiskCache, ThumbnailStrip, cache_key, read_thumbnail
+
+
+def write_synthetic(path, width, height, seed):
+    image = QImage(width, height, QImage.Format.Format_Grayscale8)
+    image.fill(QColor(20, 20, 20))
+    painter = QPainter(image)
+    block = height // 24
+    for i in range(20):
+        painter.fillRect(width // 2 - block + (seed * 7 + i * 13) % 40, block * (i + 2),
+                         2 * block, int(block * 0.8), QColor(180, 180, 180))
+    painter.end()
+    image.save(path, quality=90)
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def timed(fn, paths):
+    t0 = time.perf_counter()
+    for path in paths:
+        fn(path)
+    return (time.perf_counter() - t0) * 1000 / len(paths)
+
+
+def run(app, files, width, height, rows, steps):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(files):
+            paths.append(os.path.join(tmp, f"estudo{i:04d}.jpg"))
+            write_synthetic(paths[-1], width, height, i)
+        disk = ThumbnailDiskCache(os.path.join(tmp, "cache"))
+
+        full = timed(lambda p: QImage(p), paths)
+        scaled = timed(lambda p: read_thumbnail(p, THUMBNAIL_SIZE), paths)
+        for path in paths:
+            disk.put(cache_key(path, THUMBNAIL_SIZE), read_thumbnail(path, THUMBNAIL_SIZE))
+        cached = timed(lambda p: disk.get(cache_key(p, THUMBNAIL_SIZE)), paths)
+        print(f"{files} JPEG {width}x{height}, miniatura de {THUMBNAIL_SIZE} px (ms por imagem):")
+        print(f"  decodificação completa {full:7.1f}")
+        print(f"  leitura reduzida       {scaled:7.1f}  ({full / scaled:.1f}x)")
+        print(f"  cache em disco         {cached:7.2f}  ({full / cached:.0f}x)")
+
+        # Rolagem: as mesmas imagens repetidas até rows linhas, cache em disco já quente
+        strip = ThumbnailStrip(disk_cache=disk)
+        strip.resize(strip.width(), 900)
+        strip.show()
+        model = strip.thumbnail_model
+        started = []
+        dispatch = model.dispatch
+
+        def counting_dispatch():
+            before = set(model.in_flight)
+            dispatch()
+            started.extend(set(model.in_flight) - before)
+
+        model.dispatch = counting_dispatch
+        # Caminhos distintos por linha (links) para que cada linha peça a sua miniatura
+        links = os.path.join(tmp, "links")
+        os.makedirs(links)
+        row_paths = []
+        for i in range(rows):
+            link = os.path.join(links, f"{i:06d}.jpg")
+            os.symlink(paths[i % files], link)
+            row_paths.append(link)
+        strip.sync(row_paths, -1)
+        app.processEvents()
+
+        bar = strip.verticalScrollBar()
+        frames = []
+        for k in range(steps + 1):
+            t0 = time.perf_counter()
+            bar.setValue(bar.maximum() * k // steps)
+            strip.viewport().repaint()
+            app.processEvents()
+            frames.append((time.perf_counter() - t0) * 1000)
+        t0 = time.perf_counter()
+        while model.in_flight and time.perf_counter() - t0 < 30:
+            app.processEvents()
+            time.sleep(0.002)
+        print(f"rolagem por {rows} linhas em {steps} quadros: p50 {percentile(frames, 50):.1f} ms  "
+              f"p95 {percentile(frames, 95):.1f} ms  máx {max(frames):.1f} ms")
+        print(f"  miniaturas pedidas: {len(started)} de {rows} linhas "
+              f"({len(model.pixmaps)} em memória)")
+        strip.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--size", type=int, nargs=2, default=[4000, 3000], metavar=("LARGURA", "ALTURA"))
+    parser.add_argument("--rows", type=int, default=5000, help="linhas da coluna de miniaturas")
+    parser.add_argument("--steps", type=int, default=200, help="quadros da rolagem")
+    args = parser.parse_args()
+    app = QApplication(sys.argv)
+    run(app, args.files, *args.size, args.rows, args.steps)
@@ -0,0 +1,98 @@
+"""
+Benchmark da pasta monitorada: latência detecção -> pronto e vazão da ingestão.
+
+Grava N radiografias sintéticas numa pasta temporária (escrita fora e os.replace para dentro,
+como uma cópia atômica do PACS) enquanto o visualizador a monitora. Um leitor simulado avança
+na lista a cada --read-ms, liberando a fila de prontos (contrapressão).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.watchfolder --studies 40 --size 3000 2500 --interval-ms 50
+    python -m benchmarks.watchfolder --polling --poll-interval 0.2 --landmarks
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("COBB_ANNOTATIONS_DB", ":memory:")  # não grava no banco do usuário
+
+from PyQt6.QtWidgets import QApplication
+
+import main
+from benchmarks.soak import write_synthetic
+from memory import process_memory_mb
+
+
+def run(app, studies, width, height, interval_ms, read_ms, workers, max_ready, polling,
+        poll_interval, landmarks, timeout):
+    viewer = main.ImageViewer()
+    viewer.show()
+    with tempfile.TemporaryDirectory() as tmp:
+        inbox = os.path.join(tmp, "entrada")
+        staging = os.path.join(tmp, "gravando")
+        os.makedirs(inbox)
+        os.makedirs(staging)
+        for i in range(studies):
+            write_synthetic(os.path.join(staging, f"estudo{i:04d}.png"), width, height, i)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            watch = viewer.start_watch_folder(inbox, max_workers=workers, max_ready=max_ready,
+                                              propose_landmarks=landmarks, poll_interval=poll_interval,
+                                              polling=polling)
+        kind = type(watch.watcher).__name__
+        pending = sorted(os.listdir(staging))
+        peak_backlog = 0
+        peak_rss = process_memory_mb()
+        t0 = time.perf_counter()
+        next_write = next_read = t0
+        with contextlib.redirect_stdout(io.StringIO()):
+            while watch.completed + watch.failed < studies:
+                now = time.perf_counter()
+                if now - t0 > timeout:
+                    raise TimeoutError(f"só {watch.completed}/{studies} estudos prontos em {timeout} s")
+                if pending and now >= next_write:
+                    name = pending.pop(0)
+                    os.replace(os.path.join(staging, name), os.path.join(inbox, name))
+                    next_write = now + interval_ms / 1000
+                if now >= next_read and watch.unread():
+                    viewer.next_study()
+                    next_read = now + read_ms / 1000
+                app.processEvents()
+                peak_backlog = max(peak_backlog, watch.unread() + len(watch.in_flight))
+                peak_rss = max(peak_rss, process_memory_mb())
+                time.sleep(0.001)
+        stats = watch.stats()
+        elapsed = time.perf_counter() - t0
+        viewer.stop_watch_folder()
+    viewer.close()
+
+    print(f"observador: {kind}, {workers} workers, máx. {max_ready} prontos, "
+          f"{studies} estudos {width}x{height}" + (", com placas sugeridas" if landmarks else ""))
+    print(f"  {stats['prontos']} prontos, {stats['falhas']} falhas em {elapsed:.2f} s "
+          f"({stats['prontos'] / elapsed:.2f} estudos/s)")
+    print(f"  latência detecção -> pronto: p50 {stats['p50']:.0f} ms  p95 {stats['p95']:.0f} ms  "
+          f"máx {stats['max']:.0f} ms")
+    print(f"  pico de prontos+decodificando: {peak_backlog} (limite {max_ready}), pico RSS {peak_rss:.0f} MB")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--studies", type=int, default=40)
+    parser.add_argument("--size", type=int, nargs=2, default=[3000, 2500], metavar=("LARGURA", "ALTURA"))
+    parser.add_argument("--interval-ms", type=float, default=50, help="intervalo entre chegadas")
+    parser.add_argument("--read-ms", type=float, default=0, help="tempo de leitura de cada estudo")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-ready", type=int, default=4)
+    parser.add_argument("--polling", action="store_true", help="força a varredura periódica")
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    parser.add_argument("--landmarks", action="store_true", help="sugere placas vertebrais na ingestão")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+    app = QApplication(sys.argv)
+    run(app, args.studies, *args.size, args.interval_ms, args.read_ms, args.workers, args.max_ready,
+        args.polling, args.poll_interval, args.landmarks, args.timeout)
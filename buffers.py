@@ -0,0 +1,119 @@
+"""
+Buffers de imagem compartilhados entre decodificação, exibição e exportação.
+
+A imagem decodificada vive num único array numpy (opcionalmente um np.memmap sobre um
+arquivo de cache .npy); os QImage usados na tela são vistas sobre esse array, sem cópia.
+
+O numpy é importado dentro das funções: o módulo entra na inicialização da janela e o
+import só é pago na primeira imagem (numa thread de carregamento).
+"""
+import hashlib
+import os
+import tempfile
+
+from PyQt6 import sip
+from PyQt6.QtGui import QImage
+
+CACHE_DIR = os.environ.get("COBB_CACHE_DIR", os.path.join(tempfile.gettempdir(), "cobb_cache"))
+
+
+class ImageBuffer:
+    """Array (altura, largura) uint8 em cinza ou (altura, largura, 4) BGRA, com um QImage por cima."""
+    def __init__(self, array):
+        self.array = array
+        height, width = array.shape[:2]
+        fmt = QImage.Format.Format_Grayscale8 if array.ndim == 2 else QImage.Format.Format_RGB32
+        # O QImage não copia nem é dono dos dados: este objeto mantém o array vivo
+        self.image = QImage(sip.voidptr(array.ctypes.data), width, height, array.strides[0], fmt)
+
+    @classmethod
+    def from_qimage(cls, image: QImage):
+        """Vista numpy sobre um QImage decodificado (cinza quando possível, senão RGB32)."""
+        import numpy as np
+
+        if image.format() != QImage.Format.Format_Grayscale8:
+            if image.isGrayscale():
+                image = image.convertToFormat(QImage.Format.Format_Grayscale8)
+            elif image.format() != QImage.Format.Format_RGB32:
+                image = image.convertToFormat(QImage.Format.Format_RGB32)
+        ptr = image.constBits()
+        ptr.setsize(image.sizeInBytes())
+        rows = np.frombuffer(ptr, dtype=np.uint8).reshape(image.height(), image.bytesPerLine())
+        if image.format() == QImage.Format.Format_Grayscale8:
+            array = rows[:, :image.width()]
+        else:
+            array = rows[:, :image.width() * 4].reshape(image.height(), image.width(), 4)
+        buffer = cls(array)
+        buffer.owner = image  # a memória pertence ao QImage original
+        return buffer
+
+    @property
+    def nbytes(self):
+        return self.array.nbytes
+
+    @property
+    def is_mapped(self):
+        import numpy as np
+
+        return isinstance(self.array, np.memmap)
+
+
+class BufferCache:
+    """Cache em disco de imagens decodificadas (.npy), reaberto com memory-map e LRU por bytes."""
+    def __init__(self, directory=CACHE_DIR, budget_bytes=4 * 1024 ** 3):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def cache_path(self, path, level=0):
+        st = os.stat(path)
+        key = hashlib.sha1(f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.npy" if level == 0 else f"{key}.{level}.npy")
+
+    def load(self, path):
+        """Buffers mapeados de cada nível em cache (nível 0 primeiro), ou None se não houver."""
+        import numpy as np
+
+        buffers = []
+        try:
+            while True:
+                cached = self.cache_path(path, len(buffers))
+                if not os.path.exists(cached):
+                    break
+                buffers.append(ImageBuffer(np.load(cached, mmap_mode="r")))
+                os.utime(cached)  # marca como usado recentemente para o LRU
+        except (OSError, ValueError):
+            return None
+        return buffers or None
+
+    def store(self, path, buffers):
+        """Grava os níveis no cache e devolve buffers mapeados sobre os arquivos gravados."""
+        import numpy as np
+
+        mapped = []
+        for level, buffer in enumerate(buffers):
+            cached = self.cache_path(path, level)
+            tmp = cached + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, np.ascontiguousarray(buffer.array))
+            os.replace(tmp, cached)
+            mapped.append(ImageBuffer(np.load(cached, mmap_mode="r")))
+        self.evict()
+        return mapped
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy"):
+                full = os.path.join(self.directory, name)
+                st = os.stat(full)
+                entries.append((st.st_mtime, st.st_size, full))
+        total = sum(size for _, size, _ in entries)
+        for _, size, full in sorted(entries):
+            if total <= self.budget_bytes:
+                break
+            try:
+                os.remove(full)
+                total -= size
+            except OSError:
+                pass  # ainda mapeado por outro processo (Windows): fica para a próxima
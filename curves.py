@@ -0,0 +1,137 @@
+"""
+Análise de várias curvas a partir de uma linha por placa vertebral (sem Qt).
+
+As linhas vêm de cima para baixo, duas por vértebra (placa superior e inferior) a partir de
+primeira_vertebra. Todos os ângulos par a par saem de uma única chamada de
+geometry.cobb_vetorizado; as curvas são os trechos entre extremos sucessivos da inclinação.
+"""
+import math
+
+import geometry
+
+VERTEBRAS = [f"T{i}" for i in range(1, 13)] + [f"L{i}" for i in range(1, 6)]
+REGIOES = [
+    ("torácica", "T1", "T11"),
+    ("toracolombar", "T12", "L1"),
+    ("lombar", "L2", "L5"),
+]
+
+
+class Curva:
+    """Uma curva: linhas das vértebras terminais, ângulo de Cobb e linha do ápice."""
+    def __init__(self, regiao, superior, inferior, angulo, apice, vertebra_apice):
+        self.regiao = regiao
+        self.superior = superior  # índice da linha terminal de cima
+        self.inferior = inferior  # índice da linha terminal de baixo
+        self.angulo = angulo
+        self.apice = apice  # índice da linha mais próxima da inclinação média das terminais
+        self.vertebra_apice = vertebra_apice
+
+    def __repr__(self):
+        return (f"Curva({self.regiao}, {self.angulo:.1f}°, linhas {self.superior}-{self.inferior}, "
+                f"ápice {self.vertebra_apice})")
+
+
+def inclinacoes(linhas, escala=(1.0, 1.0)):
+    """Inclinação de cada linha em graus, com as pontas ordenadas por x como em angulo_cobb."""
+    sx, sy = escala
+    tilts = []
+    for (x1, y1), (x2, y2) in linhas:
+        if x1 > x2:
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        tilts.append(math.degrees(math.atan2((y2 - y1) * sy, (x2 - x1) * sx)))
+    return tilts
+
+
+def angulos_par_a_par(linhas, escala=(1.0, 1.0)):
+    """Matriz N x N (numpy) com o ângulo de Cobb entre cada par de linhas, numa chamada vetorizada."""
+    import numpy as np
+
+    n = len(linhas)
+    matriz = np.zeros((n, n))
+    if n < 2:
+        return matriz
+    pts = np.asarray(linhas, dtype=float).reshape(n, 2, 2)
+    i, j = np.triu_indices(n, 1)
+    angulos, _, _ = geometry.cobb_vetorizado(np.concatenate([pts[i], pts[j]], axis=1), escala=escala)
+    matriz[i, j] = angulos
+    matriz[j, i] = angulos
+    return matriz
+
+
+def extremos(tilts, limiar=5.0):
+    """Índices dos extremos alternados da inclinação (zigue-zague com histerese de limiar graus)."""
+    if not tilts:
+        return []
+    lo = hi = 0
+    trend = None
+    last = 0
+    pivots = []
+    for k in range(1, len(tilts)):
+        t = tilts[k]
+        if trend is None:
+            if t < tilts[lo]:
+                lo = k
+            if t > tilts[hi]:
+                hi = k
+            if t - tilts[lo] >= limiar:
+                pivots, trend, last = [lo], "sobe", k
+            elif tilts[hi] - t >= limiar:
+                pivots, trend, last = [hi], "desce", k
+        elif trend == "sobe":
+            if t > tilts[last]:
+                last = k
+            elif tilts[last] - t >= limiar:
+                pivots.append(last)
+                trend, last = "desce", k
+        else:
+            if t < tilts[last]:
+                last = k
+            elif t - tilts[last] >= limiar:
+                pivots.append(last)
+                trend, last = "sobe", k
+    if trend is not None:
+        pivots.append(last)
+    return pivots
+
+
+def vertebra(indice_linha, primeira_vertebra="T1", por_vertebra=2):
+    k = VERTEBRAS.index(primeira_vertebra) + indice_linha // por_vertebra
+    return VERTEBRAS[min(k, len(VERTEBRAS) - 1)]
+
+
+def regiao(nome_vertebra):
+    k = VERTEBRAS.index(nome_vertebra)
+    for nome, inicio, fim in REGIOES:
+        if VERTEBRAS.index(inicio) <= k <= VERTEBRAS.index(fim):
+            return nome
+    return REGIOES[-1][0]
+
+
+def analisar_curvas(linhas, escala=(1.0, 1.0), primeira_vertebra="T1", por_vertebra=2, limiar=5.0):
+    """
+    Curvas entre extremos sucessivos de inclinação e a matriz de ângulos par a par.
+
+    linhas: [((x1, y1), (x2, y2)), ...] de cima para baixo.
+    Retorna (curvas, matriz), com as curvas de cima para baixo.
+    """
+    matriz = angulos_par_a_par(linhas, escala)
+    tilts = inclinacoes(linhas, escala)
+    pivots = extremos(tilts, limiar)
+    curvas = []
+    for superior, inferior in zip(pivots, pivots[1:]):
+        media = (tilts[superior] + tilts[inferior]) / 2
+        apice = min(range(superior, inferior + 1), key=lambda k: abs(tilts[k] - media))
+        nome = vertebra(apice, primeira_vertebra, por_vertebra)
+        curvas.append(Curva(regiao(nome), superior, inferior, float(matriz[superior, inferior]), apice, nome))
+    return curvas, matriz
+
+
+def maiores_por_regiao(curvas):
+    """A curva de maior ângulo em cada região (torácica, toracolombar, lombar)."""
+    maiores = {}
+    for curva in curvas:
+        atual = maiores.get(curva.regiao)
+        if atual is None or curva.angulo > atual.angulo:
+            maiores[curva.regiao] = curva
+    return maiores
@@ -0,0 +1,155 @@
+"""
+Leitura de DICOM: cabeçalho primeiro, pixels sob demanda (memory-map quando não comprimidos)
+e janela/nível vetorizados para um buffer de exibição de 8 bits.
+"""
+import math
+import os
+
+import numpy as np
+
+PIXEL_DATA = 0x7FE00010
+DICOM_EXTENSIONS = (".dcm", ".dicom")
+
+
+def load_pydicom():
+    """Importa o pydicom só quando um DICOM é aberto (dependência opcional e de import lento)."""
+    try:
+        import pydicom
+    except ImportError:
+        raise RuntimeError("Instale o pydicom para abrir arquivos DICOM.") from None
+    return pydicom
+
+
+def is_dicom(path):
+    """Reconhece DICOM pela extensão ou pelo prefixo 'DICM' após o preâmbulo de 128 bytes."""
+    if path.lower().endswith(DICOM_EXTENSIONS):
+        return True
+    try:
+        with open(path, "rb") as f:
+            f.seek(128)
+            return f.read(4) == b"DICM"
+    except OSError:
+        return False
+
+
+def first_value(value):
+    """WindowCenter/WindowWidth podem ter vários valores; usa o primeiro."""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)) or type(value).__name__ == "MultiValue":
+        return float(value[0]) if len(value) else None
+    return float(value)
+
+
+class DicomImage:
+    """Radiografia DICOM com os pixels brutos em cache para reaplicar janela/nível sem reler o arquivo."""
+    def __init__(self, path):
+        pydicom = load_pydicom()
+        self.path = path
+        # defer_size: o PixelData não é lido agora, só o cabeçalho
+        self.ds = pydicom.dcmread(path, defer_size="1 KB")
+        ds = self.ds
+        self.rows = int(ds.Rows)
+        self.columns = int(ds.Columns)
+        self.slope = float(ds.get("RescaleSlope", 1) or 1)
+        self.intercept = float(ds.get("RescaleIntercept", 0) or 0)
+        self.invert = ds.get("PhotometricInterpretation", "MONOCHROME2") == "MONOCHROME1"
+        self.bits_stored = int(ds.get("BitsStored", 0) or ds.get("BitsAllocated", 16))
+        self.signed = bool(int(ds.get("PixelRepresentation", 0)))
+
+        # PixelSpacing (ou ImagerPixelSpacing em CR/DX) é [linha, coluna] em mm
+        spacing = ds.get("PixelSpacing") or ds.get("ImagerPixelSpacing")
+        self.pixel_spacing = (float(spacing[1]), float(spacing[0])) if spacing else None  # (x, y) mm/px
+
+        self.window_center = first_value(ds.get("WindowCenter"))
+        self.window_width = first_value(ds.get("WindowWidth"))
+        self._raw = None
+
+    @property
+    def raw(self):
+        """Pixels brutos (valores armazenados), decodificados ou mapeados no primeiro acesso."""
+        if self._raw is None:
+            self._raw = self.load_raw()
+        return self._raw
+
+    def load_raw(self):
+        ds = self.ds
+        syntax = ds.file_meta.TransferSyntaxUID
+        bits = int(ds.BitsAllocated)
+        element = ds.get_item(PIXEL_DATA, keep_deferred=True)
+        mappable = (
+            not syntax.is_compressed and syntax.is_little_endian
+            and int(ds.get("SamplesPerPixel", 1)) == 1 and int(ds.get("NumberOfFrames", 1) or 1) == 1
+            and bits in (8, 16) and getattr(element, "value_tell", None) is not None
+        )
+        if mappable:
+            kind = "i" if int(ds.get("PixelRepresentation", 0)) else "u"
+            return np.memmap(self.path, dtype=np.dtype(f"<{kind}{bits // 8}"), mode="r",
+                             offset=element.value_tell, shape=(self.rows, self.columns))
+        # Sintaxes comprimidas: decodifica uma única vez e mantém em memória
+        return ds.pixel_array
+
+    def stored_values(self, values):
+        """
+        Valores inteiros reduzidos aos BitsStored bits baixos, com extensão de sinal: o memmap
+        traz os bits altos como estão no arquivo (overlays, lixo), o ds.pixel_array já corrigido.
+        """
+        values = np.asarray(values)
+        if values.dtype.kind not in "iu" or self.bits_stored >= values.dtype.itemsize * 8:
+            return values
+        values = values.astype(np.int64) & ((1 << self.bits_stored) - 1)
+        if self.signed:
+            sign = 1 << (self.bits_stored - 1)
+            values = (values ^ sign) - sign
+        return values
+
+    def default_window(self):
+        """Janela do cabeçalho ou, na falta dela, a faixa de valores de uma amostra da imagem."""
+        if self.window_center is not None and self.window_width:
+            return self.window_center, self.window_width
+        sample = self.stored_values(self.raw[::8, ::8]).astype(np.float64) * self.slope + self.intercept
+        lo, hi = float(sample.min()), float(sample.max())
+        return (lo + hi) / 2, max(hi - lo, 1.0)
+
+    def lut(self, center, width):
+        """
+        Tabela bruto -> 8 bits para dados inteiros de até 16 bits (índice = valor sem sinal); a
+        correção de BitsStored entra na tabela, então o memmap continua sem cópia.
+        """
+        dtype = self.raw.dtype
+        if dtype.kind == "i":
+            values = np.arange(np.iinfo(dtype).min, np.iinfo(dtype).max + 1, dtype=np.int64)
+        else:
+            values = np.arange(0, np.iinfo(dtype).max + 1, dtype=np.int64)
+        values = self.stored_values(values.astype(dtype)).astype(np.float64)
+        return self.window_values(values * self.slope + self.intercept, center, width)
+
+    def window_values(self, values, center, width):
+        low = center - width / 2
+        out = np.clip((values - low) * (255.0 / width), 0, 255)
+        if self.invert:
+            out = 255 - out
+        return out.astype(np.uint8)
+
+    def display(self, center=None, width=None, step=1):
+        """Buffer de exibição uint8 (C-contíguo); step > 1 gera uma prévia subamostrada."""
+        if center is None or width is None:
+            center, width = self.default_window()
+        raw = self.raw[::step, ::step] if step > 1 else self.raw
+        if raw.dtype.kind in "iu" and raw.dtype.itemsize <= 2:
+            lut = self.lut(center, width)
+            if raw.dtype.kind == "i":
+                # Reinterpreta como sem sinal deslocado (-32768 -> 0), a mesma ordem da LUT
+                unsigned = np.dtype(raw.dtype.str.replace("i", "u"))
+                index = raw.view(unsigned) ^ unsigned.type(1 << (8 * raw.dtype.itemsize - 1))
+            else:
+                index = raw
+            return np.ascontiguousarray(lut[index])
+        values = self.stored_values(raw).astype(np.float64)
+        return np.ascontiguousarray(self.window_values(values * self.slope + self.intercept, center, width))
+
+    def preview_step(self, preview_size):
+        return max(1, math.ceil(max(self.rows, self.columns) / preview_size))
+
+    def __repr__(self):
+        return f"DicomImage({os.path.basename(self.path)!r}, {self.columns}x{self.rows})"
@@ -0,0 +1,259 @@
+"""
+Detecção automática de placas vertebrais para sugerir as linhas do ângulo de Cobb.
+
+Análise clássica vetorizada em numpy (sem Qt): gradientes, tensor de estrutura e perfil de
+bordas horizontais ao longo da coluna. Um modelo ONNX pode substituir a etapa de detecção
+(COBB_ENDPLATE_MODEL); a escolha do par mais inclinado é a mesma nos dois casos.
+snap_to_edge usa os mesmos gradientes numa janela pequena para ajustar um ponto marcado à mão
+à borda mais próxima, com precisão subpixel.
+"""
+import math
+import os
+
+import numpy as np
+
+MODEL_PATH = os.environ.get("COBB_ENDPLATE_MODEL")
+
+
+class EndplateResult:
+    """Linhas candidatas (coordenadas da imagem original) e o par mais inclinado entre si."""
+    def __init__(self, lines, tilts, scores, pair=None):
+        self.lines = lines  # [((x1, y1), (x2, y2)), ...] de cima para baixo
+        self.tilts = tilts  # inclinação de cada linha em graus (positivo = desce para a direita)
+        self.scores = scores
+        self.pair = pair  # (i, j) ou None se não houver candidatas suficientes
+
+    @property
+    def angle(self):
+        if self.pair is None:
+            return None
+        i, j = self.pair
+        return abs(self.tilts[i] - self.tilts[j])
+
+    def pair_points(self):
+        """Os 4 pontos do par no formato de ImageViewer.add_cobb_angle."""
+        i, j = self.pair
+        return [*self.lines[i], *self.lines[j]]
+
+
+class OnnxEndplateModel:
+    """
+    Modelo ONNX opcional. Entrada (1, 1, H, W) float32 em [0, 1]; saída (N, 5) com
+    x1, y1, x2, y2, score em pixels da entrada.
+    """
+    def __init__(self, path):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise RuntimeError("Instale o onnxruntime para usar modelos ONNX.") from None
+        self.session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, gray, min_score=0.5):
+        x = (gray / 255.0).astype(np.float32)[None, None]
+        out = np.asarray(self.session.run(None, {self.input_name: x})[0]).reshape(-1, 5)
+        return out[out[:, 4] >= min_score]
+
+
+def to_gray(array):
+    """Array uint8 cinza (H, W) ou BGRA (H, W, 4) para float32 cinza."""
+    if array.ndim == 3:
+        return array[..., :3].mean(axis=2, dtype=np.float32)
+    return array.astype(np.float32)
+
+
+def box_blur(img, r):
+    """Média móvel (2r+1)x(2r+1) por somas acumuladas; custo independente de r."""
+    if r <= 0:
+        return img
+    k = 2 * r + 1
+    p = np.pad(img, r, mode="edge")
+    c = np.zeros((p.shape[0] + 1, p.shape[1]), dtype=np.float32)
+    np.cumsum(p, axis=0, out=c[1:])
+    v = (c[k:] - c[:-k]) / k
+    c = np.zeros((v.shape[0], v.shape[1] + 1), dtype=np.float32)
+    np.cumsum(v, axis=1, out=c[:, 1:])
+    return (c[:, k:] - c[:, :-k]) / k
+
+
+def gradients(img):
+    gx = np.zeros_like(img)
+    gy = np.zeros_like(img)
+    gx[:, 1:-1] = (img[:, 2:] - img[:, :-2]) * 0.5
+    gy[1:-1] = (img[2:] - img[:-2]) * 0.5
+    return gx, gy
+
+
+def spine_center(gray, band):
+    """Coluna central da coluna vertebral em cada linha: máximo de brilho na faixa central da imagem."""
+    h, w = gray.shape
+    bright = box_blur(gray, max(1, w // 40))
+    x0, x1 = int(w * 0.2), int(w * 0.8)
+    centers = np.argmax(bright[:, x0:x1], axis=1) + x0
+    # Suaviza ao longo das linhas: a coluna não salta de um lado para o outro
+    kernel = np.ones(2 * band + 1) / (2 * band + 1)
+    padded = np.pad(centers.astype(np.float32), band, mode="edge")
+    return np.convolve(padded, kernel, mode="valid").round().astype(int)
+
+
+def local_peaks(profile, distance, threshold):
+    """Índices de máximos locais acima de threshold, separados por pelo menos distance."""
+    window = np.lib.stride_tricks.sliding_window_view(
+        np.pad(profile, distance, mode="constant", constant_values=-np.inf), 2 * distance + 1
+    )
+    return np.flatnonzero((profile == window.max(axis=1)) & (profile > threshold))
+
+
+def classic_candidates(gray, half_width=None, max_lines=40):
+    """Linhas (cx, y, inclinação, força) de bordas quase horizontais ao longo da coluna."""
+    h, w = gray.shape
+    half_width = half_width or max(4, int(w * 0.06))
+    smooth = box_blur(gray, max(1, min(h, w) // 300))
+    gx, gy = gradients(smooth)
+    # Força de borda horizontal: gradiente vertical dominante
+    horizontal = np.maximum(np.abs(gy) - np.abs(gx), 0)
+
+    centers = spine_center(gray, max(2, h // 60))
+    offsets = np.arange(-half_width, half_width + 1)
+    xs = np.clip(centers[:, None] + offsets[None, :], 0, w - 1)
+    profile = np.take_along_axis(horizontal, xs, axis=1).mean(axis=1)
+    profile = box_blur(profile[:, None], 1)[:, 0]
+
+    distance = max(2, h // 80)
+    peaks = local_peaks(profile, distance, profile.mean() + 0.5 * profile.std())
+    peaks = peaks[np.argsort(profile[peaks])[::-1][:max_lines]]
+    peaks.sort()
+
+    # Orientação pelo tensor de estrutura numa janela em volta de cada borda
+    r = max(2, distance // 2)
+    lines = []
+    for y in peaks:
+        cx = centers[y]
+        ys = slice(max(0, y - r), y + r + 1)
+        xs_ = slice(max(0, cx - half_width), cx + half_width + 1)
+        wx, wy = gx[ys, xs_], gy[ys, xs_]
+        # Pesa pela força de borda horizontal: as laterais verticais da vértebra não entram
+        weight = horizontal[ys, xs_]
+        sxx = float((weight * wx * wx).sum())
+        syy = float((weight * wy * wy).sum())
+        sxy = float((weight * wx * wy).sum())
+        gradient_angle = 0.5 * math.atan2(2 * sxy, sxx - syy)  # direção dominante do gradiente
+        tilt = math.degrees(gradient_angle) - 90 if gradient_angle > 0 else math.degrees(gradient_angle) + 90
+        lines.append((float(cx), float(y), tilt, float(profile[y])))
+    return lines, half_width
+
+
+def most_tilted_pair(ys, tilts, min_gap):
+    """Par (i, j), i acima de j, com a maior diferença de inclinação e separação vertical mínima."""
+    if len(tilts) < 2:
+        return None
+    ys = np.asarray(ys)
+    t = np.asarray(tilts)
+    diff = np.abs(t[:, None] - t[None, :])
+    valid = (ys[None, :] - ys[:, None]) >= min_gap
+    if not valid.any():
+        return None
+    diff[~valid] = -1
+    i, j = np.unravel_index(np.argmax(diff), diff.shape)
+    return int(i), int(j)
+
+
+def detect_endplates(array, scale=1.0, model=None):
+    """
+    Detecta placas vertebrais em array (um nível reduzido da pirâmide) e devolve um
+    EndplateResult em coordenadas da imagem original (coordenadas do array * scale).
+    """
+    gray = to_gray(array)
+    h = gray.shape[0]
+    if model is not None:
+        found = model.predict(gray)
+        found = found[np.argsort(found[:, 1] + found[:, 3])]  # de cima para baixo
+        lines = [((x1, y1), (x2, y2)) for x1, y1, x2, y2, _ in found.tolist()]
+        scores = found[:, 4].tolist()
+    else:
+        candidates, half_width = classic_candidates(gray)
+        lines, scores = [], []
+        for cx, y, tilt, strength in candidates:
+            dx = half_width * math.cos(math.radians(tilt))
+            dy = half_width * math.sin(math.radians(tilt))
+            lines.append(((cx - dx, y - dy), (cx + dx, y + dy)))
+            scores.append(strength)
+
+    tilts = [math.degrees(math.atan2(y2 - y1, x2 - x1)) for (x1, y1), (x2, y2) in lines]
+    tilts = [t - 180 if t > 90 else t + 180 if t <= -90 else t for t in tilts]
+    ys = [(p[1] + q[1]) / 2 for p, q in lines]
+    pair = most_tilted_pair(ys, tilts, min_gap=h / 15)
+    lines = [((x1 * scale, y1 * scale), (x2 * scale, y2 * scale)) for (x1, y1), (x2, y2) in lines]
+    return EndplateResult(lines, tilts, scores, pair)
+
+
+def working_level(buffers, max_size=2048):
+    """Índice do primeiro nível da pirâmide com o maior lado <= max_size (ou o último)."""
+    for level, buffer in enumerate(buffers):
+        if max(buffer.array.shape[:2]) <= max_size:
+            return level
+    return len(buffers) - 1
+
+
+def sample_bilinear(img, xs, ys):
+    """Valores de img nas posições fracionárias (xs, ys), por interpolação bilinear."""
+    h, w = img.shape
+    xs = np.clip(xs, 0, w - 1.001)
+    ys = np.clip(ys, 0, h - 1.001)
+    x0 = xs.astype(np.intp)
+    y0 = ys.astype(np.intp)
+    fx = xs - x0
+    fy = ys - y0
+    top = img[y0, x0] * (1 - fx) + img[y0, x0 + 1] * fx
+    bottom = img[y0 + 1, x0] * (1 - fx) + img[y0 + 1, x0 + 1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def snap_to_edge(array, point, direction=None, radius=8, half_length=6, min_strength=4.0):
+    """
+    Ponto (x, y) da borda forte mais próxima de point, com precisão subpixel, ou None.
+
+    A busca é feita ao longo da normal da linha (direction = vetor da linha) ou, sem linha,
+    da direção dominante do gradiente na janela. O perfil da derivada na direção da normal é
+    a média de 2 * half_length + 1 amostras ao longo da borda; entre os máximos com pelo menos
+    metade da força do maior, vale o mais próximo do clique, refinado por uma parábola.
+    Só a janela em volta do ponto é lida: o custo não depende do tamanho da imagem.
+    """
+    x, y = point
+    h, w = array.shape[:2]
+    r = radius + half_length + 2
+    x0, y0 = max(0, int(x) - r), max(0, int(y) - r)
+    x1, y1 = min(w, int(x) + r + 2), min(h, int(y) + r + 2)
+    if x1 - x0 < 4 or y1 - y0 < 4:
+        return None
+    gx, gy = gradients(to_gray(array[y0:y1, x0:x1]))
+
+    if direction is None:
+        # Tensor de estrutura da janela: a normal é a direção dominante do gradiente
+        theta = 0.5 * math.atan2(2 * float((gx * gy).sum()), float((gx * gx).sum() - (gy * gy).sum()))
+        nx, ny = math.cos(theta), math.sin(theta)
+    else:
+        dx, dy = direction
+        norm = math.hypot(dx, dy)
+        if norm == 0:
+            return None
+        nx, ny = -dy / norm, dx / norm
+
+    t = np.arange(-radius, radius + 1, dtype=np.float32)  # deslocamentos ao longo da normal
+    s = np.arange(-half_length, half_length + 1, dtype=np.float32)  # ao longo da borda
+    px = (x - x0) + t[:, None] * nx - s[None, :] * ny
+    py = (y - y0) + t[:, None] * ny + s[None, :] * nx
+    profile = np.abs((sample_bilinear(gx, px, py) * nx + sample_bilinear(gy, px, py) * ny).mean(axis=1))
+
+    inner = profile[1:-1]
+    peaks = np.flatnonzero((inner >= profile[:-2]) & (inner >= profile[2:])) + 1
+    if len(peaks) == 0 or profile.max() < min_strength:
+        return None
+    peaks = peaks[profile[peaks] >= 0.5 * profile.max()]
+    if len(peaks) == 0:
+        return None
+    i = peaks[np.argmin(np.abs(t[peaks]))]
+    a, b, c = profile[i - 1], profile[i], profile[i + 1]
+    curvature = a - 2 * b + c
+    offset = float(t[i]) + (0.5 * float(a - c) / float(curvature) if curvature < 0 else 0.0)
+    return x + offset * nx, y + offset * ny
@@ -0,0 +1,216 @@
+"""
+Exportação da cena em faixas (strips), com codificação e gravação fora da thread da GUI.
+
+A cena é pintada faixa a faixa na thread da GUI (QGraphicsScene não pode ser usada de
+outra thread), intercalando com o event loop; cada faixa vai por uma fila limitada para
+uma tarefa no QThreadPool que comprime e grava em disco. PNG e BMP são gravados em
+fluxo, então o pico de memória é de algumas faixas; JPEG precisa da imagem inteira
+(na escala de saída) para o QImageWriter. O arquivo é gravado em path + ".part" e só
+substitui path quando fica completo: cancelar ou falhar não deixa um arquivo truncado.
+"""
+import os
+import queue
+import struct
+import time
+import zlib
+
+from PyQt6.QtGui import QImage, QImageWriter, QPainter
+from PyQt6.QtCore import QObject, QRunnable, QRectF, QThreadPool, QTimer, Qt, pyqtSignal
+
+from profiling import profiler, logger
+
+STRIP_HEIGHT = 256
+MAX_QUEUED_STRIPS = 4
+
+
+def strip_rows(image: QImage):
+    """Linhas de uma faixa RGB888 sem o preenchimento de alinhamento do QImage."""
+    ptr = image.constBits()
+    ptr.setsize(image.sizeInBytes())
+    data = bytes(ptr)
+    bpl, row_bytes = image.bytesPerLine(), image.width() * 3
+    return [data[r * bpl: r * bpl + row_bytes] for r in range(image.height())]
+
+
+class PngStreamWriter:
+    """Grava um PNG RGB de 8 bits linha a linha, com compressão zlib incremental."""
+    def __init__(self, path, width, height, compression=6):
+        self.file = open(path, "wb")
+        self.compressor = zlib.compressobj(compression)
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        self.chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def chunk(self, kind, data):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind + data)
+        self.file.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write_rows(self, rows):
+        # Filtro 0 (nenhum) em cada linha
+        data = self.compressor.compress(b"".join(b"\x00" + row for row in rows))
+        if data:
+            self.chunk(b"IDAT", data)
+
+    def close(self):
+        self.chunk(b"IDAT", self.compressor.flush())
+        self.chunk(b"IEND", b"")
+        self.file.close()
+
+
+class BmpStreamWriter:
+    """Grava um BMP de 24 bits de cima para baixo (altura negativa no cabeçalho)."""
+    def __init__(self, path, width, height, compression=None):
+        self.file = open(path, "wb")
+        self.padding = b"\x00" * ((4 - (width * 3) % 4) % 4)
+        image_size = (width * 3 + len(self.padding)) * height
+        self.file.write(struct.pack("<2sIHHI", b"BM", 54 + image_size, 0, 0, 54))
+        self.file.write(struct.pack("<IiiHHIIiiII", 40, width, -height, 1, 24, 0, image_size, 2835, 2835, 0, 0))
+
+    def write_rows(self, rows):
+        # BMP guarda BGR: inverte a ordem dos canais de cada pixel
+        out = []
+        for row in rows:
+            bgr = bytearray(row)
+            bgr[0::3], bgr[2::3] = row[2::3], row[0::3]
+            out.append(bytes(bgr) + self.padding)
+        self.file.write(b"".join(out))
+
+    def close(self):
+        self.file.close()
+
+
+class ExportSignals(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(bool, float)  # sucesso, segundos
+
+
+class ExportWriterTask(QRunnable):
+    """Consome as faixas da fila e as codifica em disco."""
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def run(self):
+        job = self.job
+        part = job.path + ".part"
+        ok = False
+        try:
+            ok = self.write_jpeg(part) if job.fmt == "JPEG" else self.write_stream(part)
+            if ok and not job.cancelled:
+                os.replace(part, job.path)
+        except Exception as e:  # disco cheio, falta de memória, zlib... a GUI sempre recebe finished
+            logger.warning(f"Erro ao salvar imagem: {e}")
+            ok = False
+            # Para a pintura e esvazia a fila para a thread da GUI não travar em put(); o
+            # terminador pode já ter sido consumido (erro em close), então não espera por ele
+            job.cancelled = True
+            while not job.rendered:
+                try:
+                    if job.strips.get(timeout=0.05) is None:
+                        break
+                except queue.Empty:
+                    pass
+        if not ok or job.cancelled:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+        secs = time.perf_counter() - job.started
+        profiler.record("exportacao.total", secs * 1000, largura=job.width, altura=job.height, formato=job.fmt)
+        job.signals.finished.emit(ok and not job.cancelled, secs)
+
+    def write_stream(self, part):
+        job = self.job
+        writer_cls = PngStreamWriter if job.fmt == "PNG" else BmpStreamWriter
+        writer = writer_cls(part, job.width, job.height, job.compression)
+        try:
+            while (strip := job.strips.get()) is not None:
+                with profiler.timer("exportacao.codificacao"):
+                    writer.write_rows(strip_rows(strip))
+            if job.cancelled:
+                return False  # sem o trailer: o .part incompleto é apagado em run()
+            writer.close()
+        finally:
+            writer.file.close()
+        return True
+
+    def write_jpeg(self, part):
+        job = self.job
+        image = QImage(job.width, job.height, QImage.Format.Format_RGB888)
+        painter = QPainter(image)
+        y = 0
+        while (strip := job.strips.get()) is not None:
+            painter.drawImage(0, y, strip)
+            y += strip.height()
+        painter.end()
+        if job.cancelled:
+            return False
+        writer = QImageWriter(part, b"jpeg")
+        writer.setQuality(job.quality)
+        return writer.write(image)
+
+
+class SceneExportJob(QObject):
+    """Exporta source (coordenadas da cena) para path, em faixas, sem bloquear a GUI."""
+    def __init__(self, scene, source: QRectF, path, fmt="PNG", scale=1.0, compression=6, quality=90,
+                 strip_height=STRIP_HEIGHT):
+        super().__init__()
+        self.scene = scene
+        self.source = QRectF(source)
+        self.path = path
+        self.fmt = fmt
+        self.scale = scale
+        self.compression = compression
+        self.quality = quality
+        self.strip_height = strip_height
+        self.width = max(1, int(source.width() * scale))
+        self.height = max(1, int(source.height() * scale))
+        self.strips = queue.Queue(maxsize=MAX_QUEUED_STRIPS)
+        self.next_row = 0
+        self.cancelled = False
+        self.rendered = False  # a thread da GUI já pôs o terminador None na fila
+        self.started = None
+        self.signals = ExportSignals()
+
+    def start(self):
+        self.started = time.perf_counter()
+        QThreadPool.globalInstance().start(ExportWriterTask(self))
+        QTimer.singleShot(0, self.render_next)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def render_next(self):
+        """Pinta a próxima faixa; se a fila estiver cheia, tenta de novo em seguida."""
+        if self.cancelled:
+            self.finish_rendering()
+            return
+        if self.strips.full():
+            QTimer.singleShot(5, self.render_next)
+            return
+
+        rows = min(self.strip_height, self.height - self.next_row)
+        strip = QImage(self.width, rows, QImage.Format.Format_RGB888)
+        strip.fill(Qt.GlobalColor.white)
+        painter = QPainter(strip)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        source = QRectF(
+            self.source.x(), self.source.y() + self.next_row / self.scale,
+            self.source.width(), rows / self.scale
+        )
+        with profiler.timer("exportacao.faixa"):
+            self.scene.render(painter, QRectF(0, 0, self.width, rows), source, Qt.AspectRatioMode.IgnoreAspectRatio)
+            painter.end()
+        self.strips.put(strip)
+
+        self.next_row += rows
+        self.signals.progress.emit(int(100 * self.next_row / self.height))
+        if self.next_row < self.height:
+            QTimer.singleShot(0, self.render_next)
+        else:
+            self.finish_rendering()
+
+    def finish_rendering(self):
+        self.strips.put(None)
+        self.rendered = True
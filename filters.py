@@ -0,0 +1,136 @@
+"""
+Realce de contraste sobre o array decodificado (sem Qt): janela/nível, gama, inversão e CLAHE.
+
+Janela/nível, gama e inversão são pontuais e viram uma única tabela de 256 entradas aplicada
+numa passada; o CLAHE calcula um histograma equalizado e limitado por bloco e interpola
+bilinearmente as tabelas dos 4 blocos vizinhos, célula a célula (memória temporária de uma
+célula por vez, não da imagem inteira).
+"""
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+FilterParams = namedtuple(
+    "FilterParams", ["center", "width", "gamma", "invert", "clahe", "clip_limit", "tiles"],
+    defaults=[127.5, 255.0, 1.0, False, False, 2.0, 8],
+)
+IDENTITY = FilterParams()
+
+
+def to_gray(array):
+    """Cinza uint8 (H, W); imagens BGRA viram a média dos canais de cor."""
+    if array.ndim == 3:
+        return array[..., :3].mean(axis=2).astype(np.uint8)
+    return array
+
+
+def point_lut(params):
+    """Tabela uint8 com janela/nível, gama (expoente 1/gama) e inversão combinados."""
+    values = np.arange(256, dtype=np.float64)
+    low = params.center - params.width / 2
+    out = np.clip((values - low) / max(params.width, 1e-6), 0.0, 1.0)
+    if params.gamma != 1.0:
+        out = out ** (1.0 / params.gamma)
+    if params.invert:
+        out = 1.0 - out
+    return np.floor(out * 255 + 0.5).astype(np.uint8)
+
+
+def is_identity(params):
+    """True se params não altera a imagem (ex.: valores padrão do painel)."""
+    return not params.clahe and np.array_equal(point_lut(params), np.arange(256, dtype=np.uint8))
+
+
+def tile_luts(gray, tiles, clip_limit):
+    """Tabela equalizada (tiles, tiles, 256) de cada bloco, com o histograma cortado em clip_limit."""
+    h, w = gray.shape
+    ys = np.linspace(0, h, tiles + 1).astype(int)
+    xs = np.linspace(0, w, tiles + 1).astype(int)
+    luts = np.empty((tiles, tiles, 256), dtype=np.float32)
+    for i in range(tiles):
+        for j in range(tiles):
+            block = gray[ys[i]:ys[i + 1], xs[j]:xs[j + 1]]
+            hist = np.bincount(block.ravel(), minlength=256).astype(np.float64)
+            n = max(block.size, 1)
+            # Corta acima de clip_limit vezes a média e redistribui o excesso igualmente
+            limit = max(1.0, clip_limit * n / 256)
+            excess = np.maximum(hist - limit, 0).sum()
+            hist = np.minimum(hist, limit) + excess / 256
+            luts[i, j] = np.cumsum(hist) * (255.0 / n)
+    return luts, ys, xs
+
+
+def clahe(gray, tiles=8, clip_limit=2.0):
+    """CLAHE com interpolação bilinear entre os centros dos blocos."""
+    h, w = gray.shape
+    tiles = max(1, min(tiles, h, w))
+    luts, ys, xs = tile_luts(gray, tiles, clip_limit)
+    cy = (ys[:-1] + ys[1:]) / 2  # centros dos blocos
+    cx = (xs[:-1] + xs[1:]) / 2
+    # Células entre centros consecutivos (mais as bordas): os 4 blocos vizinhos são fixos em cada uma
+    row_edges = np.concatenate([[0], np.ceil(cy).astype(int), [h]])
+    col_edges = np.concatenate([[0], np.ceil(cx).astype(int), [w]])
+    out = np.empty_like(gray)
+    for a in range(tiles + 1):
+        y0, y1 = row_edges[a], row_edges[a + 1]
+        if y0 >= y1:
+            continue
+        top, bottom = max(a - 1, 0), min(a, tiles - 1)
+        if top == bottom:
+            wy = np.zeros((y1 - y0, 1), dtype=np.float32)
+        else:
+            wy = ((np.arange(y0, y1) - cy[top]) / (cy[bottom] - cy[top])).astype(np.float32)[:, None]
+        for b in range(tiles + 1):
+            x0, x1 = col_edges[b], col_edges[b + 1]
+            if x0 >= x1:
+                continue
+            left, right = max(b - 1, 0), min(b, tiles - 1)
+            if left == right:
+                wx = np.zeros((1, x1 - x0), dtype=np.float32)
+            else:
+                wx = ((np.arange(x0, x1) - cx[left]) / (cx[right] - cx[left])).astype(np.float32)[None, :]
+            v = gray[y0:y1, x0:x1]
+            upper = luts[top, left][v] * (1 - wx) + luts[top, right][v] * wx
+            lower = luts[bottom, left][v] * (1 - wx) + luts[bottom, right][v] * wx
+            # Combinação convexa de valores em [0, 255]: não precisa de clip
+            out[y0:y1, x0:x1] = upper * (1 - wy) + lower * wy + 0.5
+    return out
+
+
+def apply_filters(array, params):
+    """Novo array uint8 (H, W) C-contíguo com o realce de params aplicado."""
+    gray = to_gray(array)
+    if params.clahe:
+        gray = clahe(gray, params.tiles, params.clip_limit)
+    lut = point_lut(params)
+    if np.array_equal(lut, np.arange(256, dtype=np.uint8)):
+        return np.ascontiguousarray(gray) if gray is not array else gray.copy()
+    return np.take(lut, gray)
+
+
+class FilterCache:
+    """Resultados por (imagem, parâmetros), LRU limitada por bytes; usada só na thread da GUI."""
+    def __init__(self, budget_bytes=1024 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()  # chave -> (valor, bytes)
+        self.bytes = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, cost):
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, cost)
+        self.bytes += cost
+        while self.bytes > self.budget_bytes and len(self.entries) > 1:
+            _, (_, old_cost) = self.entries.popitem(last=False)
+            self.bytes -= old_cost
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
@@ -0,0 +1,173 @@
+"""
+Geometria do ângulo de Cobb, sem dependência de Qt.
+
+Pontos são pares (x, y) em coordenadas da imagem. As funções escalares usam math puro
+(mais rápido que numpy para um único par de linhas); cobb_vetorizado processa N pares
+de uma vez com numpy, importado só na primeira chamada para manter o import leve.
+"""
+import math
+
+# A partir de quantos pares de linhas o kernel vetorizado compensa
+VECTOR_THRESHOLD = 32  # ponto de equilíbrio medido em benchmarks/geometry.py
+
+
+def ponto_interseccao(p1, p2, q1, q2):
+    """Calcula o ponto de interseção de duas retas, ou None se paralelas."""
+    (x1, y1), (x2, y2) = p1, p2
+    (x3, y3), (x4, y4) = q1, q2
+
+    denom = (x1-x2)*(y3-y4) - (y1-y2)*(x3-x4)
+    if denom == 0:  # retas paralelas
+        return None
+    px = ((x1*y2 - y1*x2)*(x3-x4) - (x1-x2)*(x3*y4 - y3*x4)) / denom
+    py = ((x1*y2 - y1*x2)*(y3-y4) - (y1-y2)*(x3*y4 - y3*x4)) / denom
+    return (px, py)
+
+
+def prolongar_reta_para_encontro(p1, p2, encontro, largura, altura):
+    """Prolonga a linha, a partir da ponta oposta ao encontro, até a margem de 10% da imagem."""
+    dx, dy = p2[0] - p1[0], p2[1] - p1[1]
+    norm = math.hypot(dx, dy)
+    if norm == 0:
+        return p1, p2
+
+    if (encontro[0] - p1[0]) * dx + (encontro[1] - p1[1]) * dy > 0:
+        origem = p2
+        dir_x, dir_y = dx / norm, dy / norm
+    else:
+        origem = p1
+        dir_x, dir_y = -dx / norm, -dy / norm
+
+    xmin, xmax = 0.1 * largura, 0.9 * largura
+    ymin, ymax = 0.1 * altura, 0.9 * altura
+
+    ts = []
+    if dir_x != 0:
+        ts.extend([(xmin - origem[0]) / dir_x, (xmax - origem[0]) / dir_x])
+    if dir_y != 0:
+        ts.extend([(ymin - origem[1]) / dir_y, (ymax - origem[1]) / dir_y])
+
+    ts_validos = [t for t in ts if t >= 0]
+    t_max = min(ts_validos) if ts_validos else 0
+
+    return (origem[0], origem[1]), (origem[0] + dir_x * t_max, origem[1] + dir_y * t_max)
+
+
+def angulo_cobb(p1, p2, q1, q2, escala=(1.0, 1.0)):
+    """
+    Ângulo em graus (0–180) entre as retas p1-p2 e q1-q2, com as pontas ordenadas por x.
+
+    escala: tamanho do pixel (x, y), ex. em mm; só importa quando o pixel não é quadrado.
+    """
+    if p1[0] > p2[0]:
+        p1, p2 = p2, p1
+    if q1[0] > q2[0]:
+        q1, q2 = q2, q1
+
+    sx, sy = escala
+    v1x, v1y = (p2[0] - p1[0]) * sx, (p2[1] - p1[1]) * sy
+    v2x, v2y = (q2[0] - q1[0]) * sx, (q2[1] - q1[1]) * sy
+
+    dot = v1x * v2x + v1y * v2y
+    norm = math.hypot(v1x, v1y) * math.hypot(v2x, v2y)
+    cos_theta = dot / norm if norm != 0 else 0
+    return math.degrees(math.acos(max(-1.0, min(1.0, cos_theta))))
+
+
+def medir_cobb(pontos, largura=None, altura=None, escala=(1.0, 1.0)):
+    """
+    Ângulo e prolongamentos de um único par de linhas (versão escalar de cobb_vetorizado).
+
+    Retorna (angulo, intersecao ou None, segmentos ou None), com segmentos[k] = (inicio, fim)
+    do prolongamento da linha k.
+    """
+    p1, p2, q1, q2 = pontos
+    angulo = angulo_cobb(p1, p2, q1, q2, escala)
+    intersecao = ponto_interseccao(p1, p2, q1, q2)
+    if largura is None or altura is None:
+        return angulo, intersecao, None
+    segmentos = tuple(
+        prolongar_reta_para_encontro(a, b, intersecao, largura, altura) if intersecao is not None else (a, b)
+        for a, b in ((p1, p2), (q1, q2))
+    )
+    return angulo, intersecao, segmentos
+
+
+def _prolongar_vetorizado(a, b, encontro, paralelas, largura, altura):
+    """Versão vetorizada de prolongar_reta_para_encontro para arrays (N, 2)."""
+    import numpy as np
+
+    d = b - a
+    norm = np.hypot(d[:, 0], d[:, 1])
+    degenerada = paralelas | (norm == 0)
+    safe_norm = np.where(norm == 0, 1.0, norm)
+    unit = d / safe_norm[:, None]
+
+    # Sem interseção o produto vale NaN e a comparação dá False; essas linhas são descartadas abaixo
+    rumo = np.einsum("ij,ij->i", encontro - a, d) > 0
+    origem = np.where(rumo[:, None], b, a)
+    direcao = np.where(rumo[:, None], unit, -unit)
+
+    xmin, xmax = 0.1 * largura, 0.9 * largura
+    ymin, ymax = 0.1 * altura, 0.9 * altura
+    ox, oy = origem[:, 0], origem[:, 1]
+    dx, dy = direcao[:, 0], direcao[:, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ts = np.column_stack([(xmin - ox) / dx, (xmax - ox) / dx, (ymin - oy) / dy, (ymax - oy) / dy])
+    # Direção nula em um eixo gera ±inf/NaN: só valem t >= 0, e +inf nunca vence o mínimo
+    ts[~(ts >= 0)] = np.inf
+    t_max = ts.min(axis=1)
+    t_max[np.isinf(t_max)] = 0.0
+
+    fim = origem + direcao * t_max[:, None]
+    inicio = np.where(degenerada[:, None], a, origem)
+    fim = np.where(degenerada[:, None], b, fim)
+    return np.stack([inicio, fim], axis=1)
+
+
+def cobb_vetorizado(pontos, largura=None, altura=None, escala=(1.0, 1.0)):
+    """
+    Calcula N ângulos de Cobb de uma vez.
+
+    pontos: array (N, 4, 2) com p1, p2, q1, q2 de cada par de linhas.
+    largura, altura: tamanho da imagem (escalar ou (N,)); se omitidos, os prolongamentos não são calculados.
+    escala: tamanho do pixel (x, y) usado no ângulo, como em angulo_cobb.
+    Retorna (angulos (N,), intersecoes (N, 2) com NaN se paralelas, segmentos (N, 2, 2, 2) ou None),
+    onde segmentos[i, k] é o início e o fim do prolongamento da linha k.
+    """
+    import numpy as np
+
+    pts = np.asarray(pontos, dtype=float).reshape(-1, 4, 2)
+    p1, p2, q1, q2 = pts[:, 0], pts[:, 1], pts[:, 2], pts[:, 3]
+
+    # Ângulo com as pontas ordenadas por x, como em angulo_cobb
+    escala = np.asarray(escala, dtype=float)
+    v1 = (p2 - p1) * escala
+    v2 = (q2 - q1) * escala
+    v1 = np.where(v1[:, :1] < 0, -v1, v1)
+    v2 = np.where(v2[:, :1] < 0, -v2, v2)
+    dot = np.einsum("ij,ij->i", v1, v2)
+    norm = np.hypot(v1[:, 0], v1[:, 1]) * np.hypot(v2[:, 0], v2[:, 1])
+    cos_theta = np.divide(dot, norm, out=np.zeros_like(dot), where=norm != 0)
+    angulos = np.degrees(np.arccos(np.clip(cos_theta, -1.0, 1.0)))
+
+    # Interseção das retas suporte
+    (x1, y1), (x2, y2) = p1.T, p2.T
+    (x3, y3), (x4, y4) = q1.T, q2.T
+    denom = (x1-x2)*(y3-y4) - (y1-y2)*(x3-x4)
+    paralelas = denom == 0
+    safe = np.where(paralelas, 1.0, denom)
+    a = x1*y2 - y1*x2
+    b = x3*y4 - y3*x4
+    px = (a*(x3-x4) - (x1-x2)*b) / safe
+    py = (a*(y3-y4) - (y1-y2)*b) / safe
+    intersecoes = np.where(paralelas[:, None], np.nan, np.stack([px, py], axis=1))
+
+    if largura is None or altura is None:
+        return angulos, intersecoes, None
+
+    segmentos = np.stack([
+        _prolongar_vetorizado(p1, p2, intersecoes, paralelas, largura, altura),
+        _prolongar_vetorizado(q1, q2, intersecoes, paralelas, largura, altura),
+    ], axis=1)
+    return angulos, intersecoes, segmentos
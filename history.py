@@ -0,0 +1,72 @@
+"""
+Histórico de edições (desfazer/refazer) e registro da sessão para reprodução (sem Qt).
+
+Cada comando é uma tupla curta que começa pelo nome da operação, por exemplo
+("move", ponto, dx, dy) para um arraste inteiro ou ("add", (angulo, ...)); quem aplica os
+comandos é o ImageViewer. Desfazer e refazer só movem um comando entre duas pilhas (O(1)),
+e a pilha de desfazer tem tamanho máximo: o comando mais antigo é descartado.
+
+O registro da sessão grava cada evento numa linha JSON, em disco e não em memória
+(COBB_SESSION_LOG=arquivo.jsonl); load_session lê de volta para ImageViewer.replay_session.
+"""
+import json
+import os
+import time
+from collections import deque
+
+SESSION_LOG_ENV = os.environ.get("COBB_SESSION_LOG")
+
+
+class History:
+    """Pilhas de desfazer/refazer com no máximo limit comandos."""
+    def __init__(self, limit=1000):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+
+    def push(self, command):
+        self.undo_stack.append(command)
+        self.redo_stack.clear()  # uma edição nova invalida o que foi desfeito
+
+    def undo(self):
+        """Comando a desfazer (já movido para a pilha de refazer), ou None."""
+        if not self.undo_stack:
+            return None
+        command = self.undo_stack.pop()
+        self.redo_stack.append(command)
+        return command
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        command = self.redo_stack.pop()
+        self.undo_stack.append(command)
+        return command
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def __len__(self):
+        return len(self.undo_stack)
+
+
+class SessionLog:
+    """Eventos da sessão em JSONL, com o tempo em segundos desde o início do registro."""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+        self.started = time.perf_counter()
+
+    def write(self, event):
+        event = {"t": round(time.perf_counter() - self.started, 4), **event}
+        self.file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def load_session(path):
+    """Eventos gravados por SessionLog, na ordem."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,256 @@
+"""
+Carregamento de imagens em segundo plano (QThreadPool + QImageReader, ou dicom.DicomImage).
+"""
+import time
+
+from PyQt6.QtGui import QImage, QImageReader
+from PyQt6.QtCore import QObject, QRunnable, QSize, Qt, pyqtSignal
+
+from tiles import ImagePyramid
+from buffers import ImageBuffer
+from profiling import profiler, logger
+
+# Radiografias de cassete longo passam facilmente do limite padrão de 256 MB do Qt
+QImageReader.setAllocationLimit(0)
+
+
+class ImageLoadSignals(QObject):
+    """Sinais emitidos pela tarefa de carregamento (entregues na thread da GUI)."""
+    progress = pyqtSignal(int, str)
+    preview = pyqtSignal(QImage, QSize)
+    finished = pyqtSignal(object, float)  # ImagePyramid, segundos
+    failed = pyqtSignal(str)
+
+
+def gray_to_qimage(array):
+    """Copia um array uint8 (altura, largura) C-contíguo para um QImage Grayscale8."""
+    height, width = array.shape
+    return QImage(array.data, width, height, width, QImage.Format.Format_Grayscale8).copy()
+
+
+class WarmUpTask(QRunnable):
+    """Importa numpy e o leitor de DICOM em segundo plano, logo depois que a janela abre."""
+    def run(self):
+        import numpy  # noqa: F401
+        import dicom  # noqa: F401
+
+
+class ImageLoadTask(QRunnable):
+    """Decodifica uma imagem fora da thread da GUI, com prévia em baixa resolução."""
+    def __init__(self, path, preview_size=1024, cache=None):
+        super().__init__()
+        self.path = path
+        self.preview_size = preview_size
+        self.cache = cache  # buffers.BufferCache opcional com as imagens já decodificadas
+        self.cancelled = False
+        self.dicom = None  # DicomImage, quando o arquivo é DICOM
+        # Criado na thread da GUI para que os sinais cheguem por conexão enfileirada
+        self.signals = ImageLoadSignals()
+
+    def cancel(self):
+        """Pede o cancelamento; a decodificação em curso é descartada ao terminar."""
+        self.cancelled = True
+
+    def run(self):
+        from dicom import is_dicom  # import tardio: numpy fica fora da inicialização da GUI
+
+        t0 = time.perf_counter()
+        if is_dicom(self.path):
+            self.run_dicom(t0)
+            return
+        if self.cache is not None:
+            buffers = self.cache.load(self.path)
+            if buffers is not None:
+                self.signals.progress.emit(50, "Reabrindo do cache")
+                self.finish(ImagePyramid.from_buffers(buffers), t0)
+                return
+        reader = QImageReader(self.path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if not size.isValid():
+            self.signals.failed.emit(reader.errorString())
+            return
+        self.signals.progress.emit(5, "Lendo cabeçalho")
+
+        # Prévia rápida: o decodificador reduz a escala durante a leitura (JPEG usa DCT reduzida)
+        if max(size.width(), size.height()) > self.preview_size:
+            reader.setScaledSize(size.scaled(
+                QSize(self.preview_size, self.preview_size), Qt.AspectRatioMode.KeepAspectRatio
+            ))
+            preview = reader.read()
+            if self.cancelled:
+                return
+            if not preview.isNull():
+                self.signals.preview.emit(preview, size)
+            self.signals.progress.emit(20, "Decodificando imagem completa")
+            reader = QImageReader(self.path)
+            reader.setAutoTransform(True)
+
+        with profiler.timer("imagem.decodificacao"):
+            image = reader.read()
+        if self.cancelled:
+            return
+        if image.isNull():
+            self.signals.failed.emit(reader.errorString())
+            return
+        self.signals.progress.emit(70, "Gerando pirâmide de resolução")
+        pyramid = ImagePyramid.from_buffers([ImageBuffer.from_qimage(image)])
+        del image
+        if self.cache is not None:
+            # As cópias decodificadas são trocadas pelo memmap do cache (páginas descartáveis pelo SO)
+            try:
+                pyramid = ImagePyramid.from_buffers(self.cache.store(self.path, pyramid.buffers))
+            except OSError as e:
+                logger.warning(f"Cache de imagens indisponível: {e}")
+        self.finish(pyramid, t0)
+
+    def finish(self, pyramid, t0):
+        if self.cancelled:
+            return
+        secs = time.perf_counter() - t0
+        profiler.record("imagem.carregamento", secs * 1000, largura=pyramid.width(), altura=pyramid.height())
+        self.signals.progress.emit(100, "Concluído")
+        self.signals.finished.emit(pyramid, secs)
+
+    def run_dicom(self, t0):
+        """Lê o cabeçalho, mostra uma prévia subamostrada e aplica a janela padrão."""
+        from dicom import DicomImage
+
+        try:
+            dicom = DicomImage(self.path)
+            self.signals.progress.emit(5, "Lendo cabeçalho DICOM")
+            center, width = dicom.default_window()
+            step = dicom.preview_step(self.preview_size)
+            if step > 1:
+                self.signals.preview.emit(gray_to_qimage(dicom.display(center, width, step)),
+                                          QSize(dicom.columns, dicom.rows))
+                if self.cancelled:
+                    return
+                self.signals.progress.emit(20, "Aplicando janela/nível")
+            buffer = ImageBuffer(dicom.display(center, width))
+        except Exception as e:  # pydicom ausente, sintaxe comprimida sem plugin, arquivo corrompido...
+            self.signals.failed.emit(str(e))
+            return
+        if self.cancelled:
+            return
+        dicom.window_center, dicom.window_width = center, width
+        self.dicom = dicom
+        self.signals.progress.emit(70, "Gerando pirâmide de resolução")
+        self.finish(ImagePyramid.from_buffers([buffer]), t0)
+
+
+class EndplateSignals(QObject):
+    finished = pyqtSignal(object, float)  # endplates.EndplateResult, segundos
+    failed = pyqtSignal(str)
+
+
+class EndplateDetectionTask(QRunnable):
+    """Sugere linhas de placas vertebrais num nível reduzido da pirâmide, fora da thread da GUI."""
+    def __init__(self, pyramid, model_path=None):
+        super().__init__()
+        self.pyramid = pyramid
+        self.model_path = model_path
+        self.cancelled = False
+        self.signals = EndplateSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        import endplates
+
+        t0 = time.perf_counter()
+        try:
+            buffers = self.pyramid.buffers or [ImageBuffer.from_qimage(level) for level in self.pyramid.levels]
+            array = buffers[endplates.working_level(buffers)].array
+            model = endplates.OnnxEndplateModel(self.model_path) if self.model_path else None
+            result = endplates.detect_endplates(array, self.pyramid.width() / array.shape[1], model)
+        except Exception as e:  # modelo ONNX inválido, onnxruntime ausente...
+            self.signals.failed.emit(str(e))
+            return
+        if self.cancelled:
+            return
+        secs = time.perf_counter() - t0
+        profiler.record("vertebras.deteccao", secs * 1000, linhas=len(result.lines))
+        self.signals.finished.emit(result, secs)
+
+
+class WindowLevelTask(QRunnable):
+    """Reaplica janela/nível sobre os pixels brutos em cache e gera a nova pirâmide."""
+    def __init__(self, dicom, center, width):
+        super().__init__()
+        self.dicom = dicom
+        self.center = center
+        self.width = width
+        self.signals = ImageLoadSignals()
+
+    def run(self):
+        t0 = time.perf_counter()
+        try:
+            buffer = ImageBuffer(self.dicom.display(self.center, self.width))
+        except Exception as e:  # falta de memória num estudo grande, arquivo removido do disco...
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(ImagePyramid.from_buffers([buffer]), time.perf_counter() - t0)
+
+
+class FilterTask(QRunnable):
+    """Aplica o realce de contraste (filters.py) à imagem original e gera a nova pirâmide."""
+    def __init__(self, source, params):
+        super().__init__()
+        self.source = source  # ImagePyramid sem filtro
+        self.params = params
+        self.cancelled = False
+        self.signals = ImageLoadSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        import filters
+
+        t0 = time.perf_counter()
+        try:
+            buffer = self.source.buffer or ImageBuffer.from_qimage(self.source.levels[0])
+            with profiler.timer("filtros.aplicacao"):
+                array = filters.apply_filters(buffer.array, self.params)
+            if self.cancelled:
+                return
+            pyramid = ImagePyramid.from_buffers([ImageBuffer(array)])
+        except MemoryError as e:
+            self.signals.failed.emit(f"memória insuficiente ({e})")
+            return
+        except Exception as e:  # parâmetros inválidos, erro do numpy... nunca sai do QRunnable
+            self.signals.failed.emit(str(e))
+            return
+        if self.cancelled:
+            return
+        self.signals.finished.emit(pyramid, time.perf_counter() - t0)
+
+
+class IngestTask(ImageLoadTask):
+    """Carregamento da pasta monitorada: além da pirâmide, gera a miniatura e, opcionalmente, as placas sugeridas."""
+    def __init__(self, path, cache=None, propose_landmarks=False, thumbnail_size=256):
+        # Sem prévia: ninguém está olhando este estudo enquanto ele é preparado
+        super().__init__(path, preview_size=1 << 30, cache=cache)
+        self.propose_landmarks = propose_landmarks
+        self.thumbnail_size = thumbnail_size
+        self.thumbnail = None
+        self.proposal = None  # endplates.EndplateResult
+
+    def finish(self, pyramid, t0):
+        if self.cancelled:
+            return
+        size = QSize(self.thumbnail_size, self.thumbnail_size)
+        self.thumbnail = pyramid.levels[-1].scaled(size, Qt.AspectRatioMode.KeepAspectRatio,
+                                                   Qt.TransformationMode.SmoothTransformation)
+        if self.propose_landmarks:
+            import endplates
+
+            try:
+                buffers = pyramid.buffers or [ImageBuffer.from_qimage(level) for level in pyramid.levels]
+                array = buffers[endplates.working_level(buffers)].array
+                self.proposal = endplates.detect_endplates(array, pyramid.width() / array.shape[1])
+            except Exception as e:  # a sugestão é opcional: o estudo segue para a lista mesmo assim
+                logger.warning(f"Sugestão de placas falhou em {self.path}: {e}")
+        super().finish(pyramid, t0)
@@ -2,13 +2,32 @@ from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QFileDialog, QGraphicsView,
     QGraphicsScene, QGraphicsPixmapItem, QVBoxLayout, QWidget,
     QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsLineItem, QMenu, QLabel,
-    QColorDialog, QHBoxLayout
+    QColorDialog, QHBoxLayout, QProgressBar, QInputDialog, QGraphicsItem,
+    QDialog, QFormLayout, QSlider, QDoubleSpinBox, QCheckBox, QDialogButtonBox, QMessageBox
 )
-from PyQt6.QtGui import QPixmap, QColor, QPen, QFont, QPainter, QIcon
-from PyQt6.QtCore import Qt, QPointF, QSize, QRectF,  Qt, QPointF, QSize, QRectF
+from PyQt6.QtGui import QPixmap, QColor, QPen, QFont, QIcon, QShortcut, QKeySequence, QPixmapCache
+from PyQt6.QtCore import Qt, QPointF, QSize, QRectF,  Qt, QPointF, QSize, QRectF, QTimer, QThreadPool
+import logging
 import sys
-import numpy as np
+import time
 import os
+import sqlite3
+import uuid
+from collections import deque
+
+import geometry
+import curves
+import measurements
+from loader import ImageLoadTask, WindowLevelTask, WarmUpTask, EndplateDetectionTask, FilterTask
+from tiles import TiledImageItem
+from spatial import PointGrid
+from memory import process_memory_mb
+from export import SceneExportJob
+from buffers import BufferCache, ImageBuffer
+from studies import StudyNavigator
+from annotations import AnnotationStore
+from history import History, SessionLog, SESSION_LOG_ENV
+from profiling import profiler, logger, configure_logging, PROFILE_ENV
 
 def resource_path(relative_path):
     """Retorna o caminho absoluto de arquivos, compatível com PyInstaller."""
@@ -21,58 +40,80 @@ def resource_path(relative_path):
 App para visualização e cálculo do ângulo de Cobb em imagens radiográficas.
 """
 # ---------------- Funções de geometria ----------------
+# A matemática (interseção, prolongamentos, ângulo) fica em geometry.py, sem Qt
 def log(msg):
-    pass  # Troque por print(msg) ou logging se quiser depurar
-def ponto_interseccao(p1, p2, q1, q2):
-    """Calcula o ponto de interseção de duas retas, ou None se paralelas."""
-    x1, y1 = p1.x(), p1.y()
-    x2, y2 = p2.x(), p2.y()
-    x3, y3 = q1.x(), q1.y()
-    x4, y4 = q2.x(), q2.y()
-
-    denom = (x1-x2)*(y3-y4) - (y1-y2)*(x3-x4)
-    if denom == 0:  # retas paralelas
-        return None
-    px = ((x1*y2 - y1*x2)*(x3-x4) - (x1-x2)*(x3*y4 - y3*x4)) / denom
-    py = ((x1*y2 - y1*x2)*(y3-y4) - (y1-y2)*(x3*y4 - y3*x4)) / denom
-    return QPointF(px, py)
-
-def prolongar_reta_para_encontro(p1: QPointF, p2: QPointF, encontro: QPointF, largura: int, altura: int):
-    """Prolonga a linha até os limites da imagem com margem de 5%."""
-    p1_arr = np.array([p1.x(), p1.y()], dtype=float)
-    p2_arr = np.array([p2.x(), p2.y()], dtype=float)
-    dir_vec = p2_arr - p1_arr
-
-    if np.linalg.norm(dir_vec) == 0:
-        return p1, p2
-
-    encontro_arr = np.array([encontro.x(), encontro.y()])
-    if np.dot(encontro_arr - p1_arr, dir_vec) > 0:
-        origem = p2_arr
-        dir_final = dir_vec / np.linalg.norm(dir_vec)
-    else:
-        origem = p1_arr
-        dir_final = -dir_vec / np.linalg.norm(dir_vec)
-
-    xmin, xmax = 0.1 * largura, 0.9 * largura
-    ymin, ymax = 0.1 * altura, 0.9 * altura
+    logger.debug(msg)  # visível com COBB_LOG=DEBUG (ver profiling.py)
 
-    ts = []
-    if dir_final[0] != 0:
-        ts.extend([(xmin - origem[0]) / dir_final[0], (xmax - origem[0]) / dir_final[0]])
-    if dir_final[1] != 0:
-        ts.extend([(ymin - origem[1]) / dir_final[1], (ymax - origem[1]) / dir_final[1]])
-
-    ts_validos = [t for t in ts if t >= 0]
-    t_max = min(ts_validos) if ts_validos else 0
+# ---------------- UpdateScheduler ----------------
+class UpdateScheduler:
+    """Agrupa atualizações de linhas e ângulos em um único recálculo por ciclo do event loop."""
+    def __init__(self):
+        # dicts como conjuntos ordenados: cada item aparece uma única vez por ciclo
+        self.dirty_lines = {}
+        self.dirty_angles = {}
+        self.dirty_measurements = {}
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.flush)
+
+    def mark_line(self, line):
+        """Marca a linha e todos os ângulos ligados a ela como sujos."""
+        self.dirty_lines[line] = None
+        for angle in line.angles:
+            self.dirty_angles[angle] = None
+        if line.measurements:  # None enquanto nenhuma medida usa a linha
+            for measurement in line.measurements:
+                self.dirty_measurements[measurement] = None
+        self.schedule()
+
+    def mark_angle(self, angle):
+        self.dirty_angles[angle] = None
+        self.schedule()
+
+    def mark_measurement(self, measurement):
+        self.dirty_measurements[measurement] = None
+        self.schedule()
+
+    def discard(self, angle):
+        """Remove um ângulo (ou medida) apagado da fila de recálculo."""
+        self.dirty_angles.pop(angle, None)
+        self.dirty_measurements.pop(angle, None)
+
+    def schedule(self):
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Recalcula de uma vez tudo o que foi marcado desde o último ciclo."""
+        self.timer.stop()
+        lines, self.dirty_lines = self.dirty_lines, {}
+        angles, self.dirty_angles = self.dirty_angles, {}
+        measures, self.dirty_measurements = self.dirty_measurements, {}
+        if not (lines or angles or measures):
+            return
+        with profiler.timer("cena.flush"):
+            for line in lines:
+                line.update_line()
+            if len(angles) >= geometry.VECTOR_THRESHOLD:
+                CobbAngleItem.update_many(list(angles))
+            else:
+                for angle in angles:
+                    angle.update()
+            for measurement in measures:
+                measurement.update()
+        profiler.count("cena.linhas", len(lines))
+        profiler.count("angulo.recalculo", len(angles))
 
-    ponto_ext = origem + dir_final * t_max
-    return QPointF(origem[0], origem[1]), QPointF(ponto_ext[0], ponto_ext[1])
+# Cor do ângulo de cada região na análise de curvas
+CURVE_COLORS = {"torácica": "#d32f2f", "toracolombar": "#388e3c", "lombar": "#7b1fa2"}
 
 # ---------------- CobbAngleItem ----------------
 class CobbAngleItem:
     """Representa o ângulo de Cobb entre duas linhas."""
-    def __init__(self, line1: 'LineConnection', line2: 'LineConnection', scene: QGraphicsScene, COLOR=Qt.GlobalColor.blue):
+    def __init__(self, line1: 'LineConnection', line2: 'LineConnection', scene: QGraphicsScene, COLOR=Qt.GlobalColor.blue, uid=None):
+        self.uid = uid or uuid.uuid4().hex  # chave estável no AnnotationStore
+        self.region = None  # região da curva, quando criado por ImageViewer.analyze_curves
         self.line1 = line1
         self.line2 = line2
         self.scene = scene
@@ -104,7 +145,8 @@ class CobbAngleItem:
             QGraphicsLineItem.GraphicsItemFlag.ItemIsMovable
         )
         self.text_item.setDefaultTextColor(COLOR)
-        self.text_item.setFont(QFont("Arial", self.font_size, QFont.Weight.Bold))
+        self.font = QFont("Arial", self.font_size, QFont.Weight.Bold)
+        self.text_item.setFont(self.font)
         
         # Conecta eventos do mouse
         self.text_item.mousePressEvent = self.on_text_press
@@ -151,7 +193,7 @@ class CobbAngleItem:
                 self.resize_start_pos = event.scenePos()
                 self.resize_start_size = self.font_size
                 self.text_item.setCursor(Qt.CursorShape.SizeFDiagCursor)
-                print("Modo de redimensionamento ativado. Arraste para redimensionar.")
+                self.scene.viewer.notify("Modo de redimensionamento ativado. Arraste para redimensionar.")
             else:
                 # Movimento normal do texto
                 super(QGraphicsTextItem, self.text_item).mousePressEvent(event)
@@ -172,9 +214,10 @@ class CobbAngleItem:
             new_size = max(12, min(72, self.resize_start_size + delta * sensitivity))
             
             # Atualiza tamanho em tempo real
-            self.font_size = int(new_size)
-            font = QFont("Arial", self.font_size, QFont.Weight.Bold)
-            self.text_item.setFont(font)
+            if int(new_size) != self.font_size:
+                self.font_size = int(new_size)
+                self.font.setPointSize(self.font_size)
+                self.text_item.setFont(self.font)
             
         else:
             # Verifica se está sobre área de redimensionamento para mudar cursor
@@ -199,56 +242,62 @@ class CobbAngleItem:
             self.resize_start_pos = None
             self.resize_start_size = None
             self.text_item.setCursor(Qt.CursorShape.ArrowCursor)
-            print(f"Redimensionamento concluído. Novo tamanho: {self.font_size}")
+            log(f"Redimensionamento concluído. Novo tamanho: {self.font_size}")
         else:
             super(QGraphicsTextItem, self.text_item).mouseReleaseEvent(event)
+        self.scene.viewer.mark_annotation_dirty(self)
 
     def change_font_size(self, new_size):
         """Altera o tamanho da fonte do texto."""
         self.font_size = new_size
-        font = QFont("Arial", self.font_size, QFont.Weight.Bold)
-        self.text_item.setFont(font)
-        print(f"Tamanho da fonte alterado para: {new_size}")
-
-    def calculate_angle(self):        
-        p1, p2 = self.line1.p1, self.line1.p2
-        q1, q2 = self.line2.p1, self.line2.p2
-
-        if p1.pos().x() > p2.pos().x():
-            p1, p2 = p2, p1
-        if q1.pos().x() > q2.pos().x():
-            q1, q2 = q2, q1
-
-        # Vetores normalizados
-        v1 = np.array([p2.pos().x() - p1.pos().x(), p2.pos().y() - p1.pos().y()])
-        v2 = np.array([q2.pos().x() - q1.pos().x(), q2.pos().y() - q1.pos().y()])
-
-        dot = np.dot(v1, v2)
-        norm = np.linalg.norm(v1) * np.linalg.norm(v2)
-        cos_theta = dot / norm if norm != 0 else 0
-        theta_rad = np.arccos(np.clip(cos_theta, -1.0, 1.0))
-        theta_deg = np.degrees(theta_rad)
-
-        # Prolonga linhas para visualização
-        largura = self.scene.viewer.pixmap_item.pixmap().width()
-        altura = self.scene.viewer.pixmap_item.pixmap().height()
-        intersec = ponto_interseccao(p1.pos(), p2.pos(), q1.pos(), q2.pos())
-        for ext_line, a, b in [
-            (self.ext_line1, p1.pos(), p2.pos()),
-            (self.ext_line2, q1.pos(), q2.pos())
-        ]:
-            start, end = prolongar_reta_para_encontro(a, b, intersec, largura, altura) if intersec is not None else (a, b)
-            ext_line.setLine(start.x(), start.y(), end.x(), end.y())
+        self.font.setPointSize(self.font_size)
+        self.text_item.setFont(self.font)
+        self.scene.viewer.mark_annotation_dirty(self)
+        log(f"Tamanho da fonte alterado para: {new_size}")
 
+    def calculate_angle(self):
+        # Ângulo e prolongamentos vêm de geometry; aqui só se atualizam os itens gráficos
+        image_rect = self.scene.viewer.pixmap_item.boundingRect()
+        with profiler.timer("angulo.geometria"):
+            theta_deg, _, segmentos = geometry.medir_cobb(
+                self.endpoints(), image_rect.width(), image_rect.height(), self.scene.viewer.pixel_scale()
+            )
+        for ext_line, ((x1, y1), (x2, y2)) in zip((self.ext_line1, self.ext_line2), segmentos):
+            ext_line.setLine(x1, y1, x2, y2)
         return theta_deg
 
+    def endpoints(self):
+        """Retorna p1, p2, q1, q2 como tuplas (x, y)."""
+        return [(p.pos().x(), p.pos().y()) for p in (self.line1.p1, self.line1.p2, self.line2.p1, self.line2.p2)]
+
+    @staticmethod
+    def update_many(angles):
+        """Recalcula vários ângulos numa única chamada de geometry.cobb_vetorizado."""
+        viewer = angles[0].scene.viewer
+        image_rect = viewer.pixmap_item.boundingRect()
+        with profiler.timer("angulo.vetorizado"):
+            angulos, _, segmentos = geometry.cobb_vetorizado(
+                [angle.endpoints() for angle in angles], image_rect.width(), image_rect.height(),
+                viewer.pixel_scale()
+            )
+        for angle, theta_deg, segs in zip(angles, angulos.tolist(), segmentos.tolist()):
+            for ext_line, ((x1, y1), (x2, y2)) in zip((angle.ext_line1, angle.ext_line2), segs):
+                ext_line.setLine(x1, y1, x2, y2)
+            angle.angle_deg = theta_deg
+            angle.refresh_text()
+
     def update(self):
         self.angle_deg = self.calculate_angle()
-        self.text_item.setPlainText(f"{self.angle_deg:.1f}°")
-        # Mantém o tamanho da fonte atual
-        font = QFont("Arial", self.font_size, QFont.Weight.Bold)
-        self.text_item.setFont(font)
+        self.refresh_text()
+
+    def refresh_text(self):
+        text = f"{self.angle_deg:.1f}°"
+        # Só refaz o layout do texto se o valor exibido mudou; a fonte é mantida
+        if text != self.text_item.toPlainText():
+            self.text_item.setPlainText(text)
+            profiler.count("texto.relayout")
         self.update_text_position()
+        self.scene.viewer.mark_annotation_dirty(self)
 
     def update_text_position(self):
         # Posição do texto no centro aproximado das linhas
@@ -257,6 +306,63 @@ class CobbAngleItem:
         self.text_item.setPos(x + 5, y + 5)
 
 
+# ---------------- MeasurementItem ----------------
+class MeasurementItem:
+    """Medida de um tipo do registro measurements, sobre LineConnections e com o mesmo ciclo de atualização."""
+    def __init__(self, kind, lines, scene, color=QColor("#00897b"), uid=None):
+        self.uid = uid or uuid.uuid4().hex
+        self.kind = kind
+        self.lines = lines
+        self.scene = scene
+        self.color = QColor(color)
+        self.pen = QPen(self.color, 3, Qt.PenStyle.CustomDashLine)
+        self.pen.setDashPattern([4, 3])
+        self.overlay = []  # QGraphicsLineItem dos segmentos auxiliares, reaproveitados a cada quadro
+
+        self.text_item = QGraphicsTextItem()
+        self.text_item.setZValue(2)
+        self.text_item.setDefaultTextColor(self.color)
+        self.text_item.setFont(QFont("Arial", 20, QFont.Weight.Bold))
+        self.text_item.mousePressEvent = self.on_text_press
+        scene.addItem(self.text_item)
+
+        for line in lines:
+            if line.measurements is None:
+                line.measurements = []
+            line.measurements.append(self)
+        self.value = None
+        self.update()
+
+    def points(self):
+        return [(p.pos().x(), p.pos().y()) for line in self.lines for p in (line.p1, line.p2)]
+
+    def update(self):
+        viewer = self.scene.viewer
+        with profiler.timer("medida.calculo"):
+            medida = self.kind.calcular(self.points(), viewer.pixel_scale(), viewer.pixel_spacing is not None)
+        while len(self.overlay) < len(medida.segmentos):
+            item = QGraphicsLineItem()
+            item.setPen(self.pen)
+            self.scene.addItem(item)
+            self.overlay.append(item)
+        for item, ((x1, y1), (x2, y2)) in zip(self.overlay, medida.segmentos):
+            item.setLine(x1, y1, x2, y2)
+        if medida.texto != self.text_item.toPlainText():
+            self.text_item.setPlainText(medida.texto)
+            profiler.count("texto.relayout")
+        self.text_item.setPos(medida.ancora[0] + 5, medida.ancora[1] + 5)
+        self.value = medida.valor
+        viewer.mark_annotation_dirty(self)
+
+    def on_text_press(self, event):
+        if event.button() == Qt.MouseButton.RightButton:
+            menu = QMenu()
+            menu.addAction("Remover Medida").triggered.connect(lambda: self.scene.viewer.delete_measurement(self))
+            menu.exec(event.screenPos())
+        else:
+            super(QGraphicsTextItem, self.text_item).mousePressEvent(event)
+
+
 # ---------------- DraggablePoint ----------------
 class DraggablePoint(QGraphicsEllipseItem):
     """Ponto arrastável na cena gráfica."""
@@ -269,20 +375,33 @@ class DraggablePoint(QGraphicsEllipseItem):
         )
         self.setZValue(1)
         self.setPos(pos)
+        self.line = None  # LineConnection da qual o ponto é uma ponta
 
     def itemChange(self, change, value):
         if change == QGraphicsEllipseItem.GraphicsItemChange.ItemPositionChange:
-            pass
+            # Só o arraste do usuário é ajustado; desfazer, restaurar e reproduzir usam setPos direto
+            scene = self.scene()
+            if (scene is not None and scene.viewer.snap_enabled
+                    and scene.drag_start is not None and scene.drag_start[0] is self):
+                return scene.viewer.snap_dragged_point(self, value)
+        if change == QGraphicsEllipseItem.GraphicsItemChange.ItemPositionHasChanged:
+            # Mantém o índice espacial do visualizador em dia com o arraste
+            scene = self.scene()
+            if scene is not None and self in scene.viewer.points:
+                scene.viewer.points.move(self, value.x(), value.y())
         return super().itemChange(change, value)
 
 # ---------------- LineConnection ----------------
 class LineConnection:
     """Conexão entre dois pontos, representando uma linha manipulável."""
-    def __init__(self, scene, p1, p2, color=Qt.GlobalColor.blue, width=4):
+    def __init__(self, scene, p1, p2, color=Qt.GlobalColor.blue, width=4, uid=None):
+        self.uid = uid or uuid.uuid4().hex  # identifica placas e linhas de medida no registro da sessão
         self.scene = scene
         self.p1 = p1
         self.p2 = p2
+        p1.line = p2.line = self
         self.angles = []
+        self.measurements = None  # lista criada pela primeira MeasurementItem ligada à linha
 
         self.line = QGraphicsLineItem()
         self.line.setPen(QPen(color, width))
@@ -304,17 +423,13 @@ class LineConnection:
             self.p1.pos().x(), self.p1.pos().y(),
             self.p2.pos().x(), self.p2.pos().y()
         )
-        
-        for angle in self.angles:
-            angle.update()
 
     def wrap_item_change(self, point):
         old_item_change = point.itemChange
         def new_item_change(change, value):
-            if change == QGraphicsEllipseItem.GraphicsItemChange.ItemPositionChange:
-                self.update_line()
-                for angle in self.angles:
-                    angle.update()
+            # Só marca como sujo; o recálculo acontece uma vez por ciclo no UpdateScheduler
+            if change == QGraphicsEllipseItem.GraphicsItemChange.ItemPositionHasChanged:
+                self.scene.scheduler.mark_line(self)
             return old_item_change(change, value)
         return new_item_change
 
@@ -323,6 +438,9 @@ class LineConnection:
             menu = QMenu()
             if any(angle in self.scene.viewer.cobb_angles for angle in self.angles):
                 menu.addAction("Remover Ângulo de Cobb").triggered.connect(self.remove_cobb_angle)
+            for measurement in self.measurements or ():
+                menu.addAction(f"Remover {measurement.kind.nome}").triggered.connect(
+                    lambda checked, m=measurement: self.scene.viewer.delete_measurement(m))
             menu.addAction("Mudar Cor da Linha").triggered.connect(self.change_line_color)
             menu.exec(event.screenPos())
         super(QGraphicsLineItem, self.line).mousePressEvent(event)
@@ -330,50 +448,22 @@ class LineConnection:
     def change_line_color(self):
         color = QColorDialog.getColor()
         if color.isValid():
-            for angle in self.angles:
-                if angle in self.scene.viewer.cobb_angles:
-                    angle.line1.line.setPen(QPen(color, 4))
-                    angle.line2.line.setPen(QPen(color, 4))
-                    
-                    pen_ext = QPen(color, 4, Qt.PenStyle.CustomDashLine)
-                    pen_ext.setDashPattern([4, 3])
-                    angle.ext_line1.setPen(pen_ext)
-                    angle.ext_line2.setPen(pen_ext)
-                    
-                    angle.text_item.setDefaultTextColor(color)
-                    
-                    angle.line_color = color
+            viewer = self.scene.viewer
+            angles = tuple(angle for angle in self.angles if angle in viewer.cobb_angles)
+            old_colors = tuple(QColor(angle.line_color) for angle in angles)
+            for angle in angles:
+                viewer.set_angle_color(angle, color)
+            if angles:
+                viewer.record(("recolor", angles, old_colors, QColor(color)))
 
     def remove_cobb_angle(self):
-        for angle in self.angles[:]:
-            if angle in self.scene.viewer.cobb_angles:
-                # Remove itens gráficos
-                self.scene.removeItem(angle.text_item)
-                self.scene.removeItem(angle.ext_line1)
-                self.scene.removeItem(angle.ext_line2)
-                
-                # Remove a linha azul original
-                if angle.line1.line in self.scene.items():
-                    self.scene.removeItem(angle.line1.line)
-                if angle.line2.line in self.scene.items():
-                    self.scene.removeItem(angle.line2.line)
-                
-                # Remove referências aos pontos
-                for ponto in [angle.line1.p1, angle.line1.p2, angle.line2.p1, angle.line2.p2]:
-                    if ponto in self.scene.viewer.points:
-                        self.scene.viewer.points.remove(ponto)
-                    self.scene.removeItem(ponto)
-                
-                # Remove referências das linhas
-                if angle in angle.line1.angles:
-                    angle.line1.angles.remove(angle)
-                if angle in angle.line2.angles:
-                    angle.line2.angles.remove(angle)
-
-                # Remove da lista global de ângulos
-                self.scene.viewer.cobb_angles.remove(angle)
-                
-                print("Ângulo de Cobb, linhas e pontos associados removidos.")
+        viewer = self.scene.viewer
+        removed = tuple(angle for angle in self.angles if angle in viewer.cobb_angles)
+        for angle in removed:
+            viewer.remove_angle(angle)
+            log("Ângulo de Cobb, linhas e pontos associados removidos.")
+        if removed:
+            viewer.record(("remove", removed))  # Ctrl+Z devolve os mesmos itens
 
 
 class ZoomableGraphicsView(QGraphicsView):
@@ -387,6 +477,28 @@ class ZoomableGraphicsView(QGraphicsView):
         self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
         self.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
         self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        # Só a região suja é repintada; sem antialiasing na view, não há margem extra a ajustar
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing)
+        self.background_cache = False
+        self.zoom_idle = QTimer(self)
+        self.zoom_idle.setSingleShot(True)
+        self.zoom_idle.setInterval(200)
+        self.zoom_idle.timeout.connect(self.restore_background_cache)
+        # Tempos de pintura e instantes dos últimos quadros (só preenchidos com o profiler ligado)
+        self.paint_times = deque(maxlen=120)
+        self.frame_starts = deque(maxlen=120)
+
+    def paintEvent(self, event):
+        if not profiler.enabled:
+            super().paintEvent(event)
+            return
+        t0 = time.perf_counter()
+        super().paintEvent(event)
+        ms = (time.perf_counter() - t0) * 1000
+        self.paint_times.append(ms)
+        self.frame_starts.append(t0)
+        profiler.record("cena.repaint", ms)
 
     def wheelEvent(self, event):
         if event.modifiers() == Qt.KeyboardModifier.ControlModifier:  # ctrl+scroll = zoom
@@ -396,9 +508,22 @@ class ZoomableGraphicsView(QGraphicsView):
         else:
             super().wheelEvent(event)
     
+    def set_background_cache(self, enabled):
+        self.background_cache = enabled
+        self.restore_background_cache()
+
+    def restore_background_cache(self):
+        self.setCacheMode(
+            QGraphicsView.CacheModeFlag.CacheBackground if self.background_cache else QGraphicsView.CacheModeFlag.CacheNone
+        )
+
     # --------- Função de zoom centralizada com limites ----------
     def apply_zoom(self, factor):
         """Aplica o zoom com limites definidos."""
+        if self.background_cache:
+            # Cada passo de zoom refaz o fundo inteiro e o cache só somaria uma cópia; volta ao parar
+            self.setCacheMode(QGraphicsView.CacheModeFlag.CacheNone)
+            self.zoom_idle.start()
         new_zoom = self.current_zoom * factor
         if new_zoom > self.zoom_max:
             factor = self.zoom_max / self.current_zoom
@@ -409,6 +534,124 @@ class ZoomableGraphicsView(QGraphicsView):
         self.scale(factor, factor)
         self.current_zoom = new_zoom
 
+class ProfilerOverlay(QLabel):
+    """Painel sobre a imagem com o tempo de quadro e as atualizações por segundo."""
+    RATES = [("cena.flush", "flush"), ("angulo.recalculo", "ângulos"), ("texto.relayout", "texto"),
+             ("tiles.gerados", "tiles")]
+
+    def __init__(self, view: ZoomableGraphicsView):
+        super().__init__(view.viewport())
+        self.view = view
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 170); color: #7cfc00; font-family: monospace; padding: 4px;"
+        )
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.move(8, 8)
+        self.last_totals = {}
+        self.last_refresh = time.perf_counter()
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def set_active(self, active):
+        self.setVisible(active)
+        if active:
+            self.refresh()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def totals(self):
+        with profiler.lock:
+            totals = {name: stat[0] for name, stat in profiler.stats.items()}
+            totals.update(profiler.counters)
+        return totals
+
+    def refresh(self):
+        now = time.perf_counter()
+        elapsed = max(now - self.last_refresh, 1e-6)
+        totals = self.totals()
+        rates = " | ".join(
+            f"{label}/s {(totals.get(name, 0) - self.last_totals.get(name, 0)) / elapsed:.0f}"
+            for name, label in self.RATES
+        )
+        self.last_totals, self.last_refresh = totals, now
+
+        starts = [t for t in self.view.frame_starts if now - t < 1.0]
+        fps = len(starts) / (now - starts[0]) if len(starts) > 1 else 0.0
+        paints = list(self.view.paint_times)[-len(starts):] if starts else []
+        frame = (f"quadro {sum(paints) / len(paints):.1f} ms (máx {max(paints):.1f}) | {fps:.0f} qps"
+                 if paints else "quadro: sem pinturas no último segundo")
+        self.setText(f"{frame}\n{rates}")
+        self.adjustSize()
+
+
+class FilterPanel(QDialog):
+    """Controles de realce (janela/nível, gama, inversão, CLAHE); aplica após uma pausa curta."""
+    def __init__(self, viewer):
+        super().__init__(viewer)
+        self.viewer = viewer
+        self.setWindowTitle("Contraste")
+        form = QFormLayout(self)
+
+        self.center = QSlider(Qt.Orientation.Horizontal)
+        self.center.setRange(0, 255)
+        self.width = QSlider(Qt.Orientation.Horizontal)
+        self.width.setRange(1, 255)
+        self.gamma = QDoubleSpinBox()
+        self.gamma.setRange(0.2, 5.0)
+        self.gamma.setSingleStep(0.1)
+        self.invert = QCheckBox()
+        self.clahe = QCheckBox()
+        self.clip_limit = QDoubleSpinBox()
+        self.clip_limit.setRange(1.0, 10.0)
+        self.clip_limit.setSingleStep(0.5)
+        form.addRow("Nível", self.center)
+        form.addRow("Janela", self.width)
+        form.addRow("Gama", self.gamma)
+        form.addRow("Inverter", self.invert)
+        form.addRow("CLAHE", self.clahe)
+        form.addRow("Limite do CLAHE", self.clip_limit)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Reset | QDialogButtonBox.StandardButton.Close)
+        buttons.button(QDialogButtonBox.StandardButton.Reset).clicked.connect(self.reset)
+        buttons.rejected.connect(self.close)
+        form.addRow(buttons)
+
+        # Arrastar um controle gera muitos valores: só o último, após 150 ms, vai para o worker
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(150)
+        self.debounce.timeout.connect(self.apply)
+        self.reset()
+        for slider in (self.center, self.width):
+            slider.valueChanged.connect(self.debounce.start)
+        for spin in (self.gamma, self.clip_limit):
+            spin.valueChanged.connect(self.debounce.start)
+        for box in (self.invert, self.clahe):
+            box.toggled.connect(self.debounce.start)
+
+    def reset(self):
+        for widget, value in ((self.center, 128), (self.width, 255), (self.gamma, 1.0), (self.clip_limit, 2.0)):
+            widget.blockSignals(True)
+            widget.setValue(value)
+            widget.blockSignals(False)
+        for box in (self.invert, self.clahe):
+            box.blockSignals(True)
+            box.setChecked(False)
+            box.blockSignals(False)
+        self.debounce.start()
+
+    def params(self):
+        from filters import FilterParams
+
+        return FilterParams(float(self.center.value()), float(self.width.value()), round(self.gamma.value(), 2),
+                            self.invert.isChecked(), self.clahe.isChecked(), round(self.clip_limit.value(), 2))
+
+    def apply(self):
+        self.viewer.apply_filters(self.params())
+
+
 # ---------------- CustomScene ----------------
 class CustomScene(QGraphicsScene):
     """Cena customizada para manipulação dos pontos e linhas do Cobb."""
@@ -416,14 +659,76 @@ class CustomScene(QGraphicsScene):
         super().__init__(parent)
         self.viewer = None
         self.line_points = []
+        self.scheduler = UpdateScheduler()
+        self.drag_start = None  # (ponto, posição inicial) do arraste em andamento
+        # Texto em negrito e pontos são rasterizados uma vez e só copiados enquanto não mudam;
+        # linhas ficam sem cache, pois a geometria muda a cada quadro do arraste
+        self.item_cache_mode = QGraphicsItem.CacheMode.DeviceCoordinateCache
+
+    @staticmethod
+    def cacheable(item):
+        return isinstance(item, (QGraphicsTextItem, QGraphicsEllipseItem))
+
+    def addItem(self, item):
+        if self.cacheable(item):
+            item.setCacheMode(self.item_cache_mode)
+        super().addItem(item)
+
+    def set_item_cache_mode(self, mode):
+        """Troca o cache dos itens de anotação (ex.: NoCache para comparar em benchmarks/render.py)."""
+        self.item_cache_mode = mode
+        for item in self.items():
+            if self.cacheable(item):
+                item.setCacheMode(mode)
+
+    def drawBackground(self, painter, rect):
+        super().drawBackground(painter, rect)
+        item = self.viewer.pixmap_item if self.viewer else None
+        if isinstance(item, TiledImageItem) and item.as_background:
+            item.paint_tiles(painter, rect)
 
     def addPoint(self, pos):
+        kind = self.viewer.measuring
+        # Nas medidas, só as linhas sobre placas vertebrais são ajustadas (TipoMedida.placas)
+        if self.viewer.snap_enabled and (kind is None or len(self.line_points) // 2 in kind.placas):
+            # O segundo clique de uma linha busca a borda na normal da linha já esboçada
+            partner = self.line_points[-1] if len(self.line_points) % 2 else None
+            pos = self.viewer.snap_position(pos, partner)
+        if kind is not None and self.viewer.pixmap_item.contains(pos):
+            # Medida do registro: cada par de cliques vira uma linha; a medida nasce no último ponto
+            point = DraggablePoint(pos)
+            self.addItem(point)
+            self.viewer.points.insert(point, pos.x(), pos.y())
+            self.line_points.append(point)
+            if len(self.line_points) == kind.n_pontos:
+                measurement = self.viewer.add_measurement(
+                    kind, [(p.pos().x(), p.pos().y()) for p in self.line_points], self.line_points)
+                self.viewer.record(("measure", (measurement,)))
+                self.line_points = []
+                self.viewer.measuring = None
+                self.viewer.measure_button.setStyleSheet(self.viewer.button_style)
+            return point
+        if self.viewer.marking_endplates and self.viewer.pixmap_item.contains(pos):
+            # Marcação de placas: cada par de cliques vira uma linha, sem criar ângulo
+            point = DraggablePoint(pos)
+            self.addItem(point)
+            self.viewer.points.insert(point, pos.x(), pos.y())
+            self.line_points.append(point)
+            if len(self.line_points) == 2:
+                p1, p2 = self.line_points
+                line = LineConnection(self, p1, p2, color=self.viewer.endplate_color)
+                self.viewer.lines.append(line)
+                self.viewer.endplate_lines.append(line)
+                self.viewer.record(("endplates", (line,)))
+                self.line_points = []
+                self.viewer.notify(f"Placa {len(self.viewer.endplate_lines)} marcada.")
+            return point
         if self.viewer.adding_angle and self.viewer.pixmap_item.contains(pos):
             point = DraggablePoint(pos)
             self.addItem(point)
-            self.viewer.points.append(point)
+            self.viewer.points.insert(point, pos.x(), pos.y())
             self.line_points.append(point)
-            print(f"Ponto adicionado em: {pos.x():.2f}, {pos.y():.2f}")
+            log(f"Ponto adicionado em: {pos.x():.2f}, {pos.y():.2f}")
 
             if len(self.line_points) % 2 == 0 :
                 self.addConnectionLine()
@@ -433,7 +738,7 @@ class CustomScene(QGraphicsScene):
                 self.viewer.adding_angle = False
                 self.viewer.cobb_button.setStyleSheet(self.viewer.button_style)
                 self.line_points = []
-                print("Modo de adicionar ângulo de Cobb desativado")
+                log("Modo de adicionar ângulo de Cobb desativado")
 
             return point
 
@@ -441,21 +746,31 @@ class CustomScene(QGraphicsScene):
         if len(self.line_points) >= 2:
             p1, p2 = self.line_points[-2], self.line_points[-1]
             self.viewer.lines.append(LineConnection(self, p1, p2, color=self.viewer.selected_cobb_color))
-            print(f"Linha criada entre: ({p1.pos().x():.2f},{p1.pos().y():.2f}) -> "
-                  f"({p2.pos().x():.2f},{p2.pos().y():.2f})")
+            log(f"Linha criada entre: ({p1.pos().x():.2f},{p1.pos().y():.2f}) -> "
+                f"({p2.pos().x():.2f},{p2.pos().y():.2f})")
 
     def mousePressEvent(self, event):
         pos = event.scenePos()
-        if self.viewer and self.viewer.pixmap_item and self.viewer.adding_angle:
+        if self.viewer and self.viewer.pixmap_item and (
+                self.viewer.adding_angle or self.viewer.marking_endplates or self.viewer.measuring is not None):
             if self.viewer.pixmap_item.contains(pos):
                 min_distance = 6
-                too_close = any(
-                    ((pos.x() - p.pos().x())**2 + (pos.y() - p.pos().y())**2)**0.5 < min_distance 
-                    for p in self.viewer.points
-                )
+                too_close = self.viewer.points.any_within(pos.x(), pos.y(), min_distance)
                 if not too_close:
                     self.addPoint(pos)
         super().mousePressEvent(event)
+        grabber = self.mouseGrabberItem()
+        self.drag_start = (grabber, grabber.pos()) if isinstance(grabber, DraggablePoint) else None
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        if self.drag_start is not None:
+            # O arraste inteiro vira uma única entrada no histórico, com o deslocamento total
+            point, start = self.drag_start
+            self.drag_start = None
+            delta = point.pos() - start
+            if delta.x() or delta.y():
+                self.viewer.record(("move", point, delta.x(), delta.y()))
 
 class ImageViewer(QMainWindow):
     """Janela principal do aplicativo de visualização do ângulo de Cobb."""
@@ -489,8 +804,19 @@ class ImageViewer(QMainWindow):
 
         buttons = [
             ("Selecionar Arquivo", "icons/upload.png", self.open_image),
+            ("Lista de Estudos", "icons/upload.png", self.open_worklist),
+            ("◀", "", self.previous_study),
+            ("▶", "", self.next_study),
+            ("Pasta Monitorada", "", self.open_watch_folder),
+            ("Miniaturas", "", self.open_thumbnails_menu),
             ("Salvar Imagem", "icons/download.png", self.save_image),
             ("Ângulo de Cobb", "icons/angle.png", self.enable_add_angle),
+            ("Detectar Vértebras", "", self.detect_endplates),
+            ("Ajustar às Bordas", "", self.toggle_snap),
+            ("Curvas", "", self.open_curves_menu),
+            ("Medidas", "", self.open_measurements_menu),
+            ("Janela/Nível", "", self.adjust_window_level),
+            ("Contraste", "", self.open_filter_panel),
             ("", "icons/zoom_in.png", self.zoom_in),
             ("Reset", "icons/zoom_reset.png", self.reset_zoom),
             ("", "icons/zoom_out.png", self.zoom_out),
@@ -507,6 +833,14 @@ class ImageViewer(QMainWindow):
             buttons_layout.addWidget(btn)
             if text == "Ângulo de Cobb":
                 self.cobb_button = btn
+            if text == "Curvas":
+                self.curves_button = btn
+            if text == "Medidas":
+                self.measure_button = btn
+            if text == "Miniaturas":
+                self.thumbnails_button = btn
+            if text == "Ajustar às Bordas":
+                self.snap_button = btn
 
             
         layout.addLayout(buttons_layout)
@@ -514,7 +848,11 @@ class ImageViewer(QMainWindow):
         # QGraphicsView
         self.view = ZoomableGraphicsView()
         self.view.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)  # ativa pan
-        layout.addWidget(self.view)
+        # Miniaturas (thumbnails.ThumbnailStrip) entram à esquerda da view no primeiro uso
+        self.view_layout = QHBoxLayout()
+        self.view_layout.addWidget(self.view)
+        layout.addLayout(self.view_layout)
+        self.thumbnail_strip = None
 
         # Configuração do zoom centralizado
         self.view.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
@@ -522,6 +860,8 @@ class ImageViewer(QMainWindow):
 
         self.scene = CustomScene()
         self.scene.viewer = self
+        # Os caches dos itens ficam no QPixmapCache; o limite padrão (10 MB) não cobre uma tela cheia
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), 128 * 1024))
         self.view.setScene(self.scene)
 
         self.footer = QLabel("©2025 limaraujo.")
@@ -530,33 +870,1121 @@ class ImageViewer(QMainWindow):
 
         layout.addWidget(self.footer)  # adicione direto, sem addStretch()
 
+        # Progresso do carregamento em segundo plano
+        self.load_progress = QProgressBar()
+        self.load_progress.setMaximumWidth(200)
+        self.load_cancel_button = QPushButton("Cancelar")
+        self.load_cancel_button.setStyleSheet(self.button_style)
+        self.load_cancel_button.clicked.connect(self.cancel_background_work)
+        self.statusBar().addPermanentWidget(self.load_progress)
+        self.statusBar().addPermanentWidget(self.load_cancel_button)
+        self.load_progress.hide()
+        self.load_cancel_button.hide()
+
+        self.navigator = StudyNavigator(self)
+        QShortcut(QKeySequence(Qt.Key.Key_PageDown), self, self.next_study)
+        QShortcut(QKeySequence(Qt.Key.Key_PageUp), self, self.previous_study)
+
+        # Diagnóstico: F9 liga o painel de desempenho, F10 grava o perfil da sessão
+        self.profiler_overlay = ProfilerOverlay(self.view)
+        QShortcut(QKeySequence(Qt.Key.Key_F9), self, self.toggle_profiler_overlay)
+        QShortcut(QKeySequence(Qt.Key.Key_F10), self, self.dump_profile)
+
+        # Desfazer/refazer: Ctrl+Z, Ctrl+Shift+Z ou Ctrl+Y
+        self.history = History()
+        QShortcut(QKeySequence(QKeySequence.StandardKey.Undo), self, self.undo)
+        QShortcut(QKeySequence(QKeySequence.StandardKey.Redo), self, self.redo)
+        QShortcut(QKeySequence("Ctrl+Y"), self, self.redo)
+        self.session_log = None
+        if SESSION_LOG_ENV:
+            try:
+                self.session_log = SessionLog(SESSION_LOG_ENV)
+            except OSError as e:
+                logger.warning(f"Registro da sessão desativado: {e}")
+
+        # Pasta monitorada (COBB_WATCH_DIR ou botão): estudos novos entram no fim da lista
+        self.watch_folder = None
+
         # Variáveis
         self.pixmap_item = None
-        self.points = []
+        self.preview_item = None
+        self.load_task = None
+        self.load_started = None
+        self.first_pixel_ms = None
+        try:
+            self.buffer_cache = BufferCache()
+        except OSError as e:
+            logger.warning(f"Cache de imagens desativado: {e}")
+            self.buffer_cache = None
+        self.dicom = None  # DicomImage do estudo atual, se for DICOM
+        self.pixel_spacing = None  # (x, y) em mm/px, quando o arquivo informa
+        self.window_task = None
+        self.endplate_task = None
+        # Realce de contraste: a pirâmide sem filtro fica guardada; resultados em cache por parâmetros
+        self.source_pyramid = None
+        self.source_version = 0
+        self.filter_params = None
+        self.filter_task = None
+        self.filter_cache = None  # filters.FilterCache, criado no primeiro uso (importa numpy)
+        self.filter_panel = None
+        # Ajuste fino: pontos clicados ou arrastados vão para a borda mais próxima (endplates.snap_to_edge)
+        self.snap_enabled = False
+        self.snap_buffer = None  # ImageBuffer do nível 0 da pirâmide sem filtro
+        self.snap_version = -1
+        self.export_job = None
+        self.export_scale = 1.0
+        self.export_compression = 6  # nível zlib do PNG (0–9)
+        self.export_quality = 90  # qualidade do JPEG (0–100)
+        self.points = PointGrid()  # índice espacial de todos os DraggablePoint
         self.lines = []
         self.cobb_angles = []
         self.adding_angle = False
+        self.set_background_cache(True)
+
+        # Análise de várias curvas: uma linha por placa vertebral, compartilhada pelos ângulos
+        self.endplate_lines = []
+        self.curve_angles = []
+        self.marking_endplates = False
+        self.endplate_color = QColor("#00a0a0")
+
+        # Medidas do registro measurements (SVA, cifose/lordose, pelve...)
+        self.measurements = []
+        self.measuring = None  # measurements.TipoMedida sendo marcada
+
+        # Persistência das anotações: só os ângulos editados são gravados, em lote
+        self.study_path = None
+        try:
+            self.annotation_store = AnnotationStore()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Persistência de anotações desativada: {e}")
+            self.annotation_store = None
+        self.dirty_annotations = {}
+        self.removed_annotations = []
+        self.restoring_annotations = False
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(300)  # agrupa as gravações de um arraste
+        self.save_timer.timeout.connect(self.persist_annotations)
 
 
     def open_image(self):
     # Abre uma imagem e reseta a cena.
         path, _ = QFileDialog.getOpenFileName(
-            self, "Selecione a Imagem", "", "Imagens (*.png *.jpg *.jpeg *.bmp)"
+            self, "Selecione a Imagem", "",
+            "Imagens (*.png *.jpg *.jpeg *.bmp *.dcm *.dicom);;DICOM (*.dcm *.dicom);;Todos os arquivos (*)"
         )
         if path:
-            pixmap = QPixmap(path)
-            self.pixmap_item = QGraphicsPixmapItem(pixmap)
-            self.scene.addItem(self.pixmap_item)
-            self.view.resetTransform()
-            self.view.current_zoom = 1.0
-            self.view.fitInView(self.pixmap_item, Qt.AspectRatioMode.KeepAspectRatio)
-            self.points = []
-            self.lines = []
-            self.cobb_angles = []
+            self.navigator.set_worklist([path])
+
+    def load_image(self, path):
+        """Inicia a decodificação em segundo plano; a GUI continua respondendo."""
+        self.cancel_loading()
+        task = ImageLoadTask(path, cache=self.buffer_cache)
+        task.signals.progress.connect(lambda value, stage, t=task: self.on_load_progress(t, value, stage))
+        task.signals.preview.connect(lambda image, size, t=task: self.on_load_preview(t, image, size))
+        task.signals.finished.connect(lambda pyramid, secs, t=task: self.on_load_finished(t, pyramid, secs))
+        task.signals.failed.connect(lambda error, t=task: self.on_load_failed(t, error))
+        self.load_task = task
+        self.load_started = time.perf_counter()
+        self.first_pixel_ms = None
+        self.load_progress.setValue(0)
+        self.load_progress.show()
+        self.load_cancel_button.show()
+        self.statusBar().showMessage(f"Carregando {os.path.basename(path)}...")
+        QThreadPool.globalInstance().start(task)
+
+    def cancel_background_work(self):
+        """Cancela o carregamento e a exportação em andamento."""
+        self.cancel_loading()
+        if self.export_job is not None:
+            self.export_job.cancel()
+
+    def cancel_loading(self):
+        if self.load_task is None:
+            return
+        self.load_task.cancel()
+        self.load_task = None
+        self.remove_preview()
+        if self.export_job is None:
+            self.hide_load_progress()
+        self.statusBar().showMessage("Carregamento cancelado.", 3000)
+
+    def hide_load_progress(self):
+        self.load_progress.hide()
+        self.load_cancel_button.hide()
+
+    def remove_preview(self):
+        if self.preview_item is not None:
+            self.scene.removeItem(self.preview_item)
+            self.preview_item = None
+
+    def mark_first_pixel(self):
+        if self.first_pixel_ms is None:
+            self.first_pixel_ms = (time.perf_counter() - self.load_started) * 1000
+            log(f"Tempo até o primeiro pixel: {self.first_pixel_ms:.0f} ms")
+
+    def on_load_progress(self, task, value, stage):
+        if task is self.load_task:
+            self.load_progress.setValue(value)
+            self.statusBar().showMessage(stage)
+
+    def on_load_preview(self, task, image, full_size):
+        """Mostra a prévia esticada ao tamanho real; pontos só são aceitos na imagem completa."""
+        if task is not self.load_task:
+            return
+        self.close_study()
+        self.preview_item = QGraphicsPixmapItem(QPixmap.fromImage(image))
+        self.preview_item.setTransformationMode(Qt.TransformationMode.SmoothTransformation)
+        self.preview_item.setScale(full_size.width() / image.width())
+        self.scene.addItem(self.preview_item)
+        self.view.resetTransform()
+        self.view.current_zoom = 1.0
+        self.view.fitInView(self.preview_item, Qt.AspectRatioMode.KeepAspectRatio)
+        self.mark_first_pixel()
+
+    def on_load_finished(self, task, pyramid, decode_secs):
+        if task is not self.load_task:
+            return
+        self.load_task = None
+        self.hide_load_progress()
+        self.show_study(pyramid, task.dicom, task.path)
+        self.mark_first_pixel()
+        total_ms = (time.perf_counter() - self.load_started) * 1000
+        rss = process_memory_mb()
+        self.statusBar().showMessage(
+            f"Imagem {pyramid.width()}x{pyramid.height()} carregada em {total_ms:.0f} ms "
+            f"(primeiro pixel em {self.first_pixel_ms:.0f} ms, decodificação {decode_secs * 1000:.0f} ms) "
+            f"| memória {rss:.0f} MB"
+            + (f" | pixel {self.pixel_spacing[0]:.3f}x{self.pixel_spacing[1]:.3f} mm" if self.pixel_spacing else "")
+        )
+        log(f"Imagem carregada em {total_ms:.0f} ms, memória do processo: {rss:.0f} MB")
+        self.navigator.on_study_loaded(task.path, pyramid, task.dicom)
+
+    def show_study(self, pyramid, dicom=None, path=None):
+        """Exibe uma imagem já decodificada (recém-carregada ou vinda do cache de estudos)."""
+        self.close_study()
+        self.study_path = path
+        if self.session_log is not None:
+            self.session_log.write({"op": "study", "path": path})
+        self.dicom = dicom
+        self.pixel_spacing = dicom.pixel_spacing if dicom else None
+        self.source_pyramid = pyramid
+        self.source_version += 1
+        # Item em tiles: só os blocos visíveis no nível de zoom atual são pintados
+        self.pixmap_item = TiledImageItem(pyramid)
+        self.scene.addItem(self.pixmap_item)
+        self.pixmap_item.set_as_background(self.background_cache)
+        self.scene.setSceneRect(self.pixmap_item.boundingRect())
+        self.view.resetTransform()
+        self.view.current_zoom = 1.0
+        self.view.fitInView(self.pixmap_item, Qt.AspectRatioMode.KeepAspectRatio)
+        if self.filter_params is not None:
+            self.apply_filters(self.filter_params)
+
+    def set_background_cache(self, enabled):
+        """
+        Pinta a radiografia no fundo da cena, guardado em cache pela view: arrastar anotações
+        só copia o fundo, e a rolagem reaproveita o que já estava na tela.
+        """
+        self.background_cache = enabled
+        self.view.set_background_cache(enabled)
+        if isinstance(self.pixmap_item, TiledImageItem):
+            self.pixmap_item.set_as_background(enabled)
+
+    def add_cobb_angle(self, points, color=Qt.GlobalColor.blue, font_size=None, text_pos=None, uid=None):
+        """Cria pontos, linhas e o CobbAngleItem a partir de 4 pontos (x, y), sem cliques."""
+        draggable = []
+        for x, y in points:
+            point = DraggablePoint(QPointF(x, y))
+            self.scene.addItem(point)
+            self.points.insert(point, x, y)
+            draggable.append(point)
+        line1 = LineConnection(self.scene, draggable[0], draggable[1], color=color)
+        line2 = LineConnection(self.scene, draggable[2], draggable[3], color=color)
+        self.lines += [line1, line2]
+        angle_item = CobbAngleItem(line1, line2, self.scene, COLOR=color, uid=uid)
+        if font_size is not None and font_size != angle_item.font_size:
+            angle_item.font_size = font_size
+            angle_item.font.setPointSize(font_size)
+            angle_item.text_item.setFont(angle_item.font)
+        if text_pos is not None:
+            angle_item.text_item.setPos(QPointF(*text_pos))
+        self.cobb_angles.append(angle_item)
+        return angle_item
+
+    def remove_angle(self, angle):
+        """Apaga o ângulo; linhas e pontos só saem quando nenhum outro ângulo ou placa os usa."""
+        self.scene.removeItem(angle.text_item)
+        self.scene.removeItem(angle.ext_line1)
+        self.scene.removeItem(angle.ext_line2)
+        for line in (angle.line1, angle.line2):
+            if angle in line.angles:
+                line.angles.remove(angle)
+            if line.angles or line in self.endplate_lines:
+                continue
+            # Handles diretos, sem varrer scene.items()
+            if line.line.scene() is self.scene:
+                self.scene.removeItem(line.line)
+            for ponto in (line.p1, line.p2):
+                self.points.remove(ponto)
+                if ponto.scene() is self.scene:
+                    self.scene.removeItem(ponto)
+        self.cobb_angles.remove(angle)
+        if angle in self.curve_angles:
+            self.curve_angles.remove(angle)
+        self.scene.scheduler.discard(angle)
+        self.forget_annotation(angle)
+
+    def restore_angle(self, angle):
+        """Devolve à cena um ângulo apagado por remove_angle, com os mesmos itens e uid."""
+        for line in (angle.line1, angle.line2):
+            if line.line.scene() is not self.scene:
+                self.scene.addItem(line.line)
+                for ponto in (line.p1, line.p2):
+                    if ponto.scene() is not self.scene:
+                        self.scene.addItem(ponto)
+                    self.points.insert(ponto, ponto.pos().x(), ponto.pos().y())
+            line.angles.append(angle)
+        for item in (angle.text_item, angle.ext_line1, angle.ext_line2):
+            self.scene.addItem(item)
+        self.cobb_angles.append(angle)
+        if angle.region is not None:
+            self.curve_angles.append(angle)
+        # Uma placa compartilhada pode ter sido arrastada enquanto o ângulo estava apagado
+        self.scene.scheduler.mark_angle(angle)
+        self.mark_annotation_dirty(angle)
+
+    def set_angle_color(self, angle, color):
+        angle.line1.line.setPen(QPen(color, 4))
+        angle.line2.line.setPen(QPen(color, 4))
+        pen_ext = QPen(color, 4, Qt.PenStyle.CustomDashLine)
+        pen_ext.setDashPattern([4, 3])
+        angle.ext_line1.setPen(pen_ext)
+        angle.ext_line2.setPen(pen_ext)
+        angle.text_item.setDefaultTextColor(color)
+        angle.line_color = color
+        self.mark_annotation_dirty(angle)
+
+    @staticmethod
+    def angle_points(angle):
+        return (angle.line1.p1, angle.line1.p2, angle.line2.p1, angle.line2.p2)
+
+    def angle_by_uid(self, uid):
+        return next((angle for angle in self.cobb_angles if angle.uid == uid), None)
+
+    def line_by_uid(self, uid):
+        return next((line for line in self.lines if line.uid == uid), None)
+
+    def measurement_by_uid(self, uid):
+        return next((m for m in self.measurements if m.uid == uid), None)
+
+    def notify(self, message, level=logging.DEBUG):
+        """Mensagem para o usuário na barra de status; no log só com COBB_LOG (ou se for aviso)."""
+        self.statusBar().showMessage(message)
+        logger.log(level, message)
+
+    def record(self, command):
+        """
+        Empilha uma edição no histórico e, se ligado, no registro da sessão. Um comando que o
+        registro não sabe descrever (ex.: arraste de um ponto de linha ainda incompleta) não
+        entra no histórico: desfazer na sessão e na reprodução seguem sempre a mesma pilha.
+        """
+        event = self.describe_command(command)
+        if event is None:
+            return
+        self.history.push(command)
+        if self.session_log is not None:
+            self.session_log.write(event)
+
+    def angle_event_state(self, angles):
+        """annotation_state + as placas usadas, para a reprodução reaproveitar as mesmas linhas."""
+        states = self.annotation_state(angles)
+        for state, angle in zip(states, angles):
+            if angle.line1 in self.endplate_lines and angle.line2 in self.endplate_lines:
+                state["lines"] = [angle.line1.uid, angle.line2.uid]
+                state["region"] = angle.region
+        return states
+
+    def describe_command(self, command):
+        """Evento JSON do comando: ângulos e medidas por uid, pontos por (uid, índice)."""
+        op = command[0]
+        if op == "move":
+            _, point, dx, dy = command
+            line = point.line
+            if line is None:
+                return None
+            if line in self.endplate_lines or line.measurements:
+                return {"op": "move", "line": line.uid, "i": 0 if point is line.p1 else 1, "dx": dx, "dy": dy}
+            if line.angles:
+                angle = line.angles[0]
+                return {"op": "move", "uid": angle.uid, "i": self.angle_points(angle).index(point),
+                        "dx": dx, "dy": dy}
+            return None  # linha de um ângulo ainda sendo marcado
+        if op == "add":
+            return {"op": "add", "angles": self.angle_event_state(command[1])}
+        if op == "remove":
+            return {"op": "remove", "uids": [angle.uid for angle in command[1]]}
+        if op == "replace":
+            return {"op": "replace", "remove": [angle.uid for angle in command[1]],
+                    "add": self.angle_event_state(command[2])}
+        if op == "recolor":
+            return {"op": "recolor", "uids": [angle.uid for angle in command[1]], "color": command[3].name()}
+        if op == "endplates":
+            return {"op": "endplates", "lines": [
+                {"uid": line.uid, "points": [(p.pos().x(), p.pos().y()) for p in (line.p1, line.p2)]}
+                for line in command[1]
+            ]}
+        if op == "measure":
+            return {"op": "measure", "measurements": [
+                {"uid": m.uid, "kind": m.kind.chave, "points": m.points(), "lines": [line.uid for line in m.lines]}
+                for m in command[1]
+            ]}
+        if op == "unmeasure":
+            return {"op": "unmeasure", "uids": [m.uid for m in command[1]]}
+        return None
+
+    def apply_command(self, command, reverse=False):
+        """Aplica o comando (reverse=True desfaz); cada passo mexe só nos itens do comando."""
+        op = command[0]
+        if op == "move":
+            _, point, dx, dy = command
+            sign = -1 if reverse else 1
+            point.setPos(point.pos() + QPointF(sign * dx, sign * dy))
+        elif op in ("add", "remove", "replace"):
+            if op == "replace":
+                _, removed, added = command
+            else:
+                removed, added = (command[1], ()) if op == "remove" else ((), command[1])
+            gone, back = (added, removed) if reverse else (removed, added)
+            for angle in reversed(gone):
+                self.remove_angle(angle)
+            for angle in back:
+                self.restore_angle(angle)
+        elif op == "recolor":
+            _, angles, old_colors, color = command
+            for angle, old in zip(angles, old_colors):
+                self.set_angle_color(angle, old if reverse else color)
+        elif op == "endplates":
+            for line in (reversed(command[1]) if reverse else command[1]):
+                if reverse:
+                    self.remove_endplate_line(line)
+                else:
+                    self.restore_endplate_line(line)
+        elif op in ("measure", "unmeasure"):
+            for measurement in command[1]:
+                if reverse == (op == "measure"):
+                    self.remove_measurement(measurement)
+                else:
+                    self.restore_measurement(measurement)
+
+    def reset_marking_modes(self):
+        """Sai de qualquer marcação (ângulo, placas, medida) e apaga os cliques ainda sem par."""
+        while self.scene.line_points:
+            self.discard_last_point()
+        self.adding_angle = False
+        self.marking_endplates = False
+        self.measuring = None
+        for button in (self.cobb_button, self.curves_button, self.measure_button):
+            button.setStyleSheet(self.button_style)
+
+    def discard_last_point(self):
+        """Desfaz o último clique de uma marcação ainda incompleta (não está no histórico)."""
+        point = self.scene.line_points.pop()
+        line = point.line
+        if line is not None:  # o clique tinha fechado a primeira linha de um ângulo
+            self.scene.removeItem(line.line)
+            self.lines.remove(line)
+            line.p1.line = None
+        self.points.remove(point)
+        self.scene.removeItem(point)
+
+    def undo(self):
+        if self.scene.line_points:
+            self.discard_last_point()
+            return
+        command = self.history.undo()
+        if command is None:
+            self.statusBar().showMessage("Nada para desfazer")
+            return
+        self.apply_command(command, reverse=True)
+        if self.session_log is not None:
+            self.session_log.write({"op": "undo"})
+
+    def redo(self):
+        command = self.history.redo()
+        if command is None:
+            self.statusBar().showMessage("Nada para refazer")
+            return
+        self.apply_command(command)
+        if self.session_log is not None:
+            self.session_log.write({"op": "redo"})
+
+    def add_from_state(self, state):
+        lines = [self.line_by_uid(uid) for uid in state.get("lines") or ()]
+        if len(lines) == 2 and None not in lines:
+            # Ângulo de curva: usa as placas já na cena, como analyze_curves
+            color = QColor(state["color"])
+            angle = CobbAngleItem(lines[0], lines[1], self.scene, COLOR=color, uid=state["uid"])
+            angle.region = state.get("region")
+            self.cobb_angles.append(angle)
+            if angle.region is not None:
+                self.curve_angles.append(angle)
+        else:
+            angle = self.add_cobb_angle(state["points"], QColor(state["color"]), state["font_size"],
+                                        state["text_pos"], uid=state["uid"])
+        self.mark_annotation_dirty(angle)
+        return angle
+
+    def known(self, items, event):
+        """Itens encontrados; os uids desconhecidos (criados fora do registro) são ignorados."""
+        found = tuple(item for item in items if item is not None)
+        if len(found) < len(items):
+            logger.warning(f"Registro: {len(items) - len(found)} item(ns) desconhecido(s) em \"{event['op']}\" ignorado(s).")
+        return found
+
+    def replay_event(self, event):
+        """Reaplica um evento de history.load_session, registrando-o no histórico como o original."""
+        op = event["op"]
+        if op == "move":
+            if "line" in event:
+                line = self.line_by_uid(event["line"])
+                point = None if line is None else (line.p1, line.p2)[event["i"]]
+            else:
+                angle = self.angle_by_uid(event["uid"])
+                point = None if angle is None else self.angle_points(angle)[event["i"]]
+            if not self.known((point,), event):
+                return
+            point.setPos(point.pos() + QPointF(event["dx"], event["dy"]))
+            self.record(("move", point, event["dx"], event["dy"]))
+        elif op == "add":
+            self.record(("add", tuple(self.add_from_state(state) for state in event["angles"])))
+        elif op in ("remove", "replace"):
+            uids = event["uids" if op == "remove" else "remove"]
+            removed = self.known([self.angle_by_uid(uid) for uid in uids], event)
+            for angle in removed:
+                self.remove_angle(angle)
+            if op == "remove":
+                if removed:
+                    self.record(("remove", removed))
+            else:
+                added = tuple(self.add_from_state(state) for state in event["add"])
+                self.record(("replace", removed, added))
+        elif op == "endplates":
+            lines = event["lines"]
+            created = self.add_endplate_lines([entry["points"] for entry in lines], [entry["uid"] for entry in lines])
+            self.record(("endplates", tuple(created)))
+        elif op == "measure":
+            added = tuple(
+                self.add_measurement(measurements.REGISTRO[entry["kind"]], entry["points"],
+                                     uid=entry["uid"], line_uids=entry.get("lines"))
+                for entry in event["measurements"] if entry["kind"] in measurements.REGISTRO
+            )
+            if added:
+                self.record(("measure", added))
+        elif op == "unmeasure":
+            removed = self.known([self.measurement_by_uid(uid) for uid in event["uids"]], event)
+            for measurement in removed:
+                self.remove_measurement(measurement)
+            if removed:
+                self.record(("unmeasure", removed))
+        elif op == "recolor":
+            angles = self.known([self.angle_by_uid(uid) for uid in event["uids"]], event)
+            if not angles:
+                return
+            old_colors = tuple(QColor(angle.line_color) for angle in angles)
+            color = QColor(event["color"])
+            for angle in angles:
+                self.set_angle_color(angle, color)
+            self.record(("recolor", angles, old_colors, color))
+        elif op == "undo":
+            self.undo()
+        elif op == "redo":
+            self.redo()
+        # "study" e eventos desconhecidos: a imagem é escolhida por quem reproduz
+
+    def replay_session(self, events):
+        """Reproduz um registro de sessão sobre o estudo aberto (ver benchmarks)."""
+        log, self.session_log = self.session_log, None  # não regrava o que está sendo reproduzido
+        try:
+            for event in events:
+                self.replay_event(event)
+                self.scene.scheduler.flush()
+        finally:
+            self.session_log = log
+
+    def annotation_state(self, items=None):
+        """
+        Estado das anotações como dados simples (para cache, persistência e restauração):
+        ângulos de Cobb e medidas do registro, estas com a chave "kind".
+        """
+        if items is None:
+            items = self.cobb_angles + self.measurements
+        states = []
+        for item in items:
+            if isinstance(item, MeasurementItem):
+                states.append({
+                    "uid": item.uid,
+                    "kind": item.kind.chave,
+                    "points": item.points(),
+                    "color": item.color.name(),
+                    "text": item.text_item.toPlainText(),
+                })
+                continue
+            states.append({
+                "uid": item.uid,
+                "points": item.endpoints(),
+                "color": QColor(item.line_color).name(),
+                "font_size": item.font_size,
+                "text_pos": (item.text_item.pos().x(), item.text_item.pos().y()),
+                "angle": item.angle_deg,
+            })
+        return states
+
+    def restore_annotations(self, state):
+        # Recria o que já está gravado: nada disso volta para o AnnotationStore
+        self.restoring_annotations = True
+        try:
+            for entry in state:
+                if "kind" not in entry:
+                    self.add_cobb_angle(entry["points"], QColor(entry["color"]), entry["font_size"],
+                                        entry["text_pos"], uid=entry.get("uid"))
+                elif entry["kind"] in measurements.REGISTRO:  # tipo removido do registro: ignorado
+                    self.add_measurement(measurements.REGISTRO[entry["kind"]], entry["points"], uid=entry["uid"])
+        finally:
+            self.restoring_annotations = False
+
+    def load_annotations(self, path):
+        """Anotações gravadas do estudo (lidas de uma vez do AnnotationStore)."""
+        if self.annotation_store is None:
+            return []
+        try:
+            return self.annotation_store.load(path)
+        except sqlite3.Error as e:
+            self.notify(f"Erro ao ler anotações: {e}", logging.WARNING)
+            return []
+
+    def mark_annotation_dirty(self, item):
+        """Agenda a gravação incremental do ângulo (ou medida) editado."""
+        if self.restoring_annotations or self.study_path is None:
+            return
+        if self.removed_annotations and item.uid in self.removed_annotations:
+            self.removed_annotations.remove(item.uid)  # remoção desfeita antes de gravar
+        self.dirty_annotations[item] = None
+        if not self.save_timer.isActive():
+            self.save_timer.start()
+
+    def forget_annotation(self, item):
+        self.dirty_annotations.pop(item, None)
+        if self.study_path is not None:
+            self.removed_annotations.append(item.uid)
+            if not self.save_timer.isActive():
+                self.save_timer.start()
+
+    def persist_annotations(self):
+        """Grava só os ângulos alterados e apaga os removidos desde a última gravação."""
+        self.save_timer.stop()
+        dirty, self.dirty_annotations = list(self.dirty_annotations), {}
+        removed, self.removed_annotations = self.removed_annotations, []
+        if self.annotation_store is None or self.study_path is None or not (dirty or removed):
+            return
+        try:
+            with profiler.timer("anotacoes.gravacao"):
+                if dirty:
+                    self.annotation_store.save(self.study_path, self.annotation_state(dirty))
+                if removed:
+                    self.annotation_store.delete(removed)
+        except sqlite3.Error as e:
+            self.notify(f"Erro ao gravar anotações: {e}", logging.WARNING)
+
+    def close_study(self):
+        """Libera todos os itens da cena, a imagem e os tiles do estudo atual."""
+        if self.export_job is not None:
+            self.export_job.cancel()
+        # Aplica os arrastes pendentes e grava antes de trocar de estudo
+        self.scene.scheduler.flush()
+        self.persist_annotations()
+        self.study_path = None
+        self.scene.scheduler.dirty_lines.clear()
+        self.scene.scheduler.dirty_angles.clear()
+        self.scene.scheduler.dirty_measurements.clear()
+        self.scene.scheduler.timer.stop()
+        if isinstance(self.pixmap_item, TiledImageItem):
+            self.pixmap_item.cache.clear()
+        # Solta as referências Python antes de apagar os objetos C++ da cena
+        self.pixmap_item = None
+        self.preview_item = None
+        self.dicom = None
+        self.pixel_spacing = None
+        self.window_task = None
+        if self.filter_task is not None:
+            self.filter_task.cancel()
+            self.filter_task = None
+        self.source_pyramid = None
+        if self.filter_cache is not None:
+            self.filter_cache.clear()
+        if self.endplate_task is not None:
+            self.endplate_task.cancel()
+            self.endplate_task = None
+        self.history.clear()
+        self.points.clear()
+        self.lines = []
+        self.cobb_angles = []
+        self.endplate_lines = []
+        self.curve_angles = []
+        self.measurements = []
+        self.scene.line_points = []
+        self.scene.clear()
+        self.scene.setSceneRect(QRectF())
+        if self.adding_angle:
+            self.adding_angle = False
+            self.cobb_button.setStyleSheet(self.button_style)
+        if self.marking_endplates:
+            self.marking_endplates = False
+            self.curves_button.setStyleSheet(self.button_style)
+        if self.measuring is not None:
+            self.measuring = None
+            self.measure_button.setStyleSheet(self.button_style)
+
+    def on_load_failed(self, task, error):
+        if task is not self.load_task:
+            return
+        self.load_task = None
+        self.remove_preview()
+        self.hide_load_progress()
+        self.statusBar().showMessage(f"Erro ao abrir imagem: {error}")
+        logger.warning(f"Erro ao abrir imagem: {error}")
+
+    def open_worklist(self):
+        """Abre vários arquivos como lista de leitura, navegável com ◀/▶ ou PageUp/PageDown."""
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "Selecione os Estudos", "",
+            "Imagens (*.png *.jpg *.jpeg *.bmp *.dcm *.dicom);;DICOM (*.dcm *.dicom);;Todos os arquivos (*)"
+        )
+        if paths:
+            self.navigator.set_worklist(paths)
+
+    def next_study(self):
+        self.navigator.go(self.navigator.index + 1)
+
+    def previous_study(self):
+        self.navigator.go(self.navigator.index - 1)
+
+    def worklist_changed(self):
+        """Chamado pelo StudyNavigator quando a lista ou o estudo atual mudam."""
+        if self.watch_folder is not None:
+            self.watch_folder.worklist_changed()  # um estudo aberto libera espaço na fila de prontos
+        if self.thumbnail_strip is not None and self.thumbnail_strip.isVisible():
+            self.thumbnail_strip.sync(self.navigator.paths, self.navigator.index)
+
+    def open_thumbnails_menu(self):
+        menu = QMenu(self)
+        menu.addAction("Abrir pasta...").triggered.connect(self.open_thumbnail_folder)
+        visible = self.thumbnail_strip is not None and self.thumbnail_strip.isVisible()
+        menu.addAction("Ocultar miniaturas" if visible else "Mostrar miniaturas").triggered.connect(
+            lambda: self.show_thumbnails(not visible))
+        menu.exec(self.thumbnails_button.mapToGlobal(self.thumbnails_button.rect().bottomLeft()))
+
+    def open_thumbnail_folder(self):
+        """Todos os estudos de uma pasta viram a lista de leitura, com as miniaturas ao lado."""
+        from batch_export import list_studies
+
+        directory = QFileDialog.getExistingDirectory(self, "Pasta de Estudos")
+        if not directory:
+            return
+        paths = list_studies(directory)
+        if not paths:
+            self.statusBar().showMessage(f"Nenhuma imagem em {directory}")
+            return
+        self.show_thumbnails(True)
+        self.navigator.set_worklist(paths)
+
+    def show_thumbnails(self, visible=True):
+        if self.thumbnail_strip is None:
+            if not visible:
+                return
+            from thumbnails import ThumbnailStrip, ThumbnailDiskCache
+
+            try:
+                disk_cache = ThumbnailDiskCache()
+            except OSError as e:
+                logger.warning(f"Cache de miniaturas em disco desativado: {e}")
+                disk_cache = None
+            self.thumbnail_strip = ThumbnailStrip(disk_cache=disk_cache)
+            self.thumbnail_strip.study_activated.connect(self.open_study_at)
+            if disk_cache is not None:
+                self.thumbnail_strip.thumbnail_model.pool.start(disk_cache.prune)
+            self.view_layout.insertWidget(0, self.thumbnail_strip)
+        self.thumbnail_strip.setVisible(visible)
+        if visible:
+            self.thumbnail_strip.sync(self.navigator.paths, self.navigator.index)
+        else:
+            self.thumbnail_strip.thumbnail_model.cancel_pending()
+
+    def open_study_at(self, index):
+        self.navigator.go(index)
+
+    def open_watch_folder(self):
+        if self.watch_folder is not None:
+            stats = self.watch_folder.stats()
+            answer = QMessageBox.question(
+                self, "Pasta Monitorada",
+                f"Monitorando {self.watch_folder.directory}\n"
+                f"{stats['prontos']} prontos, {stats['fila']} na fila, {stats['falhas']} falhas; "
+                f"latência p50 {stats['p50']:.0f} ms, p95 {stats['p95']:.0f} ms.\n\nParar de monitorar?",
+            )
+            if answer == QMessageBox.StandardButton.Yes:
+                self.stop_watch_folder()
+            return
+        directory = QFileDialog.getExistingDirectory(self, "Pasta a Monitorar")
+        if directory:
+            self.start_watch_folder(directory)
+
+    def start_watch_folder(self, directory, **options):
+        """Passa a acrescentar à lista de leitura cada estudo novo gravado em directory."""
+        from watchfolder import WatchFolder, WATCH_LANDMARKS_ENV
+
+        self.stop_watch_folder()
+        options.setdefault("propose_landmarks", WATCH_LANDMARKS_ENV)
+        try:
+            self.watch_folder = WatchFolder(self, directory, **options)
+        except OSError as e:
+            self.statusBar().showMessage(f"Não foi possível monitorar {directory}: {e}")
+            logger.warning(f"Não foi possível monitorar {directory}: {e}")
+            return None
+        self.watch_folder.start()
+        self.statusBar().showMessage(f"Monitorando {self.watch_folder.directory}")
+        log(f"Monitorando {self.watch_folder.directory}")
+        return self.watch_folder
+
+    def stop_watch_folder(self):
+        if self.watch_folder is not None:
+            self.watch_folder.stop()
+            self.watch_folder = None
+
+    def pixel_scale(self):
+        """Tamanho do pixel (x, y) usado nas medidas; (1, 1) quando não calibrado."""
+        return self.pixel_spacing or (1.0, 1.0)
+
+    def adjust_window_level(self):
+        """Pede centro/largura da janela e reaplica sobre os pixels brutos em cache."""
+        if self.dicom is None:
+            self.notify("Janela/nível disponível apenas para imagens DICOM.")
+            return
+        center, ok = QInputDialog.getDouble(
+            self, "Janela/Nível", "Centro (nível):", self.dicom.window_center, -100000, 100000, 1
+        )
+        if not ok:
+            return
+        width, ok = QInputDialog.getDouble(
+            self, "Janela/Nível", "Largura (janela):", self.dicom.window_width, 1, 200000, 1
+        )
+        if not ok:
+            return
+        self.dicom.window_center, self.dicom.window_width = center, width
+        task = WindowLevelTask(self.dicom, center, width)
+        task.signals.finished.connect(lambda pyramid, secs, t=task: self.on_window_level_ready(t, pyramid, secs))
+        task.signals.failed.connect(lambda error, t=task: self.on_window_level_failed(t, error))
+        self.window_task = task
+        QThreadPool.globalInstance().start(task)
+
+    def on_window_level_ready(self, task, pyramid, secs):
+        if task is not self.window_task or self.pixmap_item is None:
+            return
+        self.window_task = None
+        self.source_pyramid = pyramid
+        self.source_version += 1
+        self.statusBar().showMessage(f"Janela/nível aplicados em {secs * 1000:.0f} ms")
+        if self.filter_params is not None:
+            self.apply_filters(self.filter_params)
+        else:
+            self.pixmap_item.set_pyramid(pyramid)
+
+    def on_window_level_failed(self, task, error):
+        if task is not self.window_task:
+            return
+        self.window_task = None
+        self.statusBar().showMessage(f"Erro em janela/nível: {error}")
+        logger.warning(f"Erro em janela/nível: {error}")
+
+    def open_filter_panel(self):
+        if not self.pixmap_item:
+            self.notify("Selecione uma imagem primeiro.")
+            return
+        if self.filter_panel is None:
+            self.filter_panel = FilterPanel(self)
+        self.filter_panel.show()
+        self.filter_panel.raise_()
+
+    def apply_filters(self, params):
+        """Exibe a imagem com o realce de params: do cache se já calculado, senão num worker."""
+        import filters
+
+        if self.filter_task is not None:
+            self.filter_task.cancel()
+            self.filter_task = None
+        if filters.is_identity(params):
+            self.filter_params = None
+            if self.pixmap_item is not None and self.pixmap_item.pyramid is not self.source_pyramid:
+                self.pixmap_item.set_pyramid(self.source_pyramid)
+            return
+        self.filter_params = params
+        if not isinstance(self.pixmap_item, TiledImageItem):
+            return
+        if self.filter_cache is None:
+            self.filter_cache = filters.FilterCache()
+        key = (self.source_version, params)
+        cached = self.filter_cache.get(key)
+        if cached is not None:
+            self.pixmap_item.set_pyramid(cached)
+            self.statusBar().showMessage("Realce aplicado (cache)")
+            return
+        task = FilterTask(self.source_pyramid, params)
+        task.signals.finished.connect(lambda pyramid, secs, t=task, k=key: self.on_filter_ready(t, k, pyramid, secs))
+        task.signals.failed.connect(lambda error, t=task: self.on_filter_failed(t, error))
+        self.filter_task = task
+        self.statusBar().showMessage("Aplicando realce...")
+        QThreadPool.globalInstance().start(task)
+
+    def on_filter_ready(self, task, key, pyramid, secs):
+        if task is not self.filter_task or self.pixmap_item is None:
+            return
+        self.filter_task = None
+        self.filter_cache.put(key, pyramid, sum(level.sizeInBytes() for level in pyramid.levels))
+        self.pixmap_item.set_pyramid(pyramid)
+        self.statusBar().showMessage(f"Realce aplicado em {secs * 1000:.0f} ms")
+
+    def on_filter_failed(self, task, error):
+        if task is not self.filter_task:
+            return
+        self.filter_task = None
+        self.statusBar().showMessage(f"Erro no realce: {error}")
+        logger.warning(f"Erro no realce: {error}")
+
+    def detect_endplates(self, as_landmarks=False):
+        """
+        Sugere em segundo plano o par de placas vertebrais mais inclinadas (curva principal).
+        Com as_landmarks, todas as linhas candidatas viram placas para a análise de curvas.
+        """
+        if not isinstance(self.pixmap_item, TiledImageItem):
+            self.notify("Selecione uma imagem primeiro.")
+            return
+        from endplates import MODEL_PATH
+
+        task = EndplateDetectionTask(self.pixmap_item.pyramid, MODEL_PATH)
+        task.signals.finished.connect(
+            lambda result, secs, t=task: self.on_endplates_ready(t, result, secs, as_landmarks))
+        task.signals.failed.connect(lambda error, t=task: self.on_endplates_failed(t, error))
+        self.endplate_task = task
+        self.statusBar().showMessage("Detectando placas vertebrais...")
+        QThreadPool.globalInstance().start(task)
+
+    def on_endplates_ready(self, task, result, secs, as_landmarks=False):
+        if task is not self.endplate_task or self.pixmap_item is None:
+            return
+        self.endplate_task = None
+        if as_landmarks:
+            self.record(("endplates", tuple(self.add_endplate_lines(result.lines))))
+            self.analyze_curves()
+            return
+        if result.pair is None:
+            message = f"Nenhum par de placas vertebrais encontrado ({len(result.lines)} linhas candidatas)."
+        else:
+            # A sugestão é um ângulo comum: pontos, linhas e texto podem ser ajustados ou removidos
+            angle_item = self.add_cobb_angle(result.pair_points(), QColor("orange"))
+            self.mark_annotation_dirty(angle_item)
+            self.record(("add", (angle_item,)))
+            message = (f"Sugestão: {angle_item.angle_deg:.1f}° entre as placas mais inclinadas "
+                       f"({len(result.lines)} linhas candidatas, {secs * 1000:.0f} ms)")
+        self.statusBar().showMessage(message)
+        log(message)
+
+    def on_endplates_failed(self, task, error):
+        if task is not self.endplate_task:
+            return
+        self.endplate_task = None
+        self.statusBar().showMessage(f"Erro na detecção de vértebras: {error}")
+        logger.warning(f"Erro na detecção de vértebras: {error}")
+
+    def open_curves_menu(self):
+        menu = QMenu(self)
+        if self.marking_endplates:
+            menu.addAction("Concluir marcação e analisar").triggered.connect(self.finish_endplate_marking)
+        else:
+            menu.addAction("Marcar placas vertebrais").triggered.connect(self.start_endplate_marking)
+        menu.addAction("Usar linhas detectadas").triggered.connect(lambda: self.detect_endplates(as_landmarks=True))
+        menu.addAction("Analisar curvas").triggered.connect(self.analyze_curves)
+        menu.exec(self.curves_button.mapToGlobal(self.curves_button.rect().bottomLeft()))
+
+    def start_endplate_marking(self):
+        if not self.pixmap_item:
+            self.notify("Selecione uma imagem primeiro.")
+            return
+        self.reset_marking_modes()
+        self.marking_endplates = True
+        self.curves_button.setStyleSheet(
+            self.button_style +
+            "QPushButton { background-color: #1976d2; border: 1px solid rgba(10, 73, 112, 1); background-color: rgba(52, 139, 210, 1); }"
+        )
+        self.notify("Marcação de placas ativada. Clique 2 pontos por placa, de T1 para baixo (superior e inferior de cada vértebra).")
+
+    def finish_endplate_marking(self):
+        self.marking_endplates = False
+        self.curves_button.setStyleSheet(self.button_style)
+        for ponto in self.scene.line_points:  # clique sem par
+            self.points.remove(ponto)
+            self.scene.removeItem(ponto)
+        self.scene.line_points = []
+        self.analyze_curves()
+
+    def add_endplate_lines(self, lines, uids=None):
+        """Cria uma LineConnection por placa a partir de [((x1, y1), (x2, y2)), ...] (importação)."""
+        created = []
+        for k, ((x1, y1), (x2, y2)) in enumerate(lines):
+            p1, p2 = DraggablePoint(QPointF(x1, y1)), DraggablePoint(QPointF(x2, y2))
+            for point, x, y in ((p1, x1, y1), (p2, x2, y2)):
+                self.scene.addItem(point)
+                self.points.insert(point, x, y)
+            line = LineConnection(self.scene, p1, p2, color=self.endplate_color, uid=uids[k] if uids else None)
+            created.append(line)
+        self.lines += created
+        self.endplate_lines += created
+        return created
+
+    def remove_endplate_line(self, line):
+        """Tira a placa da análise; linha e pontos saem da cena se nada mais os usa."""
+        self.endplate_lines.remove(line)
+        if line.angles or line.measurements:
+            return
+        self.scene.removeItem(line.line)
+        for ponto in (line.p1, line.p2):
+            self.points.remove(ponto)
+            if ponto.scene() is self.scene:
+                self.scene.removeItem(ponto)
+
+    def restore_endplate_line(self, line):
+        if line.line.scene() is not self.scene:
+            self.scene.addItem(line.line)
+            for ponto in (line.p1, line.p2):
+                self.scene.addItem(ponto)
+                self.points.insert(ponto, ponto.pos().x(), ponto.pos().y())
+        self.endplate_lines.append(line)
+
+    def analyze_curves(self):
+        """
+        Calcula todos os ângulos entre as placas de uma vez e cria um CobbAngleItem para a maior
+        curva de cada região. Os ângulos usam as próprias LineConnection das placas: arrastar uma
+        linha recalcula só os ângulos que a envolvem (UpdateScheduler.mark_line).
+        """
+        if len(self.endplate_lines) < 2:
+            self.notify("Marque ou importe pelo menos 2 placas vertebrais.")
+            return []
+        self.scene.scheduler.flush()
+        previous = tuple(self.curve_angles)
+        for angle in previous:
+            self.remove_angle(angle)
+        # De cima para baixo pela posição atual (as placas podem ter sido marcadas fora de ordem)
+        self.endplate_lines.sort(key=lambda line: line.p1.pos().y() + line.p2.pos().y())
+        linhas = [((line.p1.pos().x(), line.p1.pos().y()), (line.p2.pos().x(), line.p2.pos().y()))
+                  for line in self.endplate_lines]
+        with profiler.timer("curvas.analise"):
+            found, _ = curves.analisar_curvas(linhas, self.pixel_scale())
+        maiores = curves.maiores_por_regiao(found)
+        report = []
+        for nome, _, _ in curves.REGIOES:
+            curva = maiores.get(nome)
+            if curva is None:
+                continue
+            line1, line2 = self.endplate_lines[curva.superior], self.endplate_lines[curva.inferior]
+            angle_item = CobbAngleItem(line1, line2, self.scene, COLOR=QColor(CURVE_COLORS[nome]))
+            angle_item.region = nome
+            self.cobb_angles.append(angle_item)
+            self.curve_angles.append(angle_item)
+            self.mark_annotation_dirty(angle_item)
+            report.append(f"{nome}: {curva.angulo:.1f}° (ápice {curva.vertebra_apice})")
+        if previous or self.curve_angles:
+            self.record(("replace", previous, tuple(self.curve_angles)))
+        message = ("Curvas — " + "; ".join(report)) if report else "Nenhuma curva encontrada."
+        self.statusBar().showMessage(message)
+        log(message)
+        return [maiores[nome] for nome, _, _ in curves.REGIOES if nome in maiores]
+
+    def open_measurements_menu(self):
+        menu = QMenu(self)
+        for kind in measurements.REGISTRO.values():
+            menu.addAction(kind.nome).triggered.connect(lambda checked, k=kind: self.start_measurement(k))
+        menu.exec(self.measure_button.mapToGlobal(self.measure_button.rect().bottomLeft()))
+
+    def start_measurement(self, kind):
+        if not self.pixmap_item:
+            self.notify("Selecione uma imagem primeiro.")
+            return
+        self.reset_marking_modes()
+        self.measuring = kind
+        self.measure_button.setStyleSheet(
+            self.button_style +
+            "QPushButton { background-color: #1976d2; border: 1px solid rgba(10, 73, 112, 1); background-color: rgba(52, 139, 210, 1); }"
+        )
+        units = "mm" if self.pixel_spacing else "px (imagem sem calibração)"
+        self.notify(f"{kind.nome}: {kind.dica} Distâncias em {units}.")
+
+    def add_measurement(self, kind, points, draggable=None, uid=None, line_uids=None):
+        """Cria a medida a partir de kind.n_pontos (x, y); draggable reaproveita pontos já na cena."""
+        if draggable is None:
+            draggable = []
+            for x, y in points:
+                point = DraggablePoint(QPointF(x, y))
+                self.scene.addItem(point)
+                self.points.insert(point, x, y)
+                draggable.append(point)
+        lines = [LineConnection(self.scene, draggable[i], draggable[i + 1], color=QColor("#00897b"), width=3,
+                                uid=line_uids[i // 2] if line_uids else None)
+                 for i in range(0, len(draggable), 2)]
+        self.lines += lines
+        measurement = MeasurementItem(kind, lines, self.scene, uid=uid)
+        self.measurements.append(measurement)
+        log(measurement.text_item.toPlainText())
+        return measurement
+
+    def remove_measurement(self, measurement):
+        self.scene.removeItem(measurement.text_item)
+        for item in measurement.overlay:
+            self.scene.removeItem(item)
+        for line in measurement.lines:
+            line.measurements.remove(measurement)
+            if line.angles or line.measurements or line in self.endplate_lines:
+                continue
+            self.scene.removeItem(line.line)
+            for ponto in (line.p1, line.p2):
+                self.points.remove(ponto)
+                if ponto.scene() is self.scene:
+                    self.scene.removeItem(ponto)
+        self.measurements.remove(measurement)
+        self.scene.scheduler.discard(measurement)
+        self.forget_annotation(measurement)
+
+    def delete_measurement(self, measurement):
+        """Remoção pelo menu: entra no histórico (Ctrl+Z devolve a mesma medida)."""
+        self.remove_measurement(measurement)
+        self.record(("unmeasure", (measurement,)))
+
+    def restore_measurement(self, measurement):
+        for line in measurement.lines:
+            if line.line.scene() is not self.scene:
+                self.scene.addItem(line.line)
+                for ponto in (line.p1, line.p2):
+                    if ponto.scene() is not self.scene:
+                        self.scene.addItem(ponto)
+                    self.points.insert(ponto, ponto.pos().x(), ponto.pos().y())
+            line.measurements.append(measurement)
+        self.scene.addItem(measurement.text_item)
+        for item in measurement.overlay:
+            self.scene.addItem(item)
+        self.measurements.append(measurement)
+        self.scene.scheduler.mark_measurement(measurement)
 
     def open_color_dialog(self):
         if not self.pixmap_item:
-            print("Selecione uma imagem primeiro.")
+            self.notify("Selecione uma imagem primeiro.")
             return
         color = QColorDialog.getColor()
         if color.isValid():
@@ -566,6 +1994,7 @@ class ImageViewer(QMainWindow):
         self.enable_add_angle()
 
     def enable_add_angle(self):
+        self.reset_marking_modes()
         self.selected_cobb_color = Qt.GlobalColor.blue
         self.adding_angle = True
         if self.cobb_button:
@@ -573,7 +2002,53 @@ class ImageViewer(QMainWindow):
                 self.button_style +
                 "QPushButton { background-color: #1976d2; border: 1px solid rgba(10, 73, 112, 1); background-color: rgba(52, 139, 210, 1); }"
             )
-        print("Modo de adicionar ângulo de Cobb ativado. Clique na imagem para adicionar 4 pontos (2 linhas).")
+        self.notify("Modo de adicionar ângulo de Cobb ativado. Clique na imagem para adicionar 4 pontos (2 linhas).")
+
+    def toggle_snap(self):
+        self.snap_enabled = not self.snap_enabled
+        self.snap_button.setStyleSheet(
+            self.button_style + ("QPushButton { background-color: rgba(52, 139, 210, 1); }" if self.snap_enabled else "")
+        )
+        message = "Ajuste às bordas ativado." if self.snap_enabled else "Ajuste às bordas desativado."
+        self.statusBar().showMessage(message)
+        log(message)
+
+    def snap_array(self):
+        """Array da imagem original (sem filtros), reaproveitado enquanto o estudo não muda."""
+        if self.source_pyramid is None:
+            return None
+        if self.snap_version != self.source_version:
+            buffers = self.source_pyramid.buffers
+            self.snap_buffer = buffers[0] if buffers else ImageBuffer.from_qimage(self.source_pyramid.levels[0])
+            self.snap_version = self.source_version
+        return self.snap_buffer.array
+
+    def snap_position(self, pos, partner=None):
+        """
+        pos ajustada à borda forte mais próxima, com precisão subpixel; partner é o outro ponto da
+        linha (a busca segue a normal da linha). Sem borda forte por perto, devolve pos.
+        """
+        import endplates
+
+        array = self.snap_array()
+        if array is None:
+            return pos
+        direction = None
+        if partner is not None:
+            direction = (pos.x() - partner.pos().x(), pos.y() - partner.pos().y())
+        with profiler.timer("ajuste.borda"):
+            snapped = endplates.snap_to_edge(array, (pos.x(), pos.y()), direction)
+        return pos if snapped is None else QPointF(*snapped)
+
+    def snap_dragged_point(self, point, pos):
+        line = point.line
+        if line is None:  # clique pendente: só fora das medidas
+            return pos if self.measuring is not None else self.snap_position(pos)
+        if line.measurements:
+            measurement = line.measurements[0]
+            if measurement.lines.index(line) not in measurement.kind.placas:
+                return pos
+        return self.snap_position(pos, line.p2 if line.p1 is point else line.p1)
 
     def calculate_angle(self):
         if len(self.lines) >= 2:
@@ -581,38 +2056,118 @@ class ImageViewer(QMainWindow):
             # Usa a cor selecionada
             angle_item = CobbAngleItem(line1, line2, self.scene, COLOR=self.selected_cobb_color)
             self.cobb_angles.append(angle_item)
-            print(f"Ângulo de Cobb: {angle_item.angle_deg:.2f}°")
+            self.mark_annotation_dirty(angle_item)
+            self.record(("add", (angle_item,)))
+            log(f"Ângulo de Cobb: {angle_item.angle_deg:.2f}°")
         else:
-            print("Erro: É necessário ter pelo menos 2 linhas.")
+            self.notify("Erro: É necessário ter pelo menos 2 linhas.")
             
     def save_image(self):
         if not self.pixmap_item:
-            print("Nenhuma imagem carregada para salvar.")
+            self.notify("Nenhuma imagem carregada para salvar.")
+            return
+        if self.export_job is not None:
+            self.notify("Já existe uma exportação em andamento.")
             return
-
-        rect = self.scene.itemsBoundingRect()
-        image = QPixmap(int(rect.width()), int(rect.height()))
-        image.fill(Qt.GlobalColor.white)
-
-        painter = QPainter(image)
-        self.scene.render(painter, target=QRectF(image.rect()), source=rect)
-        painter.end()
 
         path, selected_filter = QFileDialog.getSaveFileName(
             self,
             "Salvar Imagem", "",
             "PNG (*.png);;JPEG (*.jpg *.jpeg);;BMP (*.bmp)"
         )
-        if path:
-            ext = os.path.splitext(path)[1]
-            if not ext:
-                ext_map = {"PNG": ".png", "JPEG": ".jpg", "BMP": ".bmp"}
-            for key, val in ext_map.items():
-                if key in selected_filter:
-                    path += val
-                break
-            print("Imagem salva." if image.save(path) else "Erro ao salvar imagem.")
+        if not path:
+            return
+        scale, ok = QInputDialog.getDouble(
+            self, "Salvar Imagem", "Escala de saída:", self.export_scale, 0.05, 4.0, 2
+        )
+        if not ok:
+            return
+        self.export_scale = scale
+
+        ext_map = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG", ".bmp": "BMP"}
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in ext_map:
+            fmt = next((key for key in ("PNG", "JPEG", "BMP") if key in selected_filter), "PNG")
+            path += {"PNG": ".png", "JPEG": ".jpg", "BMP": ".bmp"}[fmt]
+        else:
+            fmt = ext_map[ext]
+        if fmt == "PNG":
+            compression, ok = QInputDialog.getInt(
+                self, "Salvar Imagem", "Compressão do PNG (0 = mais rápido, 9 = menor arquivo):",
+                self.export_compression, 0, 9
+            )
+            if not ok:
+                return
+            self.export_compression = compression
+
+        self.export_scene(path, fmt, scale)
+
+    def export_scene(self, path, fmt="PNG", scale=1.0):
+        """Exporta a cena sem diálogos (usado por save_image e pelos benchmarks)."""
+        # Pinta em faixas intercaladas com o event loop; compressão e gravação ficam no QThreadPool
+        job = SceneExportJob(
+            self.scene, self.scene.itemsBoundingRect(), path, fmt, scale=scale,
+            compression=self.export_compression, quality=self.export_quality
+        )
+        job.signals.progress.connect(self.load_progress.setValue)
+        job.signals.finished.connect(lambda ok, secs, j=job: self.on_export_finished(j, ok, secs))
+        self.export_job = job
+        self.load_progress.setValue(0)
+        self.load_progress.show()
+        self.load_cancel_button.show()
+        self.statusBar().showMessage(f"Exportando {job.width}x{job.height}...")
+        job.start()
+        return job
+
+    def on_export_finished(self, job, ok, secs):
+        if job is not self.export_job:
+            return
+        self.export_job = None
+        if self.load_task is None:
+            self.hide_load_progress()
+        if ok:
+            message = f"Imagem salva em {secs * 1000:.0f} ms ({job.width}x{job.height})."
+        elif job.cancelled:
+            message = "Exportação cancelada."
+        else:
+            message = "Erro ao salvar imagem."
+        self.statusBar().showMessage(message)
+        log(message)
                 
+    def toggle_profiler_overlay(self):
+        active = not self.profiler_overlay.isVisible()
+        if active and not profiler.enabled:
+            profiler.reset()
+            profiler.enabled = True
+        self.profiler_overlay.set_active(active)
+
+    def dump_profile(self, path=None):
+        """Grava o perfil coletado desde que o profiler foi ligado (JSON)."""
+        if not profiler.enabled:
+            self.notify("Profiler desligado: pressione F9 ou defina COBB_PROFILE.")
+            return None
+        path = path or f"cobb_perfil_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        try:
+            profiler.dump(path)
+        except OSError as e:
+            self.notify(f"Erro ao gravar perfil: {e}", logging.WARNING)
+            return None
+        self.statusBar().showMessage(f"Perfil gravado em {path}", 5000)
+        log(f"Perfil gravado em {path}")
+        return path
+
+    def closeEvent(self, event):
+        self.stop_watch_folder()
+        self.scene.scheduler.flush()
+        self.persist_annotations()
+        if self.annotation_store is not None:
+            self.annotation_store.close()
+        if self.session_log is not None:
+            self.session_log.close()
+        if PROFILE_ENV.endswith(".json"):
+            self.dump_profile(PROFILE_ENV)
+        super().closeEvent(event)
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         if self.pixmap_item:
@@ -634,13 +2189,21 @@ class ImageViewer(QMainWindow):
             self.view.fitInView(self.pixmap_item, Qt.AspectRatioMode.KeepAspectRatio)
             
     def open_settings_menu(self):
-        print("menu aberto")
+        log("menu aberto")
         pass
 
 
 # ---------------- Execução ----------------
 if __name__ == "__main__":
+    configure_logging()
     app = QApplication(sys.argv)
     viewer = ImageViewer()
     viewer.show()
+    if os.environ.get("COBB_STARTUP_BENCHMARK"):
+        # benchmarks/startup.py: encerra assim que a janela é exibida
+        QTimer.singleShot(0, app.quit)
+    else:
+        QThreadPool.globalInstance().start(WarmUpTask())
+        if os.environ.get("COBB_WATCH_DIR"):
+            viewer.start_watch_folder(os.environ["COBB_WATCH_DIR"])
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Registro de tipos de medida além do Cobb (sem Qt): eixos verticais, cifose/lordose e pelve.
+
+Cada tipo recebe os pontos clicados (pares formam linhas) e o tamanho do pixel (x, y) e
+devolve uma Medida com o valor, o texto exibido e os segmentos auxiliares da sobreposição.
+Distâncias saem em mm quando o estudo é calibrado (PixelSpacing), senão em px.
+placas diz quais linhas (pares de cliques) ficam sobre placas vertebrais: só os pontos delas
+passam pelo "Ajustar às Bordas"; centros de C7 e cabeças femorais ficam onde foram clicados.
+Um tipo novo é só uma função decorada com @registrar.
+"""
+import math
+
+import geometry
+
+REGISTRO = {}
+
+
+class Medida:
+    __slots__ = ("valor", "texto", "segmentos", "ancora")
+
+    def __init__(self, valor, texto, segmentos=(), ancora=(0.0, 0.0)):
+        self.valor = valor
+        self.texto = texto
+        self.segmentos = segmentos  # [((x1, y1), (x2, y2)), ...] em coordenadas da imagem
+        self.ancora = ancora  # onde o texto é posicionado
+
+
+class TipoMedida:
+    def __init__(self, chave, nome, n_pontos, dica, calcular, placas=()):
+        self.chave = chave
+        self.nome = nome
+        self.n_pontos = n_pontos  # sempre par: cada dois pontos formam uma linha arrastável
+        self.dica = dica
+        self.calcular = calcular  # (pontos, escala, calibrado) -> Medida
+        self.placas = frozenset(placas)  # índices das linhas sobre placas vertebrais
+
+
+def registrar(chave, nome, n_pontos, dica, placas=()):
+    def decorador(calcular):
+        REGISTRO[chave] = TipoMedida(chave, nome, n_pontos, dica, calcular, placas)
+        return calcular
+    return decorador
+
+
+def _unidade(calibrado):
+    return "mm" if calibrado else "px"
+
+
+def _eixo_vertical(rotulo):
+    def calcular(pontos, escala, calibrado):
+        (cx, cy), (sx_, sy_) = pontos
+        desvio = (cx - sx_) * escala[0]
+        segmentos = (((cx, cy), (cx, sy_)), ((cx, sy_), (sx_, sy_)))  # prumo e desvio horizontal
+        return Medida(desvio, f"{rotulo} {desvio:+.1f} {_unidade(calibrado)}", segmentos,
+                      ((cx + sx_) / 2, sy_))
+    return calcular
+
+
+registrar("sva", "SVA (eixo vertical sagital)", 2,
+          "Clique no centro de C7 e no canto póstero-superior de S1.")(_eixo_vertical("SVA"))
+registrar("cva", "Balanço coronal (C7–CSVL)", 2,
+          "Clique no centro de C7 e no ponto médio de S1.")(_eixo_vertical("Coronal"))
+
+
+def _angulo_entre_placas(rotulo):
+    def calcular(pontos, escala, calibrado):
+        p1, p2, q1, q2 = pontos
+        angulo = geometry.angulo_cobb(p1, p2, q1, q2, escala)
+        return Medida(angulo, f"{rotulo} {angulo:.1f}°", (),
+                      ((p1[0] + q1[0]) / 2, (p1[1] + q1[1]) / 2))
+    return calcular
+
+
+registrar("cifose", "Cifose torácica (T4–T12)", 4,
+          "Clique 2 pontos na placa superior de T4 e 2 na placa inferior de T12.", placas=(0, 1))(_angulo_entre_placas("Cifose"))
+registrar("lordose", "Lordose lombar (L1–S1)", 4,
+          "Clique 2 pontos na placa superior de L1 e 2 na placa superior de S1.", placas=(0, 1))(_angulo_entre_placas("Lordose"))
+
+
+@registrar("pelve", "Parâmetros pélvicos (PI, PT, SS)", 4,
+           "Clique as pontas anterior e posterior da placa de S1 e os centros das duas cabeças femorais.",
+           placas=(0,))
+def parametros_pelvicos(pontos, escala, calibrado):
+    """Incidência (PI), versão (PT) e inclinação sacral (SS); PI = PT + SS."""
+    (ax, ay), (px, py), (h1x, h1y), (h2x, h2y) = pontos
+    sx, sy = escala
+    mx, my = (ax + px) / 2, (ay + py) / 2  # meio da placa de S1
+    hx, hy = (h1x + h2x) / 2, (h1y + h2y) / 2  # eixo bicoxofemoral
+    # Vetores em unidades físicas; y da imagem cresce para baixo
+    ex, ey = (ax - px) * sx, (ay - py) * sy
+    vx, vy = (hx - mx) * sx, (hy - my) * sy
+    ss = math.degrees(math.atan2(abs(ey), abs(ex)))
+    anterior = 1.0 if ex >= 0 else -1.0  # sentido posterior -> anterior no eixo x
+    pt = math.degrees(math.atan2(vx * anterior, vy))
+    # Perpendicular à placa apontando para baixo (para as cabeças femorais)
+    nx, ny = -ey, ex
+    if ny < 0:
+        nx, ny = -nx, -ny
+    norm = math.hypot(nx, ny) * math.hypot(vx, vy)
+    pi = math.degrees(math.acos(max(-1.0, min(1.0, (nx * vx + ny * vy) / norm)))) if norm else 0.0
+    segmentos = (((mx, my), (hx, hy)), ((hx, hy), (hx, my)))
+    return Medida(pi, f"PI {pi:.1f}°  PT {pt:.1f}°  SS {ss:.1f}°", segmentos, (mx, my))
@@ -0,0 +1,139 @@
+"""
+Instrumentação dos caminhos quentes: cronômetros e contadores, log estruturado (JSON) e
+gravação do perfil de uma sessão.
+
+Desligado (padrão), cada ponto de medição custa só a checagem de profiler.enabled.
+Variáveis de ambiente:
+    COBB_PROFILE=1             liga a coleta desde o início
+    COBB_PROFILE=sessao.json   liga e grava o perfil nesse arquivo ao fechar a janela
+    COBB_LOG=DEBUG             log estruturado em stderr (uma linha JSON por evento)
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger("cobb")
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("profiler", "name", "t0")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, (time.perf_counter() - self.t0) * 1000)
+        return False
+
+
+class Profiler:
+    """Estatísticas por nome (chamadas, total, máximo), contadores e os eventos recentes da sessão."""
+    def __init__(self, enabled=False, max_events=200_000):
+        self.enabled = enabled
+        self.lock = threading.Lock()  # decodificação e exportação registram de outras threads
+        self.stats = {}  # nome -> [chamadas, total ms, máximo ms]
+        self.counters = {}
+        self.events = deque(maxlen=max_events)  # (segundos desde o início, nome, ms, campos)
+        self.started = time.perf_counter()
+
+    def timer(self, name):
+        """Context manager que mede o bloco; devolve um objeto vazio se desligado."""
+        return _Timer(self, name) if self.enabled else NULL_TIMER
+
+    def record(self, name, ms, **fields):
+        if not self.enabled:
+            return
+        t = time.perf_counter() - self.started
+        with self.lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                self.stats[name] = [1, ms, ms]
+            else:
+                stat[0] += 1
+                stat[1] += ms
+                if ms > stat[2]:
+                    stat[2] = ms
+            self.events.append((t, name, ms, fields or None))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(name, extra={"evento": name, "ms": round(ms, 4), "campos": fields})
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+            self.counters.clear()
+            self.events.clear()
+            self.started = time.perf_counter()
+
+    def summary(self):
+        with self.lock:
+            return {
+                name: {"chamadas": calls, "total_ms": round(total, 3),
+                       "media_ms": round(total / calls, 4), "max_ms": round(peak, 3)}
+                for name, (calls, total, peak) in sorted(self.stats.items())
+            }
+
+    def dump(self, path):
+        """Grava resumo, contadores e a linha do tempo dos eventos em JSON."""
+        summary = self.summary()
+        with self.lock:
+            counters = dict(self.counters)
+            events = [
+                {"t": round(t, 6), "nome": name, "ms": round(ms, 4), **(fields or {})}
+                for t, name, ms, fields in self.events
+            ]
+            duration = time.perf_counter() - self.started
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"duracao_s": round(duration, 3), "resumo": summary,
+                       "contadores": counters, "eventos": events}, f, ensure_ascii=False)
+        return path
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro, com os campos extras do evento."""
+    def format(self, record):
+        entry = {"t": round(record.created, 6), "nivel": record.levelname, "msg": record.getMessage()}
+        for key in ("evento", "ms"):
+            if hasattr(record, key):
+                entry[key] = getattr(record, key)
+        entry.update(getattr(record, "campos", None) or {})
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging():
+    """Liga o log estruturado em stderr conforme COBB_LOG (ex.: DEBUG, INFO)."""
+    level = os.environ.get("COBB_LOG")
+    if not level:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(level.upper())
+
+
+PROFILE_ENV = os.environ.get("COBB_PROFILE", "")
+profiler = Profiler(enabled=bool(PROFILE_ENV))
@@ -0,0 +1,81 @@
+"""
+Índice espacial em grade para consultas de proximidade entre pontos de anotação.
+"""
+import math
+
+
+class PointGrid:
+    """Grade uniforme: cada célula guarda os itens cujo ponto cai nela (consulta O(1) média por raio)."""
+    def __init__(self, cell_size=32.0):
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.positions = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, item, x, y):
+        if item in self.positions:
+            self.move(item, x, y)
+            return
+        self.positions[item] = (x, y)
+        self.cells.setdefault(self.cell(x, y), set()).add(item)
+
+    def move(self, item, x, y):
+        old = self.positions.get(item)
+        if old is None:
+            return
+        self.positions[item] = (x, y)
+        old_cell, new_cell = self.cell(*old), self.cell(x, y)
+        if old_cell != new_cell:
+            self.discard_from_cell(old_cell, item)
+            self.cells.setdefault(new_cell, set()).add(item)
+
+    def remove(self, item):
+        pos = self.positions.pop(item, None)
+        if pos is not None:
+            self.discard_from_cell(self.cell(*pos), item)
+
+    def discard_from_cell(self, cell, item):
+        bucket = self.cells.get(cell)
+        if bucket is not None:
+            bucket.discard(item)
+            if not bucket:
+                del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.positions.clear()
+
+    def within(self, x, y, radius):
+        """Gera (item, distância) para os itens a menos de radius de (x, y)."""
+        r2 = radius * radius
+        cx0, cy0 = self.cell(x - radius, y - radius)
+        cx1, cy1 = self.cell(x + radius, y + radius)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                for item in self.cells.get((cx, cy), ()):
+                    px, py = self.positions[item]
+                    d2 = (px - x) ** 2 + (py - y) ** 2
+                    if d2 < r2:
+                        yield item, math.sqrt(d2)
+
+    def any_within(self, x, y, radius):
+        return next(self.within(x, y, radius), None) is not None
+
+    def nearest(self, x, y, max_distance):
+        """Item mais próximo de (x, y) dentro de max_distance, ou None."""
+        best, best_d = None, max_distance
+        for item, d in self.within(x, y, max_distance):
+            if d < best_d:
+                best, best_d = item, d
+        return best
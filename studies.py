@@ -0,0 +1,174 @@
+"""
+Navegação pela lista de leitura: pré-carregamento dos próximos estudos e cache LRU das
+imagens decodificadas, com o estado das anotações de cada estudo.
+"""
+import os
+import time
+from collections import OrderedDict
+
+from PyQt6.QtCore import QThreadPool
+
+from loader import ImageLoadTask
+from profiling import logger
+
+
+class StudyEntry:
+    """Imagem decodificada de um estudo, pronta para ser exibida."""
+    def __init__(self, pyramid, dicom=None, thumbnail=None):
+        self.pyramid = pyramid
+        self.dicom = dicom
+        self.thumbnail = thumbnail  # QImage pequeno, quando o estudo veio da pasta monitorada
+        self.nbytes = sum(level.sizeInBytes() for level in pyramid.levels)
+
+
+class StudyCache:
+    """LRU de StudyEntry limitado por bytes (soma dos níveis da pirâmide)."""
+    def __init__(self, budget_bytes=1024 ** 3):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+
+    def __contains__(self, path):
+        return path in self.entries
+
+    def get(self, path):
+        entry = self.entries.get(path)
+        if entry is not None:
+            self.entries.move_to_end(path)
+        return entry
+
+    def put(self, path, entry, keep=()):
+        """Guarda entry; descarta os menos usados fora de keep até caber no orçamento."""
+        old = self.entries.pop(path, None)
+        if old is not None:
+            self.bytes -= old.nbytes
+        self.entries[path] = entry
+        self.bytes += entry.nbytes
+        for victim in list(self.entries):
+            if self.bytes <= self.budget_bytes:
+                break
+            if victim != path and victim not in keep:
+                self.bytes -= self.entries.pop(victim).nbytes
+
+
+class StudyNavigator:
+    """Lista de leitura do ImageViewer com pré-carregamento dos próximos N estudos."""
+    def __init__(self, viewer, prefetch=2, budget_bytes=1024 ** 3):
+        self.viewer = viewer
+        self.prefetch_count = prefetch
+        self.cache = StudyCache(budget_bytes)
+        self.paths = []
+        self.index = -1
+        self.annotations = {}  # caminho -> viewer.annotation_state()
+        self.pending = {}  # caminho -> ImageLoadTask de pré-carregamento
+        self.waiting = None  # estudo pedido que ainda está sendo pré-carregado
+        self.hits = 0
+        self.misses = 0
+        self.switch_started = None
+
+    @property
+    def current_path(self):
+        return self.paths[self.index] if 0 <= self.index < len(self.paths) else None
+
+    def set_worklist(self, paths):
+        self.save_annotations()
+        self.paths = list(paths)
+        self.index = -1
+        self.go(0)
+
+    def append(self, path, entry=None):
+        """Acrescenta um estudo ao fim da lista (pasta monitorada); abre-o se nada estiver aberto."""
+        self.paths.append(path)
+        if entry is not None:
+            self.cache.put(path, entry, keep=self.wanted() | {path})
+        if self.viewer.pixmap_item is None and self.viewer.load_task is None:
+            self.go(len(self.paths) - 1)
+        else:
+            self.viewer.worklist_changed()
+
+    def save_annotations(self):
+        # Chave pelo estudo exibido: em go() o índice já aponta para o próximo enquanto a cena
+        # ainda mostra o anterior (ou nada, se ele ainda está sendo pré-carregado)
+        path = self.viewer.study_path
+        if path is not None and self.viewer.pixmap_item is not None:
+            self.annotations[path] = self.viewer.annotation_state()
+
+    def annotations_for(self, path):
+        state = self.annotations.get(path)
+        return state if state is not None else self.viewer.load_annotations(path)
+
+    def go(self, index):
+        if not 0 <= index < len(self.paths) or index == self.index:
+            return
+        self.save_annotations()
+        self.index = index
+        path = self.paths[index]
+        self.switch_started = time.perf_counter()
+        self.viewer.worklist_changed()
+
+        entry = self.cache.get(path)
+        if entry is not None:
+            self.hits += 1
+            self.waiting = None
+            self.viewer.cancel_loading()
+            self.show(path, entry)
+        else:
+            self.misses += 1
+            if path in self.pending:
+                # Já está sendo decodificado em segundo plano: só espera terminar
+                self.waiting = path
+                self.viewer.cancel_loading()
+                self.viewer.statusBar().showMessage(f"Aguardando pré-carregamento de {os.path.basename(path)}...")
+            else:
+                self.waiting = None
+                self.viewer.load_image(path)
+        self.prefetch()
+
+    def show(self, path, entry):
+        self.viewer.show_study(entry.pyramid, entry.dicom, path)
+        self.viewer.restore_annotations(self.annotations_for(path))
+        elapsed = (time.perf_counter() - self.switch_started) * 1000
+        self.viewer.statusBar().showMessage(
+            f"Estudo {self.index + 1}/{len(self.paths)} ({os.path.basename(path)}) em {elapsed:.0f} ms "
+            f"| cache: {self.hits} acertos, {self.misses} falhas"
+        )
+        logger.debug(f"Troca de estudo em {elapsed:.0f} ms (acertos {self.hits}, falhas {self.misses})")
+
+    def on_study_loaded(self, path, pyramid, dicom):
+        """Chamado pelo visualizador quando um carregamento normal (falha de cache) termina."""
+        if path != self.current_path:
+            return
+        self.cache.put(path, StudyEntry(pyramid, dicom), keep=self.wanted())
+        self.viewer.restore_annotations(self.annotations_for(path))
+
+    def wanted(self):
+        """Estudos que devem permanecer no cache: o atual e os próximos N."""
+        return set(self.paths[max(0, self.index): self.index + 1 + self.prefetch_count])
+
+    def prefetch(self):
+        for path in self.paths[self.index + 1: self.index + 1 + self.prefetch_count]:
+            if path in self.cache or path in self.pending:
+                continue
+            task = ImageLoadTask(path, cache=self.viewer.buffer_cache)
+            task.signals.finished.connect(lambda pyramid, secs, t=task: self.on_prefetched(t, pyramid))
+            task.signals.failed.connect(lambda error, t=task: self.on_prefetch_failed(t))
+            self.pending[path] = task
+            QThreadPool.globalInstance().start(task)
+
+    def on_prefetched(self, task, pyramid):
+        if self.pending.get(task.path) is not task:
+            return
+        del self.pending[task.path]
+        entry = StudyEntry(pyramid, task.dicom)
+        self.cache.put(task.path, entry, keep=self.wanted())
+        if task.path == self.waiting:
+            self.waiting = None
+            self.show(task.path, entry)
+
+    def on_prefetch_failed(self, task):
+        if self.pending.get(task.path) is task:
+            del self.pending[task.path]
+        if task.path == self.waiting:
+            # Carrega pelo caminho normal para mostrar o erro ao usuário
+            self.waiting = None
+            self.viewer.load_image(task.path)
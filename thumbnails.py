@@ -0,0 +1,275 @@
+"""
+Miniaturas dos estudos da lista de leitura, com cache persistente em disco.
+
+A miniatura é lida já reduzida: QImageReader.setScaledSize (o JPEG decodifica em escala
+reduzida da DCT) ou, em DICOM, a subamostragem de DicomImage.display sobre o arquivo mapeado.
+Cada miniatura gerada vira um PNG pequeno em COBB_THUMBNAIL_DIR, com nome derivado do
+caminho, tamanho e mtime do arquivo: abrir a mesma pasta de novo não decodifica nada, e um
+arquivo alterado gera uma chave nova.
+
+ThumbnailStrip é uma QListView sobre um modelo que só pede as miniaturas das linhas que a view
+desenha; pedidos de linhas que já saíram da tela são descartados, então rolar por milhares de
+estudos não enfileira milhares de decodificações.
+"""
+import hashlib
+import os
+from collections import OrderedDict, deque
+
+from PyQt6.QtCore import (
+    QAbstractListModel, QModelIndex, QObject, QRunnable, QSize, QThreadPool, Qt, pyqtSignal,
+)
+from PyQt6.QtGui import QColor, QImage, QImageReader, QPixmap
+from PyQt6.QtWidgets import QListView
+
+from profiling import profiler, logger
+
+THUMBNAIL_DIR = os.environ.get(
+    "COBB_THUMBNAIL_DIR", os.path.join(os.path.expanduser("~"), ".cache", "cobb", "thumbnails")
+)
+THUMBNAIL_SIZE = 128
+
+
+def cache_key(path, size):
+    """Chave do cache em disco: caminho absoluto, tamanho e mtime do arquivo, lado da miniatura."""
+    st = os.stat(path)
+    text = f"{os.path.abspath(path)}\0{st.st_size}\0{st.st_mtime_ns}\0{size}"
+    return hashlib.sha1(text.encode("utf-8", "surrogateescape")).hexdigest()
+
+
+def read_thumbnail(path, size):
+    """QImage com o maior lado <= size, sem decodificar a resolução total quando o formato permite."""
+    from dicom import is_dicom
+
+    if is_dicom(path):
+        from dicom import DicomImage
+        from loader import gray_to_qimage
+
+        dicom = DicomImage(path)
+        image = gray_to_qimage(dicom.display(step=dicom.preview_step(size)))
+    else:
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        full = reader.size()
+        if not full.isValid():
+            raise OSError(reader.errorString())
+        if max(full.width(), full.height()) > size:
+            reader.setScaledSize(full.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            raise OSError(reader.errorString())
+    if max(image.width(), image.height()) > size:
+        image = image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+    return image
+
+
+class ThumbnailDiskCache:
+    """PNGs pequenos num diretório, um por (arquivo, mtime, tamanho); seguro entre threads."""
+    def __init__(self, directory=THUMBNAIL_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def file_for(self, key):
+        return os.path.join(self.directory, key[:2], key + ".png")
+
+    def get(self, key):
+        image = QImage(self.file_for(key))
+        return None if image.isNull() else image
+
+    def put(self, key, image):
+        target = self.file_for(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Grava ao lado e renomeia: outra thread nunca lê um PNG pela metade
+        tmp = f"{target}.{os.getpid()}.{id(image)}.tmp"
+        if image.save(tmp, "PNG"):
+            os.replace(tmp, target)
+
+    def prune(self, budget_bytes=256 * 1024 * 1024):
+        """Apaga as miniaturas usadas há mais tempo até o diretório caber em budget_bytes."""
+        files = []
+        for sub in os.scandir(self.directory):
+            if sub.is_dir():
+                for entry in os.scandir(sub.path):
+                    st = entry.stat()
+                    files.append((max(st.st_atime, st.st_mtime), st.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= budget_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+class ThumbnailSignals(QObject):
+    finished = pyqtSignal(str, QImage)
+    failed = pyqtSignal(str, str)
+
+
+class ThumbnailTask(QRunnable):
+    """Lê a miniatura do cache em disco ou a gera a partir do arquivo (e grava no cache)."""
+    def __init__(self, path, size, disk_cache=None):
+        super().__init__()
+        self.path = path
+        self.size = size
+        self.disk_cache = disk_cache
+        self.signals = ThumbnailSignals()
+
+    def run(self):
+        try:
+            key = cache_key(self.path, self.size) if self.disk_cache is not None else None
+            image = self.disk_cache.get(key) if key is not None else None
+            if image is not None:
+                profiler.count("miniaturas.cache_disco")
+            else:
+                with profiler.timer("miniaturas.geracao"):
+                    image = read_thumbnail(self.path, self.size)
+                if key is not None:
+                    self.disk_cache.put(key, image)
+        except Exception as e:  # arquivo removido, formato desconhecido, pydicom ausente...
+            self.signals.failed.emit(self.path, str(e))
+            return
+        self.signals.finished.emit(self.path, image)
+
+
+class ThumbnailModel(QAbstractListModel):
+    """Caminhos da lista de leitura; a miniatura de uma linha só é pedida quando a view a desenha."""
+    def __init__(self, size=THUMBNAIL_SIZE, disk_cache=None, workers=2, max_pixmaps=2000, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.disk_cache = disk_cache
+        self.paths = []
+        self.rows = {}  # caminho -> linha
+        self.pixmaps = OrderedDict()  # caminho -> QPixmap, LRU em memória
+        self.max_pixmaps = max_pixmaps
+        self.failed = set()
+        self.wanted = deque()  # pedidos ainda não iniciados, o mais recente à direita
+        self.max_wanted = 64  # o que passa disso já saiu da tela numa rolagem rápida
+        self.in_flight = {}  # caminho -> ThumbnailTask
+        # Pool próprio: as miniaturas nunca atrasam o carregamento do estudo aberto
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(workers)
+        self.placeholder = QPixmap(size, size)
+        self.placeholder.fill(QColor(40, 40, 40))
+
+    def set_paths(self, paths):
+        self.beginResetModel()
+        self.paths = list(paths)
+        self.rows = {path: row for row, path in enumerate(self.paths)}
+        self.wanted.clear()
+        self.endResetModel()
+
+    def append_paths(self, paths):
+        if not paths:
+            return
+        first = len(self.paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(paths) - 1)
+        for path in paths:
+            self.rows[path] = len(self.paths)
+            self.paths.append(path)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        path = self.paths[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return path
+        if role == Qt.ItemDataRole.DecorationRole:
+            pixmap = self.pixmaps.get(path)
+            if pixmap is not None:
+                self.pixmaps.move_to_end(path)
+                return pixmap
+            self.request(path)
+            return self.placeholder
+        return None
+
+    def put(self, path, image):
+        """Miniatura pronta (de um ThumbnailTask ou de outra fonte, como a pasta monitorada)."""
+        if max(image.width(), image.height()) > self.size:
+            image = image.scaled(self.size, self.size, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        self.pixmaps[path] = QPixmap.fromImage(image)
+        self.pixmaps.move_to_end(path)
+        while len(self.pixmaps) > self.max_pixmaps:
+            self.pixmaps.popitem(last=False)
+        row = self.rows.get(path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def request(self, path):
+        if path in self.in_flight or path in self.failed:
+            return
+        if path in self.wanted:
+            self.wanted.remove(path)  # pedido de novo: volta para o topo
+        self.wanted.append(path)
+        while len(self.wanted) > self.max_wanted:
+            self.wanted.popleft()
+        self.dispatch()
+
+    def dispatch(self):
+        # Os mais recentes primeiro: são as linhas visíveis agora
+        while self.wanted and len(self.in_flight) < self.pool.maxThreadCount():
+            path = self.wanted.pop()
+            task = ThumbnailTask(path, self.size, self.disk_cache)
+            task.signals.finished.connect(self.on_finished)
+            task.signals.failed.connect(self.on_failed)
+            self.in_flight[path] = task
+            self.pool.start(task)
+
+    def on_finished(self, path, image):
+        self.in_flight.pop(path, None)
+        self.put(path, image)
+        self.dispatch()
+
+    def on_failed(self, path, error):
+        self.in_flight.pop(path, None)
+        self.failed.add(path)
+        logger.debug(f"Miniatura de {os.path.basename(path)} falhou: {error}")  # uma pasta ilegível não inunda o log
+        self.dispatch()
+
+    def cancel_pending(self):
+        self.wanted.clear()
+
+
+class ThumbnailStrip(QListView):
+    """Coluna de miniaturas ao lado da imagem; um clique abre o estudo na lista de leitura."""
+    study_activated = pyqtSignal(int)
+
+    def __init__(self, size=THUMBNAIL_SIZE, disk_cache=None, parent=None):
+        super().__init__(parent)
+        self.thumbnail_model = ThumbnailModel(size, disk_cache, parent=self)
+        self.setModel(self.thumbnail_model)
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setFlow(QListView.Flow.TopToBottom)
+        self.setWrapping(False)
+        self.setMovement(QListView.Movement.Static)
+        self.setIconSize(QSize(size, size))
+        self.setGridSize(QSize(size + 16, size + 28))
+        # Todas as linhas do mesmo tamanho: a view não pergunta o tamanho de cada uma das milhares
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(200)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setFixedWidth(size + 40)
+        self.clicked.connect(lambda index: self.study_activated.emit(index.row()))
+
+    def sync(self, paths, current):
+        """Acompanha a lista de leitura: acrescenta o que é novo no fim ou recarrega tudo."""
+        model = self.thumbnail_model
+        if paths[:len(model.paths)] == model.paths:
+            model.append_paths(paths[len(model.paths):])
+        else:
+            model.set_paths(paths)
+        if 0 <= current < len(paths):
+            index = model.index(current)
+            self.setCurrentIndex(index)
+            self.scrollTo(index)
@@ -0,0 +1,166 @@
+"""
+Imagem em blocos (tiles) com pirâmide de resolução para radiografias muito grandes.
+"""
+import math
+from collections import OrderedDict
+
+from PyQt6.QtWidgets import QGraphicsItem, QGraphicsScene, QStyleOptionGraphicsItem
+from PyQt6.QtGui import QImage, QPixmap, QPainter
+from PyQt6.QtCore import Qt, QRect, QRectF
+
+from buffers import ImageBuffer
+from profiling import profiler
+
+TILE_SIZE = 512
+
+
+class ImagePyramid:
+    """Níveis reduzidos pela metade sucessivamente; o nível 0 é a imagem original."""
+    def __init__(self, levels, tile_size=TILE_SIZE, buffers=None):
+        self.levels = levels
+        self.tile_size = tile_size
+        # buffers.ImageBuffer de cada nível, quando os QImage são vistas sobre arrays numpy
+        self.buffers = buffers
+
+    @property
+    def buffer(self):
+        return self.buffers[0] if self.buffers else None
+
+    @classmethod
+    def from_image(cls, image: QImage, tile_size=TILE_SIZE):
+        """Gera a pirâmide (custoso: chamar fora da thread da GUI)."""
+        # Radiografias em tons de cinza ocupam 1/4 da memória em Grayscale8
+        if image.format() != QImage.Format.Format_Grayscale8 and image.isGrayscale():
+            image = image.convertToFormat(QImage.Format.Format_Grayscale8)
+        return cls(cls.build_levels(image, tile_size), tile_size)
+
+    @classmethod
+    def from_buffers(cls, buffers, tile_size=TILE_SIZE):
+        """Pirâmide sobre buffers já existentes (ex.: do cache); completa os níveis que faltarem."""
+        buffers = list(buffers)
+        levels = cls.build_levels(buffers[-1].image, tile_size)
+        buffers += [ImageBuffer.from_qimage(level) for level in levels[1:]]
+        return cls([b.image for b in buffers], tile_size, buffers)
+
+    @staticmethod
+    def build_levels(image, tile_size):
+        levels = [image]
+        while max(levels[-1].width(), levels[-1].height()) > tile_size:
+            prev = levels[-1]
+            levels.append(prev.scaled(
+                max(1, prev.width() // 2), max(1, prev.height() // 2),
+                Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+            ))
+        return levels
+
+    def width(self):
+        return self.levels[0].width()
+
+    def height(self):
+        return self.levels[0].height()
+
+    def level_for_scale(self, scale):
+        """Nível mais grosso cuja resolução ainda cobre a escala de exibição."""
+        if scale <= 0:
+            return len(self.levels) - 1
+        k = int(math.floor(math.log2(1 / scale))) if scale < 1 else 0
+        return max(0, min(k, len(self.levels) - 1))
+
+
+class TileCache:
+    """Cache LRU de QPixmaps de tiles, limitado por um orçamento em bytes."""
+    def __init__(self, budget_bytes=256 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.tiles = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cost(pixmap):
+        return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+    def get(self, key, make):
+        pixmap = self.tiles.get(key)
+        if pixmap is not None:
+            self.tiles.move_to_end(key)
+            self.hits += 1
+            return pixmap
+        self.misses += 1
+        pixmap = make()
+        self.tiles[key] = pixmap
+        self.bytes += self.cost(pixmap)
+        while self.bytes > self.budget_bytes and len(self.tiles) > 1:
+            _, old = self.tiles.popitem(last=False)
+            self.bytes -= self.cost(old)
+        return pixmap
+
+    def clear(self):
+        self.tiles.clear()
+        self.bytes = 0
+
+
+class TiledImageItem(QGraphicsItem):
+    """Item de imagem que pinta só os tiles visíveis, no nível adequado ao zoom atual."""
+    def __init__(self, pyramid: ImagePyramid, cache: TileCache = None):
+        super().__init__()
+        self.pyramid = pyramid
+        self.cache = cache or TileCache()
+        self.rect = QRectF(0, 0, pyramid.width(), pyramid.height())
+        # exposedRect só é preenchido com esta flag
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+        self.as_background = False
+
+    def set_as_background(self, enabled):
+        """Pinta a imagem no fundo da cena (que a view pode guardar em cache) em vez de como item."""
+        self.as_background = enabled
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemHasNoContents, enabled)
+        self.invalidate()
+
+    def invalidate(self):
+        self.update()
+        if self.scene() is not None:
+            self.scene().invalidate(self.rect, QGraphicsScene.SceneLayer.BackgroundLayer)
+
+    def boundingRect(self):
+        return self.rect
+
+    def set_pyramid(self, pyramid: ImagePyramid):
+        """Troca a imagem exibida (ex.: nova janela/nível) mantendo o tamanho e as anotações."""
+        self.pyramid = pyramid
+        self.cache.clear()
+        self.invalidate()
+
+    def make_tile(self, level, col, row):
+        image = self.pyramid.levels[level]
+        size = self.pyramid.tile_size
+        profiler.count("tiles.gerados")
+        # Tiles da borda ficam do tamanho real: copy() além da imagem preencheria com preto
+        return QPixmap.fromImage(image.copy(QRect(col * size, row * size, size, size).intersected(image.rect())))
+
+    def paint(self, painter, option, widget=None):
+        self.paint_tiles(painter, option.exposedRect)
+
+    def paint_tiles(self, painter, exposed):
+        """Pinta os tiles que cobrem exposed (coordenadas do item), no nível do zoom do painter."""
+        scale = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        level = self.pyramid.level_for_scale(scale)
+        image = self.pyramid.levels[level]
+        size = self.pyramid.tile_size
+        fx = self.rect.width() / image.width()
+        fy = self.rect.height() / image.height()
+
+        exposed = exposed.intersected(self.rect)
+        if exposed.isEmpty():
+            return
+        col0 = max(0, int(exposed.left() / fx) // size)
+        col1 = min((image.width() - 1) // size, int(math.ceil(exposed.right() / fx)) // size)
+        row0 = max(0, int(exposed.top() / fy) // size)
+        row1 = min((image.height() - 1) // size, int(math.ceil(exposed.bottom() / fy)) // size)
+
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, scale < 1)
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                tile = self.cache.get((level, col, row), lambda: self.make_tile(level, col, row))
+                target = QRectF(col * size * fx, row * size * fy, tile.width() * fx, tile.height() * fy)
+                painter.drawPixmap(target, tile, QRectF(tile.rect()))
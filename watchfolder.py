@@ -0,0 +1,276 @@
+"""
+Pasta monitorada: estudos novos entram sozinhos na lista de leitura do visualizador.
+
+Um observador (inotify no Linux, varredura periódica nos demais casos) avisa quando um arquivo
+termina de ser gravado na pasta. Os caminhos esperam numa fila (só strings) e no máximo
+max_workers são decodificados ao mesmo tempo no QThreadPool (pirâmide, miniatura e, se pedido,
+placas vertebrais sugeridas). Prontos, entram no cache e no fim da lista do StudyNavigator.
+
+Contrapressão: estudos da pasta prontos e ainda não abertos mais os em decodificação nunca
+passam de max_ready; a fila só volta a andar quando o leitor abre um deles, então a memória de
+imagens fica limitada mesmo se a pasta receber centenas de arquivos de uma vez. O restante da
+lista de leitura (uma pasta aberta à mão, por exemplo) não entra na conta.
+A latência de cada estudo (detecção -> pronto) vai para o profiler em "ingestao.latencia".
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+
+from PyQt6.QtCore import QObject, QThreadPool, pyqtSignal
+
+from batch_export import IMAGE_EXTENSIONS
+from loader import IngestTask
+from profiling import profiler, logger
+from studies import StudyEntry
+
+IN_CLOSE_WRITE = 0x08
+IN_MOVED_TO = 0x80
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (seguido do nome)
+PROPOSAL_COLOR = "#ffa500"  # laranja, como a sugestão de "Detectar Vértebras"
+WATCH_LANDMARKS_ENV = os.environ.get("COBB_WATCH_LANDMARKS", "") not in ("", "0")
+
+
+def is_study(name):
+    return not name.startswith(".") and os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+class InotifyWatcher:
+    """Arquivos fechados após escrita ou movidos para a pasta, via inotify (Linux)."""
+    def __init__(self, directory, callback):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify só existe no Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch falhou em {directory}")
+        self.directory = directory
+        self.callback = callback  # (caminho, instante) chamado na thread do observador
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="inotify", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        os.close(self.fd)
+
+    def run(self):
+        while not self.stopped.is_set():
+            # Timeout curto só para perceber o stop; sem eventos a thread fica bloqueada no select
+            readable, _, _ = select.select([self.fd], [], [], 0.25)
+            if not readable:
+                continue
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            now = time.perf_counter()
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                start = offset + INOTIFY_EVENT.size
+                name = os.fsdecode(data[start:start + length].rstrip(b"\0"))
+                offset = start + length
+                if name and is_study(name):
+                    self.callback(os.path.join(self.directory, name), now)
+
+
+class PollingWatcher:
+    """Varredura periódica: um arquivo novo é avisado quando tamanho e mtime param de mudar."""
+    def __init__(self, directory, callback, interval=1.0):
+        self.directory = directory
+        self.callback = callback
+        self.interval = interval
+        self.seen = set(self.scan())  # o que já estava na pasta não é novo
+        self.sizes = {}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="varredura", daemon=True)
+
+    def scan(self):
+        found = {}
+        for entry in os.scandir(self.directory):
+            if is_study(entry.name) and entry.is_file():
+                st = entry.stat()
+                found[entry.path] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        current = self.scan()
+        now = time.perf_counter()
+        for path, signature in current.items():
+            # Igual nas duas últimas varreduras: a cópia terminou
+            if path not in self.seen and self.sizes.get(path) == signature:
+                self.seen.add(path)
+                self.callback(path, now)
+        self.sizes = current
+
+
+def make_watcher(directory, callback, poll_interval=1.0, polling=False):
+    """InotifyWatcher quando disponível, senão PollingWatcher."""
+    if not polling:
+        try:
+            return InotifyWatcher(directory, callback)
+        except (OSError, AttributeError) as e:  # outro sistema, ou libc sem inotify_init1
+            logger.warning(f"inotify indisponível ({e}); usando varredura a cada {poll_interval:g} s.")
+    return PollingWatcher(directory, callback, poll_interval)
+
+
+class WatchFolder(QObject):
+    """Ingestão da pasta monitorada: observador -> fila -> QThreadPool -> lista de leitura."""
+    detected = pyqtSignal(str, float)  # emitido na thread do observador, entregue na thread da GUI
+
+    def __init__(self, viewer, directory, max_workers=2, max_ready=4, propose_landmarks=False,
+                 poll_interval=1.0, polling=False):
+        super().__init__()
+        self.viewer = viewer
+        self.directory = os.path.abspath(directory)
+        self.max_workers = max_workers
+        self.max_ready = max(max_ready, 1)
+        self.propose_landmarks = propose_landmarks
+        self.queue = deque()  # caminhos detectados esperando um worker
+        self.in_flight = {}  # caminho -> IngestTask
+        self.detected_at = {}  # caminho -> instante da detecção (perf_counter)
+        self.known = set()  # cada arquivo entra uma vez, mesmo que seja regravado
+        self.ready = set()  # ingeridos e ainda não abertos pelo leitor
+        self.latencies = deque(maxlen=10000)  # ms, detecção -> pronto
+        self.completed = 0
+        self.failed = 0
+        self.started = None
+        self.detected.connect(self.on_detected)
+        self.watcher = make_watcher(self.directory, self.detected.emit, poll_interval, polling)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.watcher.start()
+
+    def stop(self):
+        self.watcher.stop()
+        for task in self.in_flight.values():
+            task.cancel()
+        self.in_flight.clear()
+        self.queue.clear()
+        self.ready.clear()
+
+    def unread(self):
+        """Estudos da pasta já na lista de leitura e ainda não abertos."""
+        return len(self.ready)
+
+    def worklist_changed(self):
+        """O estudo aberto deixa de contar; numa lista nova, os prontos que saíram dela também."""
+        if not self.ready:
+            return
+        navigator = self.viewer.navigator
+        self.ready.discard(navigator.current_path)
+        if self.ready:
+            self.ready.intersection_update(navigator.paths)
+        self.dispatch()
+
+    def on_detected(self, path, detected_at):
+        if path in self.known:
+            return
+        self.known.add(path)
+        self.detected_at[path] = detected_at
+        self.queue.append(path)
+        self.dispatch()
+
+    def dispatch(self):
+        """Inicia decodificações enquanto houver worker livre e espaço na fila de prontos."""
+        while (self.queue and len(self.in_flight) < self.max_workers
+               and self.unread() + len(self.in_flight) < self.max_ready):
+            path = self.queue.popleft()
+            task = IngestTask(path, cache=self.viewer.buffer_cache, propose_landmarks=self.propose_landmarks)
+            task.signals.finished.connect(lambda pyramid, secs, t=task: self.on_ingested(t, pyramid))
+            task.signals.failed.connect(lambda error, t=task: self.on_failed(t, error))
+            self.in_flight[path] = task
+            QThreadPool.globalInstance().start(task)
+
+    def on_ingested(self, task, pyramid):
+        if self.in_flight.get(task.path) is not task:
+            return
+        del self.in_flight[task.path]
+        latency = (time.perf_counter() - self.detected_at.pop(task.path)) * 1000
+        profiler.record("ingestao.latencia", latency)
+        self.latencies.append(latency)
+        self.completed += 1
+        if task.proposal is not None and task.proposal.pair is not None:
+            self.store_proposal(task.path, task.proposal)
+        if self.viewer.thumbnail_strip is not None:
+            self.viewer.thumbnail_strip.thumbnail_model.put(task.path, task.thumbnail)
+        # Sempre pelo fim da lista: o leitor não perde a posição atual. Entra em ready antes do
+        # append, que abre o estudo na hora (e o tira de ready) se nada estiver aberto
+        self.ready.add(task.path)
+        self.viewer.navigator.append(task.path, StudyEntry(pyramid, task.dicom, task.thumbnail))
+        self.viewer.statusBar().showMessage(
+            f"Pasta monitorada: {os.path.basename(task.path)} pronto em {latency:.0f} ms "
+            f"({self.unread()} não lidos, {len(self.queue)} na fila)"
+        )
+        self.dispatch()
+
+    def on_failed(self, task, error):
+        if self.in_flight.get(task.path) is not task:
+            return
+        del self.in_flight[task.path]
+        self.detected_at.pop(task.path, None)
+        self.failed += 1
+        message = f"Pasta monitorada: erro em {os.path.basename(task.path)}: {error}"
+        self.viewer.statusBar().showMessage(message)
+        logger.warning(message)
+        self.dispatch()
+
+    def store_proposal(self, path, proposal):
+        """Grava o par sugerido como ângulo comum, só em estudos ainda sem anotações."""
+        store = self.viewer.annotation_store
+        if store is None or store.load(path):
+            return
+        store.save(path, [{
+            "uid": uuid.uuid4().hex,
+            "points": proposal.pair_points(),
+            "color": PROPOSAL_COLOR,
+            "font_size": 26,
+            "text_pos": None,
+            "angle": None,  # recalculado com o tamanho do pixel quando o estudo é aberto
+        }])
+
+    def stats(self):
+        """Contagens, vazão (estudos/s desde o início) e percentis da latência em ms."""
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        ordered = sorted(self.latencies)
+
+        def pct(p):
+            return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] if ordered else 0.0
+
+        return {
+            "prontos": self.completed,
+            "falhas": self.failed,
+            "fila": len(self.queue),
+            "decodificando": len(self.in_flight),
+            "nao_lidos": self.unread(),
+            "vazao": self.completed / elapsed if elapsed else 0.0,
+            "p50": pct(50),
+            "p95": pct(95),
+            "max": ordered[-1] if ordered else 0.0,
+        }